@@ -17,21 +17,31 @@
 import glob
 import os
 
-import cudf
 import numpy as np
+import pandas as pd
+import pyarrow as pa
 import pyarrow.parquet as pq
 
+try:
+    import cudf
+except ImportError:
+    cudf = None
+
 try:
     import cupy as cp
 except ImportError:
     import numpy as cp
 
 
+_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+
 class FileIterator:
-    def __init__(self, path, nfiles, shuffle=True, **kwargs):
+    def __init__(self, path, nfiles, shuffle=True, format="parquet", **kwargs):
         self.path = path
         self.nfiles = nfiles
         self.shuffle = shuffle
+        self.ext = _EXTENSIONS[format]
         self.ind = 0
         self.inds = np.arange(self.nfiles)
         if self.shuffle:
@@ -49,28 +59,49 @@ class FileIterator:
             raise StopIteration
         self.ind += 1
         # if self.name, return that naming convention.
-        return "%s/ds_part.%d.parquet" % (self.path, self.ind - 1)
+        return "%s/ds_part.%d.%s" % (self.path, self.ind - 1, self.ext)
 
 
 class DatasetWriter:
-    def __init__(self, path, nfiles=1, **kwargs):
+    """
+    Writes dataframes to a dataset of `nfiles` files
+
+    Parameters
+    -----------
+    path : str
+        directory of the dataset
+    nfiles : int, default 1
+    format : {'parquet', 'arrow'}, default 'parquet'
+        'arrow' writes uncompressed Arrow IPC files, which the 'arrow'
+        engine memory-maps (best for data read every epoch)
+    """
+
+    def __init__(self, path, nfiles=1, format="parquet", **kwargs):
+        if format not in _EXTENSIONS:
+            raise ValueError("Unrecognized format, expecting 'parquet' or 'arrow'.")
         self.path = path
         self.nfiles = nfiles
-        self.writers = {fn: None for fn in FileIterator(path, nfiles)}
+        self.format = format
+        self.writers = {fn: None for fn in self._file_names()}
         self.shared_meta_path = str(path) + "/_metadata"
         self.metadata = None
-        self.new_metadata = {fn: [] for fn in FileIterator(path, nfiles)}
+        self.new_metadata = {fn: [] for fn in self._file_names()}
 
         # Check for _metadata
         metafile = glob.glob(self.shared_meta_path)
-        if metafile:
+        if metafile and format == "parquet":
             self.metadata = pq.ParquetDataset(metafile[0]).metadata
 
+    def _file_names(self, shuffle=True):
+        return FileIterator(self.path, self.nfiles, shuffle=shuffle, format=self.format)
+
     def write(self, gdf, shuffle=True):
 
         # Shuffle the dataframe
         gdf_size = len(gdf)
-        if shuffle:
+        if shuffle and isinstance(gdf, pd.DataFrame):
+            gdf = gdf.iloc[np.random.permutation(gdf_size)].reset_index(drop=True)
+        elif shuffle:
             sort_key = "__sort_index__"
             arr = cp.arange(gdf_size)
             cp.random.shuffle(arr)
@@ -79,22 +110,28 @@ class DatasetWriter:
 
         # Write to
         chunk_size = int(gdf_size / self.nfiles)
-        for i, fn in enumerate(FileIterator(self.path, self.nfiles)):
+        for i, fn in enumerate(self._file_names()):
             s1 = i * chunk_size
             s2 = (i + 1) * chunk_size
             if i == (self.nfiles - 1):
                 s2 = gdf_size
             chunk = gdf[s1:s2]
-            pa_table = chunk.to_arrow()
+            pa_table = _to_arrow(chunk)
             if self.writers[fn] is None:
-                self.writers[fn] = pq.ParquetWriter(
-                    fn, pa_table.schema, metadata_collector=self.new_metadata[fn],
-                )
+                if self.format == "arrow":
+                    self.writers[fn] = pa.ipc.new_file(fn, pa_table.schema)
+                else:
+                    self.writers[fn] = pq.ParquetWriter(
+                        fn, pa_table.schema, metadata_collector=self.new_metadata[fn],
+                    )
             self.writers[fn].write_table(pa_table)
 
     def write_metadata(self):
         self.close_writers()  # Writers must be closed to get metadata
-        fns = [fn for fn in FileIterator(self.path, self.nfiles, shuffle=False)]
+        if self.format != "parquet":
+            # only parquet datasets have a shared `_metadata` file
+            return
+        fns = [fn for fn in self._file_names(shuffle=False)]
         if self.metadata is not None:
             _meta = self.metadata
             i_start = 0
@@ -117,8 +154,16 @@ class DatasetWriter:
             if writer is not None:
                 writer.close()
                 # Set row-group file paths
-                self.new_metadata[fn][0].set_file_path(os.path.basename(fn))
-                writer = None
+                if self.new_metadata[fn]:
+                    self.new_metadata[fn][0].set_file_path(os.path.basename(fn))
+                self.writers[fn] = None
 
     def __del__(self):
         self.close_writers()
+
+
+def _to_arrow(df):
+    # chunks of the CPU readers are pandas dataframes
+    if isinstance(df, pd.DataFrame):
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return df.to_arrow()
@@ -16,15 +16,19 @@
 
 import os
 
-import cudf
-import cupy as cp
 import numpy as np
 import pandas as pd
-import rmm
-from cudf.utils.dtypes import min_scalar_type
 
 import nvtabular.io
 
+try:
+    import cudf
+    import cupy as cp
+    import rmm
+    from cudf.utils.dtypes import min_scalar_type
+except ImportError:
+    cudf = cp = rmm = min_scalar_type = None
+
 
 class DLLabelEncoder(object):
     """
@@ -122,7 +126,7 @@ class DLLabelEncoder(object):
         cats.name = None  # because it was mutated above
         return codes._copy_construct(name=None, index=vals.index)
 
-    def transform(self, y: cudf.Series, unk_idx=0) -> cudf.Series:
+    def transform(self, y: "cudf.Series", unk_idx=0) -> "cudf.Series":
         """
         Maps y to unique ids.
 
@@ -170,7 +174,7 @@ class DLLabelEncoder(object):
         gpu_mem_util = (gpu_total_mem - gpu_free_mem) / gpu_total_mem
         return gpu_free_mem, gpu_mem_util
 
-    def fit(self, y: cudf.Series):
+    def fit(self, y: "cudf.Series"):
         """
         Calculates unique values or value counts of y
         and moves them to host memory.
@@ -197,7 +201,7 @@ class DLLabelEncoder(object):
         else:
             return self._fit_unique_finalize()
 
-    def _fit_unique(self, y: cudf.Series):
+    def _fit_unique(self, y: "cudf.Series"):
         y_uniqs = y.unique()
         self._cats_parts.append(y_uniqs.to_pandas())
 
@@ -222,7 +226,7 @@ class DLLabelEncoder(object):
         self._cats_host = cats.to_pandas()
         return self._cats_host.shape[0]
 
-    def _fit_freq(self, y: cudf.Series):
+    def _fit_freq(self, y: "cudf.Series"):
         y_counts = y.value_counts()
         self._cats_parts.append(y_counts.to_pandas())
 
@@ -246,6 +250,8 @@ class DLLabelEncoder(object):
                 y_counts = cudf.Series([])
 
         if len(cats_counts_host) == 0:
+            # the value counts are kept for later fits
+            self._cats_parts = [y_counts.to_pandas()] if y_counts.shape[0] else []
             cats = cudf.Series(y_counts[y_counts >= self.freq_threshold].index)
             cats = cudf.Series([None]).append(cats)
             cats.reset_index(drop=True, inplace=True)
@@ -255,6 +261,7 @@ class DLLabelEncoder(object):
             for i in range(len(cats_counts_host)):
                 y_counts_host_temp = cats_counts_host.pop()
                 y_counts_host = y_counts_host.add(y_counts_host_temp, fill_value=0)
+            self._cats_parts = [y_counts_host]
 
             self._cats_host = pd.Series(y_counts_host[y_counts_host >= self.freq_threshold].index)
             self._cats_host = pd.Series([None]).append(self._cats_host)
@@ -262,6 +269,33 @@ class DLLabelEncoder(object):
 
         return self._cats_host.shape[0]
 
+    def partial_state(self):
+        """
+        Returns the unique values or value counts fitted so far, in host
+        memory. The unique values of a finalized fit are in `cats`, the
+        value counts stay in `parts`.
+        """
+
+        return {
+            "parts": list(self._cats_parts),
+            "cats": None if self.use_frequency else self._cats_host,
+        }
+
+    def merge_state(self, state):
+        """
+        Adds the unique values or value counts fitted by another
+        encoder of the same column (and parameters) to this one.
+
+        Parameters
+        -----------
+        state : dict
+            `partial_state` of the other encoder
+        """
+
+        self._cats_parts.extend(state["parts"])
+        if state["cats"] is not None:
+            self._cats_parts.append(state["cats"])
+
     def merge_series(self, compr_a, compr_b):
         df, dg = cudf.DataFrame(), cudf.DataFrame()
         df["l1"] = compr_a.nans_to_nulls().dropna()
@@ -287,6 +321,16 @@ class DLLabelEncoder(object):
                         break
         return compr
 
+    def __getstate__(self):
+        # the (host) parts gathered so far are kept as is, device memory is not
+        state = self.__dict__.copy()
+        state["_cats_counts"] = self._cats_counts.to_pandas()
+        return state
+
+    def __setstate__(self, state):
+        state["_cats_counts"] = cudf.from_pandas(state["_cats_counts"])
+        self.__dict__.update(state)
+
     def get_cats(self):
         gdf = cudf.from_pandas(self._cats_host)
         gdf.reset_index(drop=True, inplace=True)
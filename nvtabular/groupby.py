@@ -14,10 +14,14 @@
 # limitations under the License.
 #
 
-import cudf
-import cupy as cp
 import pandas as pd
-import rmm
+
+try:
+    import cudf
+    import cupy as cp
+    import rmm
+except ImportError:
+    cudf = cp = rmm = None
 
 
 class GroupByMomentsCal(object):
@@ -184,6 +188,31 @@ class GroupByMomentsCal(object):
             counts_part = groups.count()
             self.counts_host.append(counts_part.to_pandas())
 
+    def partial_state(self):
+        """
+        Returns the group stats fitted so far, in host memory.
+        """
+        return {
+            "col_count": self.col_count,
+            "sums": list(self.sums_host),
+            "vars": list(self.vars_host),
+            "counts": list(self.counts_host),
+        }
+
+    def merge_state(self, state):
+        """
+        Adds the group stats fitted by another instance on the
+        same columns (and stats) to those of this one.
+
+        Parameters
+        -----------
+        state : dict
+            `partial_state` of the other instance
+        """
+        self.sums_host.extend(state["sums"])
+        self.vars_host.extend(state["vars"])
+        self.counts_host.extend(state["counts"])
+
     def _el_in_stats_names(self, elements):
         return not self.stats_names.isdisjoint(elements)
 
@@ -205,6 +234,8 @@ class GroupByMomentsCal(object):
                     counts_dev = counts_dev.add(counts_part, fill_value=0)
 
             self.counts = counts_dev.to_pandas()
+            # the stats of all the parts are kept for later fits
+            self.counts_host = [self.counts]
             new_col = self.col + "_count"
             self.stats[new_col] = self.counts[self.col_count]
 
@@ -219,6 +250,7 @@ class GroupByMomentsCal(object):
                         sums_dev = sums_dev.add(sums_part, fill_value=0)
 
                 self.sums = sums_dev.to_pandas()
+                self.sums_host = [self.sums]
                 for cont_name in self.cont_col:
                     new_col = self.col + "_" + cont_name + "_sum"
                     self.stats[new_col] = self.sums[cont_name]
@@ -268,6 +300,11 @@ class GroupByMomentsCal(object):
                         if self._el_in_stats_names({"std", "var"}):
                             var_dev = var_dev.mul(1 / counts_dev)
 
+                self.counts_host = [counts_dev.to_pandas()]
+                self.sums_host = [sums_dev.to_pandas()]
+                if self._el_in_stats_names({"std", "var"}):
+                    self.vars_host = [var_dev.to_pandas()]
+
                 result_map = {}
                 if "count" in self.stats_names:
                     self.counts = counts_dev.to_pandas()
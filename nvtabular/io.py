@@ -14,19 +14,43 @@
 # limitations under the License.
 #
 
+import collections
+import copy
+import functools
+import glob
+import gzip
+import heapq
 import io
+import json
 import logging
+import operator
 import os
 import queue
+import random
+import struct
+import sys
 import threading
-from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
-import cudf
-import cupy as cp
 import numpy as np
-import rmm
-from cudf._lib.nvtx import annotate
-from cudf.io.parquet import ParquetWriter
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+try:
+    import cudf
+    import cupy as cp
+    import rmm
+    from cudf._lib.nvtx import annotate
+    from cudf.io.parquet import ParquetWriter
+except ImportError:
+    # CPU-only hosts: only the `device="cpu"` readers are available
+    cudf = cp = rmm = ParquetWriter = None
+
+    def annotate(*args, **kwargs):
+        return lambda func: func
+
 
 LOG = logging.getLogger("nvtabular")
 
@@ -35,23 +59,670 @@ LOG = logging.getLogger("nvtabular")
 #
 
 
-def _allowable_batch_size(gpu_memory_frac, row_size):
-    free_mem = rmm.get_info().free
+def _host_free_memory():
+    """ Returns the amount of system memory (in bytes) available for new allocations
+    """
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+def _free_memory(device="gpu"):
+    if device == "cpu":
+        return _host_free_memory()
+    return rmm.get_info().free
+
+
+def _allowable_batch_size(gpu_memory_frac, row_size, device="gpu"):
+    free_mem = _free_memory(device)
     gpu_memory = free_mem * gpu_memory_frac
     return max(int(gpu_memory / row_size), 1)
 
 
-def _get_read_engine(engine, file_path, **kwargs):
-    LOG.debug("opening '%s' as %s", file_path, engine)
+def _arrow_row_size(schema):
+    # Fixed-width types report their exact width, everything
+    # else (strings, lists, ...) is counted as a 64-bit pointer
+    row_size = 0
+    for field in schema:
+        try:
+            row_size += max(field.type.bit_width // 8, 1)
+        except ValueError:
+            row_size += 8
+    return row_size
+
+
+class RowSizeEstimate:
+    """
+    In-memory size of a row (in bytes), measured on a sample of the data
+    (strings count their payload and offsets).
+
+    Parameters
+    -----------
+    mean : float
+        average size of the sampled rows
+    std : float, default 0
+        standard deviation of the size of the sampled rows
+    num_samples : int, default 0
+        number of rows sampled (0 when the size was given, not measured)
+    """
+
+    # two-sided 95% quantile of the normal distribution
+    z = 1.96
+
+    def __init__(self, mean, std=0.0, num_samples=0):
+        self.mean = mean
+        self.std = std
+        self.num_samples = num_samples
+
+    @classmethod
+    def from_columns(cls, stats, num_samples, columns=None):
+        """ Combines the per-column `(mean, variance)` of `_column_size_stats`,
+        treating the sizes of the columns as independent
+        """
+        columns = columns or list(stats)
+        mean = sum(stats[col][0] for col in columns)
+        std = np.sqrt(sum(stats[col][1] for col in columns))
+        return cls(mean, float(std), num_samples)
+
+    @property
+    def interval(self):
+        """ 95% confidence interval of the mean row size """
+        if self.num_samples < 2:
+            return (self.mean, self.mean)
+        margin = self.z * self.std / np.sqrt(self.num_samples)
+        return (max(self.mean - margin, 0.0), self.mean + margin)
+
+    @property
+    def upper(self):
+        """ Conservative row size used to size batches (at least one byte) """
+        return max(self.interval[1], 1)
+
+    def __repr__(self):
+        low, high = self.interval
+        return "RowSizeEstimate(mean=%.1f, interval=(%.1f, %.1f), num_samples=%d)" % (
+            self.mean,
+            low,
+            high,
+            self.num_samples,
+        )
+
+
+def _column_row_sizes(series):
+    """ Returns the fixed number of bytes every row of `series` takes, and
+    a series with the variable-length payload of each row (or None)
+    """
+    dtype = series.dtype
+    if isinstance(series, pd.Series):
+        if hasattr(series, "cat"):
+            return series.cat.codes.dtype.itemsize, None
+        if dtype == object or not hasattr(dtype, "itemsize"):
+            # pointer plus the python object it references
+            return 8, series.map(sys.getsizeof)
+        return dtype.itemsize, None
+
+    # cudf columns carry a validity bitmask once they hold nulls
+    fixed = 0.125 if series.has_nulls else 0
+    if dtype == object or str(dtype) == "str":
+        # 32-bit offsets plus the utf-8 payload of the string
+        return fixed + 4, series.str.byte_count().fillna(0)
+    if str(dtype) == "category":
+        return fixed + series.cat.codes.dtype.itemsize, None
+    return fixed + dtype.itemsize, None
+
+
+def _column_size_stats(df):
+    """ Mean and variance of the in-memory size of the values of every column """
+    stats = {}
+    for col in df.columns:
+        fixed, variable = _column_row_sizes(df[col])
+        if variable is None or len(df) == 0:
+            stats[col] = (float(fixed), 0.0)
+        else:
+            var = float(variable.var()) if len(df) > 1 else 0.0
+            stats[col] = (fixed + float(variable.mean()), var)
+    return stats
+
+
+def _estimate_row_size(df):
+    """ Measures the in-memory footprint of the rows of a sampled dataframe """
+    fixed, variable = 0, None
+    for col in df.columns:
+        col_fixed, col_variable = _column_row_sizes(df[col])
+        fixed += col_fixed
+        if col_variable is not None and len(df) > 0:
+            variable = col_variable if variable is None else variable + col_variable
+    if variable is None:
+        return RowSizeEstimate(float(fixed), 0.0, len(df))
+    std = float(variable.std()) if len(df) > 1 else 0.0
+    return RowSizeEstimate(fixed + float(variable.mean()), std, len(df))
+
+
+def _frame_memory(df):
+    """ Measures the in-memory footprint (in bytes) of a dataframe """
+    nbytes = 0
+    for col in df.columns:
+        fixed, variable = _column_row_sizes(df[col])
+        nbytes += fixed * len(df)
+        if variable is not None and len(df) > 0:
+            nbytes += float(variable.sum())
+    return nbytes
+
+
+def _frame_nbytes(df):
+    """ Measures the memory (in bytes) of a dataframe cheaply enough to be
+    done for every chunk: the strings of pandas dataframes only count their
+    pointers
+    """
+    if isinstance(df, pd.DataFrame):
+        return int(df.memory_usage(index=False).sum())
+    return int(_frame_memory(df))
+
+
+class AdaptiveBatchSize:
+    """
+    Steers the number of rows per chunk toward a target memory footprint,
+    from the memory per row of the chunks read (per `stage`, the largest wins).
+
+    Parameters
+    -----------
+    target_memory : int
+        memory footprint (in bytes) to aim for, per chunk
+    batch_size : int, default None
+        initial number of rows per chunk (set by the first reader otherwise)
+    tolerance : float, default 0.25
+        relative change needed before the batch size is updated
+    smoothing : float, default 0.5
+        weight of the latest observation in the moving averages
+    max_growth : float, default 2.0
+        largest factor the batch size grows by per update
+    """
+
+    def __init__(
+        self, target_memory, batch_size=None, tolerance=0.25, smoothing=0.5, max_growth=2.0
+    ):
+        self.target_memory = target_memory
+        self.batch_size = batch_size
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self.row_memory = {}
+
+    def observe(self, chunk, stage="read"):
+        """ Records the memory of a chunk, returning the next batch size """
+        return self.update(len(chunk), _frame_memory(chunk), stage=stage)
+
+    def update(self, num_rows, nbytes, stage="read"):
+        if num_rows == 0:
+            return self.batch_size
+        row_memory = nbytes / num_rows
+        if stage in self.row_memory:
+            row_memory = self.smoothing * row_memory + (1 - self.smoothing) * self.row_memory[stage]
+        self.row_memory[stage] = row_memory
+
+        desired = max(int(self.target_memory / max(max(self.row_memory.values()), 1)), 1)
+        current = self.batch_size or desired
+        if desired < current * (1 - self.tolerance):
+            self.batch_size = desired
+        elif desired > current * (1 + self.tolerance):
+            self.batch_size = min(desired, int(current * self.max_growth))
+        else:
+            self.batch_size = current
+        if self.batch_size != current:
+            LOG.debug("adapting batch size from %s to %s rows", current, self.batch_size)
+        return self.batch_size
+
+
+def _csv_head(file_path, sample_bytes, min_rows=10, compression=None):
+    """ Reads whole lines from the start of a (possibly compressed) CSV
+    file, until at least `sample_bytes` bytes and `min_rows` rows past the
+    header are read. Returns the lines read, the number of rows past the
+    header and whether the whole file was read.
+    """
+    head = b""
+    complete = False
+    with _open_csv(file_path, compression) as fil:
+        while len(head) < sample_bytes or head.count(b"\n") <= min_rows:
+            block = fil.read(max(sample_bytes, 1 << 12))
+            if not block:
+                complete = True
+                break
+            head += block
+    if not complete:
+        # keep whole lines only
+        lines = head.split(b"\n")[:-1]
+        keep, nbytes = 0, 0
+        for line in lines:
+            keep += 1
+            nbytes += len(line) + 1
+            if nbytes >= sample_bytes and keep > min_rows:
+                break
+        head = b"".join(line + b"\n" for line in lines[:keep])
+    nrows = head.count(b"\n") + (0 if head.endswith(b"\n") or not head else 1)
+    return head, max(nrows - 1, 0), complete
+
+
+def _skip_lines(fil, num_lines, block_size=1 << 20):
+    """ Moves a binary file past its next `num_lines` lines, returns the offset """
+    while num_lines > 0:
+        start = fil.tell()
+        block = fil.read(block_size)
+        if not block:
+            break
+        count = block.count(b"\n")
+        if count < num_lines:
+            num_lines -= count
+            continue
+        pos = -1
+        for _ in range(num_lines):
+            pos = block.index(b"\n", pos + 1)
+        fil.seek(start + pos + 1)
+        num_lines = 0
+    return fil.tell()
+
+
+#
+# Compressed CSV helpers
+#
+
+_COMPRESSION_EXTENSIONS = {"gz": "gzip", "bgz": "gzip", "bz2": "bz2", "zst": "zstd"}
+
+
+def _get_compression(file_path):
+    """ Compression of a file, inferred from its extension (or None) """
+    return _COMPRESSION_EXTENSIONS.get(str(file_path).rsplit(".", 1)[-1].lower(), None)
+
+
+def _open_csv(file_path, compression=None):
+    """ Opens a file as a binary stream, decompressing it on the fly """
+    if compression is None:
+        return open(str(file_path), "rb")
+    return pa.input_stream(str(file_path), compression=compression)
+
+
+def _bgzf_blocks(file_path):
+    """ Returns the `(offset, size, decompressed_size)` of the blocks of a
+    bgzip-compressed file (a series of independent gzip members whose
+    headers record their size), or None if the file is not BGZF
+    """
+    blocks = []
+    offset = 0
+    with open(str(file_path), "rb") as fil:
+        while True:
+            header = fil.read(18)
+            if not header:
+                return blocks
+            # FEXTRA flag set, with a 'BC' subfield holding the block size - 1
+            if len(header) < 18 or header[:4] != b"\x1f\x8b\x08\x04" or header[12:14] != b"BC":
+                return None
+            size = struct.unpack("<H", header[16:18])[0] + 1
+            fil.seek(offset + size - 4)
+            (decompressed,) = struct.unpack("<I", fil.read(4))
+            blocks.append((offset, size, decompressed))
+            offset += size
+
+
+def _zstd_seek_table(file_path):
+    """ Returns the `(offset, size, decompressed_size)` of the frames of a
+    file in the zstd seekable format (independent frames, indexed by a
+    seek table in a trailing skippable frame), or None if there is none
+    """
+    file_size = os.stat(str(file_path)).st_size
+    if file_size < 17:
+        return None
+    with open(str(file_path), "rb") as fil:
+        fil.seek(file_size - 9)
+        num_frames, descriptor, magic = struct.unpack("<IBI", fil.read(9))
+        if magic != 0x8F92EAB1:
+            return None
+        # entries optionally carry a checksum
+        entry_size = 12 if descriptor & 0x80 else 8
+        fil.seek(file_size - 9 - num_frames * entry_size)
+        entries = fil.read(num_frames * entry_size)
+    frames = []
+    offset = 0
+    for i in range(num_frames):
+        size, decompressed = struct.unpack_from("<II", entries, i * entry_size)
+        frames.append((offset, size, decompressed))
+        offset += size
+    return frames
+
+
+def _seekable_blocks(file_path, compression):
+    """ Independently decompressible blocks of a file, or None """
+    if compression == "gzip":
+        return _bgzf_blocks(file_path)
+    if compression == "zstd":
+        return _zstd_seek_table(file_path)
+    return None
+
+
+def _decompressed_size(file_path, compression, blocks=None):
+    """ Size of a compressed file once decompressed, when it is recorded
+    in the file (seekable formats and single-member gzip), or an estimate
+    assuming a typical compression ratio for text
+    """
+    file_size = os.stat(str(file_path)).st_size
+    if blocks is not None:
+        return sum(block[2] for block in blocks)
+    if compression == "gzip" and file_size >= 18:
+        # ISIZE, the size modulo 2**32 of the last member
+        with open(str(file_path), "rb") as fil:
+            fil.seek(file_size - 4)
+            (size,) = struct.unpack("<I", fil.read(4))
+        if size >= file_size:
+            return size
+    return file_size * 4
+
+
+def _group_blocks(blocks, nbytes):
+    """ Groups consecutive blocks into runs of about `nbytes` compressed bytes """
+    group, group_bytes = [], 0
+    for block in blocks:
+        group.append(block)
+        group_bytes += block[1]
+        if group_bytes >= nbytes:
+            yield group
+            group, group_bytes = [], 0
+    if group:
+        yield group
+
+
+def _decompress_blocks(file_path, compression, blocks):
+    """ Decompresses a run of consecutive blocks (see `_seekable_blocks`) """
+    start = blocks[0][0]
+    stop = blocks[-1][0] + blocks[-1][1]
+    with open(str(file_path), "rb") as fil:
+        fil.seek(start)
+        data = fil.read(stop - start)
+    if compression == "gzip":
+        # zlib releases the GIL, so runs are decompressed in parallel
+        return gzip.decompress(data)
+    parts = []
+    for offset, size, decompressed in blocks:
+        frame = data[offset - start : offset - start + size]
+        parts.append(pa.decompress(frame, decompressed, codec=compression, asbytes=True))
+    return b"".join(parts)
+
+
+def _row_aligned(blocks, next_size):
+    """ Re-slices a stream of byte blocks into pieces that end on a newline,
+    of about `next_size()` bytes (or one line, for longer lines)
+    """
+    buf = bytearray()
+    size = max(next_size(), 1)
+    for block in blocks:
+        buf += block
+        while len(buf) >= size:
+            cut = buf.rfind(b"\n", 0, size) + 1 or buf.find(b"\n", size) + 1
+            if not cut:
+                # wait for the end of the line
+                break
+            yield bytes(buf[:cut])
+            del buf[:cut]
+            size = max(next_size(), 1)
+    if buf:
+        yield bytes(buf)
+
+
+def _arrow_type(dtype):
+    """ Arrow type of a numpy (or pandas) dtype, strings of any kind included """
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        # pandas extension types
+        if "str" in str(dtype):
+            return pa.string()
+        raise
+    if dtype.kind in "OUS":
+        return pa.string()
+    return pa.from_numpy_dtype(dtype)
+
+
+def _coalesce_chunks(chunks, batch_size, concat):
+    """ Re-slices a stream of dataframes into chunks of exactly `batch_size`
+    rows (only the last chunk may be smaller). Large inputs are split and
+    small ones are coalesced, so at most one input plus one output chunk
+    are held in memory at any time. `batch_size` may also be a callable
+    returning the size of the next chunk.
+    """
+    next_size = batch_size if callable(batch_size) else lambda: batch_size
+    size = max(next_size(), 1)
+    pending, pending_rows = [], 0
+    for chunk in chunks:
+        offset = 0
+        while pending_rows + len(chunk) - offset >= size:
+            end = offset + size - pending_rows
+            pending.append(chunk.iloc[offset:end])
+            out = concat(pending, axis=0) if len(pending) > 1 else pending[0]
+            yield out.reset_index(drop=True)
+            pending, pending_rows, offset = [], 0, end
+            size = max(next_size(), 1)
+        if offset < len(chunk):
+            pending.append(chunk.iloc[offset:] if offset else chunk)
+            pending_rows += len(chunk) - offset
+    if pending:
+        out = concat(pending, axis=0) if len(pending) > 1 else pending[0]
+        yield out.reset_index(drop=True)
+
+
+_FILTER_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": None,
+    "not in": None,
+}
+
+
+def _normalize_filters(filters):
+    """ Validates a conjunction of `(column, op, value)` predicates """
+    if not filters:
+        return []
+    normalized = []
+    for predicate in filters:
+        if len(predicate) != 3 or predicate[1] not in _FILTER_OPS:
+            raise ValueError(
+                f"Invalid filter {predicate}, expecting (column, op, value) with op in "
+                f"{sorted(_FILTER_OPS)}"
+            )
+        col, op, val = predicate
+        if op in ("in", "not in"):
+            val = list(val)
+        normalized.append((col, op, val))
+    return normalized
+
+
+def _row_group_may_match(statistics, filters):
+    """ Returns False if the (min, max) `statistics` of a row group prove
+    that none of its rows can satisfy all of the `filters`
+    """
+    for col, op, val in filters:
+        if col not in statistics:
+            continue
+        lo, hi = statistics[col]
+        try:
+            if op == "==" and (val < lo or val > hi):
+                return False
+            elif op == "!=" and lo == hi == val:
+                return False
+            elif op == "<" and lo >= val:
+                return False
+            elif op == "<=" and lo > val:
+                return False
+            elif op == ">" and hi <= val:
+                return False
+            elif op == ">=" and hi < val:
+                return False
+            elif op == "in" and all(v < lo or v > hi for v in val):
+                return False
+            elif op == "not in" and lo == hi and lo in val:
+                return False
+        except TypeError:
+            # statistics of a type that can't be compared with the value
+            continue
+    return True
+
+
+def _row_group_statistics(metadata, row_group, columns):
+    """ Collects the footer (min, max) statistics of `columns` in a row group """
+    statistics = {}
+    rg_meta = metadata.row_group(row_group)
+    for i in range(rg_meta.num_columns):
+        col_meta = rg_meta.column(i)
+        name = col_meta.path_in_schema
+        if name not in columns or not col_meta.is_stats_set:
+            continue
+        stats = col_meta.statistics
+        if stats.has_min_max:
+            statistics[name] = (stats.min, stats.max)
+    return statistics
+
+
+def _apply_filters(df, filters):
+    """ Keeps the rows of a cudf or pandas dataframe satisfying all `filters` """
+    mask = None
+    for col, op, val in filters:
+        if op == "in":
+            col_mask = df[col].isin(val)
+        elif op == "not in":
+            col_mask = ~df[col].isin(val)
+        else:
+            col_mask = _FILTER_OPS[op](df[col], val)
+        mask = col_mask if mask is None else mask & col_mask
+    if mask is None:
+        return df
+    return df[mask].reset_index(drop=True)
+
+
+def _abspath(path):
+    return os.path.abspath(str(path))
+
+
+def _shared_metadata_file(paths):
+    """ The `_metadata` file of the directory holding all the Parquet `paths`, if any """
+    dirs = {os.path.dirname(_abspath(path)) for path in paths}
+    if len(dirs) != 1 or not all(_is_parquet(path) for path in paths):
+        return None
+    metadata_path = os.path.join(dirs.pop(), "_metadata")
+    return metadata_path if os.path.exists(metadata_path) else None
+
+
+def _row_group_ranges(row_groups):
+    """ min/max of the integer columns of Parquet `row_groups` (footer
+    metadata), from their statistics. Columns missing statistics in any
+    row group map to None.
+    """
+    ranges = {}
+    for row_group in row_groups:
+        for i in range(row_group.num_columns):
+            column = row_group.column(i)
+            name = column.path_in_schema
+            if column.physical_type not in ("INT32", "INT64"):
+                continue
+            stats = column.statistics
+            if name in ranges and ranges[name] is None:
+                continue
+            if stats is None or not stats.has_min_max:
+                ranges[name] = None
+            elif name in ranges:
+                low, high = ranges[name]
+                ranges[name] = [min(low, stats.min), max(high, stats.max)]
+            else:
+                ranges[name] = [stats.min, stats.max]
+    return ranges
+
+
+def _is_parquet(file_path, engine=None):
+    return (engine or str(file_path).split(".")[-1]) == "parquet"
+
+
+def _infer_engine(file_path):
+    """ Format of a file, from its extension """
+    # the format of compressed files is in the extension before last
+    extensions = str(file_path).split(".")
+    if _get_compression(file_path) and len(extensions) > 2:
+        extensions.pop()
+    return extensions[-1]
+
+
+def _file_num_rows(file_path, engine=None, metadata_cache=None, **kwargs):
+    """ Number of rows of a file, read from its metadata: the footer (or
+    the MetadataCache) of Parquet files, the record batches of Arrow files
+    and the newline index of uncompressed CSV files. None if it cannot be
+    known without reading the data.
+    """
+    engine = engine or _infer_engine(file_path)
+    if kwargs.get("filters"):
+        return None
+    if engine == "parquet":
+        if metadata_cache is not None:
+            return metadata_cache.get(file_path)["num_rows"]
+        return pq.read_metadata(str(file_path)).num_rows
+    if engine in ("arrow", "feather"):
+        with pa.memory_map(str(file_path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    if engine in ("csv", "tsv"):
+        compression = kwargs.get("compression", "infer")
+        if compression == "infer":
+            compression = _get_compression(file_path)
+        if compression is None:
+            return CSVIndex.load(file_path).num_rows
+    return None
+
+
+def _assign_shards(weights, world_size, seed=None):
+    """ Returns the shard of every unit of `weights`, each going to the least
+    loaded shard, by decreasing weight or in an order shuffled by `seed`.
+    """
+    if seed is None:
+        order = sorted(range(len(weights)), key=lambda i: -weights[i])
+    else:
+        order = list(range(len(weights)))
+        random.Random(seed).shuffle(order)
+    loads = [(0, shard) for shard in range(world_size)]
+    shards = [None] * len(weights)
+    for i in order:
+        load, shard = heapq.heappop(loads)
+        shards[i] = shard
+        heapq.heappush(loads, (load + weights[i], shard))
+    return shards
+
+
+def _get_read_engine(engine, file_path, device="gpu", **kwargs):
+    LOG.debug("opening '%s' as %s (device=%s)", file_path, engine, device)
     if engine is None:
-        engine = file_path.split(".")[-1]
+        engine = _infer_engine(file_path)
     if not isinstance(engine, str):
         raise TypeError("Expecting engine as string type.")
+    if engine == "tsv":
+        engine = "csv"
+        kwargs["sep"] = kwargs.get("sep", None) or "\t"
+    if device not in ("gpu", "cpu"):
+        raise ValueError("Unrecognized device, expecting 'gpu' or 'cpu'.")
+    if device == "gpu" and cudf is None:
+        raise ImportError("cudf is required to read with device='gpu', use device='cpu'.")
 
     if engine == "csv":
+        if device == "cpu":
+            return CPUCSVFileReader(file_path, **kwargs)
         return CSVFileReader(file_path, **kwargs)
     elif engine == "parquet":
+        if device == "cpu":
+            return CPUPQFileReader(file_path, **kwargs)
         return PQFileReader(file_path, **kwargs)
+    elif engine in ("arrow", "feather"):
+        if device == "cpu":
+            return CPUArrowFileReader(file_path, **kwargs)
+        return ArrowFileReader(file_path, **kwargs)
     else:
         raise ValueError("Unrecognized read engine.")
 
@@ -62,15 +733,36 @@ def _get_read_engine(engine, file_path, **kwargs):
 
 
 class GPUFileReader:
+    device = "gpu"
+
     def __init__(
-        self, file_path, gpu_memory_frac, batch_size, row_size=None, columns=None, **kwargs
+        self,
+        file_path,
+        gpu_memory_frac,
+        batch_size,
+        row_size=None,
+        columns=None,
+        filters=None,
+        **kwargs,
     ):
         """ GPUFileReader Constructor
         """
         self.file_path = file_path
         self.row_size = row_size
+        # readers measure the row size on a sample unless it is given
+        self.row_size_estimate = RowSizeEstimate(row_size) if row_size else None
+        self.sample_rows = kwargs.get("sample_rows", 10000)
+        self.sample_bytes = kwargs.get("sample_bytes", 1 << 16)
         self.columns = columns
+        self.filters = _normalize_filters(filters)
+        self.batch_controller = kwargs.get("batch_controller", None)
+        # subset of the row groups to read (for Parquet files)
+        self.shard_row_groups = kwargs.get("row_groups", None)
         self.intialize_reader(gpu_memory_frac, batch_size, **kwargs)
+        if self.batch_controller is not None and self.batch_controller.batch_size is None:
+            # start from the row size estimated on a sample
+            target = self.batch_controller.target_memory
+            self.batch_controller.batch_size = max(int(target / self.row_size_estimate.upper), 1)
 
     def intialize_reader(self, **kwargs):
         """ Define necessary file statistics and properties for reader
@@ -82,6 +774,13 @@ class GPUFileReader:
         """
         raise NotImplementedError()
 
+    def iter_with_offsets(self):
+        """ Yields the chunks along with the byte offset in the file that the
+        next chunk starts at, to resume reading from (None if unknown)
+        """
+        for chunk in self:
+            yield None, chunk
+
     def __len__(self):
         """ Returns the number of dataframe chunks in the file """
         raise NotImplementedError()
@@ -90,6 +789,67 @@ class GPUFileReader:
     def estimated_row_size(self):
         return self.row_size
 
+    def next_batch_size(self):
+        """ Size of the next read (in the units of `batch_size`), as
+        steered by `batch_controller` when reading adaptively
+        """
+        if self.batch_controller is None:
+            return self.batch_size
+        return self.batch_controller.batch_size
+
+    @property
+    def row_size_interval(self):
+        """ 95% confidence interval of `estimated_row_size` """
+        if self.row_size_estimate is None:
+            return (self.row_size, self.row_size)
+        return self.row_size_estimate.interval
+
+    def set_row_size_estimate(self, estimate):
+        self.row_size_estimate = estimate
+        self.row_size = estimate.mean
+        LOG.debug("estimated row size of %s: %s", self.file_path, estimate)
+
+    @property
+    def read_columns(self):
+        """ Projected columns, plus the filtered columns outside the projection """
+        if not self.columns or not self.filters:
+            return self.columns
+        extra = [col for col, _, _ in self.filters if col not in self.columns]
+        return self.columns + list(dict.fromkeys(extra))
+
+    def apply_filters(self, chunk):
+        """ Drops the rows of a decoded chunk that don't satisfy `filters` """
+        if not self.filters:
+            return chunk
+        chunk = _apply_filters(chunk, self.filters)
+        if self.columns:
+            chunk = chunk[self.columns]
+        return chunk
+
+    def select_row_groups(self, metadata):
+        """ Indices of the row groups (of `row_groups`, if given) whose
+        footer statistics may satisfy `filters`
+        """
+        if self.shard_row_groups is not None:
+            candidates = list(self.shard_row_groups)
+        else:
+            candidates = list(range(metadata.num_row_groups))
+        if not self.filters:
+            return candidates
+        filtered = {col for col, _, _ in self.filters}
+        row_groups = [
+            rg
+            for rg in candidates
+            if _row_group_may_match(_row_group_statistics(metadata, rg, filtered), self.filters)
+        ]
+        LOG.debug(
+            "skipping %s of %s row groups in %s",
+            len(candidates) - len(row_groups),
+            len(candidates),
+            self.file_path,
+        )
+        return row_groups
+
 
 #
 # GPUFileReader Sub Classes (Parquet and CSV Engines)
@@ -100,37 +860,66 @@ class PQFileReader(GPUFileReader):
     def intialize_reader(self, gpu_memory_frac, batch_size, **kwargs):
         self.reader = cudf.read_parquet
 
-        # Read Parquet-file metadata
-        (self.num_rows, self.num_row_groups, columns,) = cudf.io.read_parquet_metadata(
-            self.file_path
-        )
-        # Use first row-group metadata to estimate memory-rqs
+        metadata_cache = kwargs.get("metadata_cache", None)
+        if metadata_cache is not None:
+            # Use the cached footer and row size
+            entry = metadata_cache.get(self.file_path)
+            self.num_rows = entry["num_rows"]
+            self.num_row_groups = len(entry["row_groups"])
+            if self.row_size_estimate is None:
+                self.set_row_size_estimate(
+                    metadata_cache.row_size_estimate(self.file_path, self.read_columns)
+                )
+        else:
+            # Read Parquet-file metadata
+            (self.num_rows, self.num_row_groups, columns,) = cudf.io.read_parquet_metadata(
+                self.file_path
+            )
+        # Measure the decoded size of (at most `sample_rows` of) the first
+        # row group to estimate memory-rqs
         # NOTE: We could also use parquet metadata here, but
         #       `total_uncompressed_size` for each column is
         #       not representative of dataframe size for
         #       strings/categoricals (parquet only stores uniques)
-        self.row_size = self.row_size or 0
-        if self.num_rows > 0 and self.row_size == 0:
-            for col in self.reader(self.file_path, num_rows=1)._columns:
-                # removed logic for max in first x rows, it was
-                # causing infinite loops for our customers on their datasets.
-                self.row_size += col.dtype.itemsize
+        if self.row_size_estimate is None:
+            metadata = pq.ParquetFile(self.file_path).metadata
+            if self.num_rows > 0 and self.num_row_groups > 0:
+                sample_rows = min(metadata.row_group(0).num_rows, self.sample_rows)
+                sample = self.reader(
+                    self.file_path,
+                    num_rows=max(sample_rows, 1),
+                    engine="cudf",
+                    columns=self.read_columns,
+                )
+                self.set_row_size_estimate(_estimate_row_size(sample))
+                sample = None
+            else:
+                self.set_row_size_estimate(RowSizeEstimate(0))
+        # Skip the row groups that can't satisfy the filters
+        if self.filters:
+            self.row_groups = self.select_row_groups(pq.ParquetFile(self.file_path).metadata)
+        elif self.shard_row_groups is not None:
+            self.row_groups = list(self.shard_row_groups)
+        else:
+            self.row_groups = list(range(self.num_row_groups))
+
         # Check if we are using row groups
         self.use_row_groups = kwargs.get("use_row_groups", None)
         self.row_group_batch = 1
-        self.next_row_group = 0
 
         # Determine batch size if needed
         if batch_size and not self.use_row_groups:
             self.batch_size = batch_size
             self.use_row_groups = False
         else:
-            # Use row size to calculate "allowable" batch size
-            gpu_memory_batch = _allowable_batch_size(gpu_memory_frac, self.row_size)
-            self.batch_size = min(gpu_memory_batch, self.num_rows)
+            # Use (the upper bound of) the row size to calculate "allowable" batch size
+            gpu_memory_batch = _allowable_batch_size(
+                gpu_memory_frac, self.row_size_estimate.upper, self.device
+            )
+            self.batch_size = max(min(gpu_memory_batch, self.num_rows), 1)
 
             # Use row-groups if they meet memory constraints
-            rg_size = int(self.num_rows / self.num_row_groups)
+            rg_size = int(self.num_rows / max(self.num_row_groups, 1))
             if (self.use_row_groups is None) and (rg_size <= gpu_memory_batch):
                 self.use_row_groups = True
             elif self.use_row_groups is None:
@@ -138,39 +927,82 @@ class PQFileReader(GPUFileReader):
 
             # Determine row-groups per batch
             if self.use_row_groups:
-                self.row_group_batch = max(int(gpu_memory_batch / rg_size), 1)
+                self.row_group_batch = max(int(gpu_memory_batch / max(rg_size, 1)), 1)
 
     def __len__(self):
-        return int((self.num_rows + self.batch_size - 1) // self.batch_size)
+        # NOTE: With `filters` this is an upper bound, since the
+        #       number of rows that survive is only known after reading
+        if self.use_row_groups:
+            return int((len(self.row_groups) + self.row_group_batch - 1) // self.row_group_batch)
+        num_rows = self.num_rows
+        if len(self.row_groups) < self.num_row_groups:
+            rg_size = self.num_rows / max(self.num_row_groups, 1)
+            num_rows = int(rg_size * len(self.row_groups))
+        return int((num_rows + self.batch_size - 1) // self.batch_size)
 
     def __iter__(self):
-        for nskip in range(0, self.num_rows, self.batch_size):
-            # not using row groups because concat uses up double memory
-            # making iterator unable to use selected gpu memory fraction.
-            batch = min(self.batch_size, self.num_rows - nskip)
-            LOG.debug(
-                "loading chunk from %s, (skip_rows=%s, num_rows=%s)", self.file_path, nskip, batch
-            )
-            gdf = self.reader(
-                self.file_path, num_rows=batch, skip_rows=nskip, engine="cudf", columns=self.columns
-            )
-            gdf.reset_index(drop=True, inplace=True)
+        # Every row group is decoded exactly once (by index), so the time
+        # to read a file is linear in its size regardless of the batch size
+        if self.use_row_groups:
+            chunks = self._iter_row_group_batches()
+        else:
+            row_groups = (self.apply_filters(self._read_row_group(rg)) for rg in self.row_groups)
+            chunks = _coalesce_chunks(row_groups, self.next_batch_size, cudf.concat)
+        for gdf in chunks:
             yield gdf
             gdf = None
 
+    def _read_row_group(self, row_group):
+        LOG.debug("loading row group %s from %s", row_group, self.file_path)
+        gdf = self.reader(
+            self.file_path, row_group=row_group, engine="cudf", columns=self.read_columns
+        )
+        gdf.reset_index(drop=True, inplace=True)
+        return gdf
+
+    def _iter_row_group_batches(self):
+        # `row_group_batch` was chosen so that this many row
+        # groups fit the memory target once concatenated
+        start = 0
+        while start < len(self.row_groups):
+            batch = self.row_groups[start : start + self.next_row_group_batch()]
+            start += len(batch)
+            parts = [self._read_row_group(rg) for rg in batch]
+            gdf = cudf.concat(parts, axis=0) if len(parts) > 1 else parts[0]
+            parts = None
+            gdf.reset_index(drop=True, inplace=True)
+            yield self.apply_filters(gdf)
+
+    def next_row_group_batch(self):
+        if self.batch_controller is None:
+            return self.row_group_batch
+        rg_size = self.num_rows / max(self.num_row_groups, 1)
+        return max(int(self.next_batch_size() / max(rg_size, 1)), 1)
+
 
 class CSVFileReader(GPUFileReader):
     def intialize_reader(self, gpu_memory_frac, batch_size, **kwargs):
         self.reader = cudf.read_csv
-        # Count rows and determine column names
-        estimate_row_size = False
-        if self.row_size is None:
-            self.row_size = 0
-            estimate_row_size = True
         self.offset = 0
         self.file_bytes = os.stat(str(self.file_path)).st_size
+        self.decode_workers = kwargs.get("decode_workers", 1)
+        compression = kwargs.get("compression", "infer")
+        if compression == "infer":
+            compression = _get_compression(self.file_path)
+        self.compression = compression
+        self.block_bytes = kwargs.get("block_bytes", 1 << 22)
+        self.blocks = None
+        self.index = None
+        # where a previous read stopped (see `iter_with_offsets`)
+        self.start_offset = kwargs.get("start_offset", None) or 0
+        if self.compression and kwargs.get("use_index", False):
+            LOG.warning("compressed file %s can't be indexed, it is streamed", self.file_path)
+        elif kwargs.get("use_index", False):
+            self.index = CSVIndex.load(
+                self.file_path, block_size=kwargs.get("index_block_size", CSVIndex.block_size)
+            )
 
-        # Use first row to estimate memory-reqs
+        # Sample the first few KB to determine column names, types and memory-reqs
         names = kwargs.get("names", None)
         dtype = kwargs.get("dtype", None)
         # default csv delim is ","
@@ -178,59 +1010,1192 @@ class CSVFileReader(GPUFileReader):
         self.sep = sep
         self.names = []
         dtype_inf = {}
-        nrows = 10
-        head = "".join(islice(open(self.file_path), nrows))
-        snippet = self.reader(
-            io.StringIO(head), nrows=nrows, names=names, dtype=dtype, sep=sep, header=0
-        )
+        sniff_key = [list(names) if names else None, sep, self.read_columns, self.sample_bytes]
+        sniffed = self.index.sniff if self.index is not None and not dtype else None
         self.inferred_names = not self.names
-        if self.file_bytes > 0:
-            for i, col in enumerate(snippet.columns):
-                if names:
-                    name = names[i]
+        # nothing to sniff when the schema (and row size) of the file is known
+        declared = (
+            names and dtype and all(name in dtype for name in names) and self.row_size_estimate
+        )
+        if sniffed and sniffed["key"] == sniff_key:
+            # the sidecar index caches the result of sniffing the file
+            self.names = sniffed["names"]
+            dtype_inf = {name: np.dtype(typ) for name, typ in sniffed["dtypes"].items()}
+            estimate = RowSizeEstimate(*sniffed["row_size"])
+            self.file_row_bytes = sniffed["file_row_bytes"]
+        else:
+            head, nrows, complete = _csv_head(
+                self.file_path, self.sample_bytes, compression=self.compression
+            )
+            if self.compression:
+                # sizes are in decompressed bytes, byte ranges can't be read
+                self.blocks = _seekable_blocks(self.file_path, self.compression)
+                if complete:
+                    self.file_bytes = len(head)
                 else:
-                    name = col
-                self.names.append(name)
-            for i, col in enumerate(snippet._columns):
-                if estimate_row_size:
-                    self.row_size += col.dtype.itemsize
-                dtype_inf[self.names[i]] = col.dtype
-        self.dtype = dtype or dtype_inf
-
-        # Determine batch size if needed
+                    self.file_bytes = _decompressed_size(
+                        self.file_path, self.compression, self.blocks
+                    )
+            if declared:
+                self.names = list(names)
+                estimate = self.row_size_estimate
+            else:
+                snippet = self.reader(
+                    io.BytesIO(head), nrows=nrows, names=names, dtype=dtype, sep=sep, header=0
+                )
+                if head:
+                    for i, col in enumerate(snippet.columns):
+                        if names:
+                            name = names[i]
+                        else:
+                            name = col
+                        self.names.append(name)
+                    for i, col in enumerate(snippet._columns):
+                        dtype_inf[self.names[i]] = col.dtype
+                    snippet.columns = self.names
+                if self.read_columns and self.names:
+                    snippet = snippet[self.read_columns]
+                estimate = _estimate_row_size(snippet)
+            # average size of a row in the file, to turn rows into byte ranges
+            header_bytes = head.index(b"\n") + 1 if b"\n" in head else len(head)
+            self.file_row_bytes = max((len(head) - header_bytes) / max(nrows, 1), 1)
+            if self.index is not None and not dtype:
+                self.index.sniff = {
+                    "key": sniff_key,
+                    "names": self.names,
+                    "dtypes": {name: str(typ) for name, typ in dtype_inf.items()},
+                    "row_size": [estimate.mean, estimate.std, estimate.num_samples],
+                    "file_row_bytes": self.file_row_bytes,
+                }
+                self.index.save()
+        self.dtype = dict(dtype_inf, **(dtype or {}))
+        if self.row_size_estimate is None:
+            self.set_row_size_estimate(estimate)
+
+        # Determine batch size (in bytes of the file) if needed
         if batch_size:
-            self.batch_size = batch_size * self.row_size
+            self.batch_size = batch_size * self.file_row_bytes
         else:
-            free_mem = rmm.get_info().free
-            self.batch_size = free_mem * gpu_memory_frac
-        self.num_chunks = int((self.file_bytes + self.batch_size - 1) // self.batch_size)
+            free_mem = _free_memory(self.device)
+            # every decode worker holds a chunk
+            memory_batch = free_mem * gpu_memory_frac / max(self.decode_workers, 1)
+            self.batch_size = memory_batch / self.row_size_estimate.upper * self.file_row_bytes
+        self.batch_size = int(max(self.batch_size, 1))
+
+        if self.index is not None:
+            self.byte_ranges = self.index.byte_ranges(self.batch_size)
+            self.num_chunks = len(self.byte_ranges)
+            self.num_rows = self.index.num_rows
+        else:
+            self.num_chunks = int((self.file_bytes + self.batch_size - 1) // self.batch_size)
 
     def __len__(self):
         return self.num_chunks
 
+    def next_batch_size(self):
+        if self.batch_controller is None:
+            return self.batch_size
+        return max(int(self.batch_controller.batch_size * self.file_row_bytes), 1)
+
+    def __iter__(self):
+        for _, chunk in self.iter_with_offsets():
+            yield chunk
+            chunk = None
+
+    def iter_with_offsets(self):
+        if self.compression:
+            chunks = ((None, chunk) for chunk in self._iter_compressed())
+        elif self.index is None:
+            chunks = self._iter_byte_ranges()
+        else:
+            byte_ranges = self.byte_ranges
+            if self.batch_controller is not None or self.start_offset:
+                byte_ranges = self.index.iter_byte_ranges(self.next_batch_size, self.start_offset)
+
+            def read(byte_range):
+                return byte_range[1], self._read_aligned_range(byte_range)
+
+            if self.decode_workers > 1:
+                # ranges are newline-aligned, so they can be decoded independently
+                chunks = _map_ordered(read, byte_ranges, self.decode_workers)
+            else:
+                chunks = (read(byte_range) for byte_range in byte_ranges)
+        for offset, chunk in chunks:
+            yield offset, chunk
+            chunk = None
+
+    def _iter_byte_ranges(self):
+        offset = self.start_offset
+        while offset < self.file_bytes:
+            size = self.next_batch_size()
+            chunk = self._read_byte_range(offset, size)
+            offset += size
+            yield offset, chunk
+            chunk = None
+
+    def _read_byte_range(self, offset, size):
+        LOG.debug("loading chunk from %s, byte_range=%s", self.file_path, (offset, size))
+        chunk = self.reader(
+            self.file_path,
+            byte_range=(offset, size),
+            names=self.names,
+            header=0 if offset == 0 and self.inferred_names else None,
+            sep=self.sep,
+            # only materialize the projected (and filtered) columns
+            usecols=self.read_columns,
+        )
+        return self._finalize_chunk(chunk)
+
+    def _read_aligned_range(self, byte_range):
+        start, stop = byte_range
+        LOG.debug("loading chunk from %s, aligned range=%s", self.file_path, byte_range)
+        with open(self.file_path, "rb") as fil:
+            fil.seek(start)
+            data = fil.read(stop - start)
+        return self._parse_rows(data)
+
+    def _parse_rows(self, data):
+        # `data` holds whole rows, without the header
+        chunk = self.reader(
+            io.BytesIO(data), names=self.names, header=None, sep=self.sep, usecols=self.read_columns
+        )
+        return self._finalize_chunk(chunk)
+
+    def _iter_compressed(self):
+        pieces = self._iter_decompressed_rows()
+        if self.decode_workers > 1:
+            return _map_ordered(self._parse_rows, pieces, self.decode_workers)
+        return (self._parse_rows(piece) for piece in pieces)
+
+    def _iter_decompressed_rows(self):
+        """ Decompresses the file into row-aligned pieces of `next_batch_size()`
+        bytes, in parallel for files made of independent blocks (BGZF, or
+        zstd in the seekable format) and as a single stream otherwise
+        """
+        if self.blocks is not None and self.decode_workers > 1:
+            decompress = functools.partial(_decompress_blocks, self.file_path, self.compression)
+            groups = _group_blocks(self.blocks, self.block_bytes)
+            blocks = _map_ordered(decompress, groups, self.decode_workers)
+        else:
+            blocks = self._stream_decompressed()
+        pieces = _row_aligned(blocks, self.next_batch_size)
+        # the header line was consumed when sniffing
+        first = next(pieces, b"")
+        first = first[first.find(b"\n") + 1 :] if b"\n" in first else b""
+        if first:
+            yield first
+        yield from pieces
+
+    def _stream_decompressed(self):
+        LOG.debug("streaming %s (compression=%s)", self.file_path, self.compression)
+        with _open_csv(self.file_path, self.compression) as fil:
+            while True:
+                block = fil.read(self.block_bytes)
+                if not block:
+                    return
+                yield block
+
+    def _finalize_chunk(self, chunk):
+        if self.columns:
+            for col in self.read_columns:
+                chunk[col] = chunk[col].astype(self.dtype[col])
+            chunk = chunk[self.read_columns]
+        return self.apply_filters(chunk)
+
+
+def _map_ordered(func, items, num_workers):
+    """ Applies `func` to `items` on a pool of `num_workers` threads, yielding
+    the results in order with at most `num_workers` of them pending
+    """
+    with ThreadPoolExecutor(num_workers) as pool:
+        pending = collections.deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= num_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+#
+# CSVIndex (Newline-aligned sidecar index for CSV files)
+#
+
+
+class CSVIndex:
+    """
+    Row-aligned byte offsets and row counts of a CSV file, saved next to
+    it (as `<file_path>.nvtidx`) until the file's size or mtime changes.
+
+    Parameters
+    -----------
+    file_path : str
+        path of the CSV file
+    header_bytes : int
+        size of the first line, which readers always consume as a header
+    offsets : list of int
+        start offsets of the indexed segments, followed by the file size
+    rows : list of int
+        number of rows in each segment
+    size : int
+    mtime : float
+    sniff : dict, default None
+        cached result of sniffing the column names and types
+    """
+
+    suffix = ".nvtidx"
+    version = 1
+    # approximate size of the indexed segments (the chunk granularity)
+    block_size = 1 << 20
+    _cache = {}
+
+    def __init__(self, file_path, header_bytes, offsets, rows, size, mtime, sniff=None):
+        self.file_path = file_path
+        self.header_bytes = header_bytes
+        self.offsets = offsets
+        self.rows = rows
+        self.size = size
+        self.mtime = mtime
+        self.sniff = sniff
+
+    @property
+    def num_rows(self):
+        return sum(self.rows)
+
+    @property
+    def index_path(self):
+        return str(self.file_path) + self.suffix
+
+    @classmethod
+    def load(cls, file_path, block_size=None, save=True):
+        """ Returns the index of `file_path`, from memory, from its sidecar
+        file or by scanning the file (in that order)
+        """
+        stat = os.stat(str(file_path))
+        key = (str(file_path), stat.st_size, stat.st_mtime)
+        index = cls._cache.get(key, None)
+        if index is None:
+            index = cls._read_sidecar(file_path, stat)
+        if index is None:
+            index = cls.build(file_path, block_size=block_size)
+            if save:
+                index.save()
+        cls._cache[key] = index
+        return index
+
+    @classmethod
+    def _read_sidecar(cls, file_path, stat):
+        try:
+            with open(str(file_path) + cls.suffix) as fil:
+                meta = json.load(fil)
+        except (OSError, ValueError):
+            return None
+        if (
+            meta.get("version") != cls.version
+            or meta.get("size") != stat.st_size
+            or meta.get("mtime") != stat.st_mtime
+        ):
+            LOG.debug("ignoring stale csv index for %s", file_path)
+            return None
+        meta.pop("version")
+        return cls(file_path, **meta)
+
+    @classmethod
+    def build(cls, file_path, block_size=None, scan_size=1 << 24):
+        """ Scans `file_path` once, recording a row boundary every `block_size` bytes
+        """
+        block_size = block_size or cls.block_size
+        stat = os.stat(str(file_path))
+        offsets, rows = [], []
+        with open(str(file_path), "rb") as fil:
+            header_bytes = len(fil.readline())
+            buf_start = header_bytes
+            offsets.append(header_bytes)
+            next_split = header_bytes + block_size
+            seg_rows = 0
+            last = b"\n"
+            while True:
+                buf = fil.read(scan_size)
+                if not buf:
+                    break
+                pos = 0
+                while buf_start + len(buf) > next_split:
+                    end = buf.find(b"\n", max(next_split - buf_start, pos))
+                    if end < 0:
+                        break
+                    seg_rows += buf.count(b"\n", pos, end + 1)
+                    offsets.append(buf_start + end + 1)
+                    rows.append(seg_rows)
+                    seg_rows = 0
+                    pos = end + 1
+                    next_split = buf_start + pos + block_size
+                seg_rows += buf.count(b"\n", pos)
+                buf_start += len(buf)
+                last = buf[-1:]
+        if offsets[-1] < buf_start:
+            # the last line may not be terminated
+            if last != b"\n":
+                seg_rows += 1
+            offsets.append(buf_start)
+            rows.append(seg_rows)
+        return cls(file_path, header_bytes, offsets, rows, stat.st_size, stat.st_mtime)
+
+    def save(self):
+        meta = {
+            "version": self.version,
+            "header_bytes": self.header_bytes,
+            "offsets": self.offsets,
+            "rows": self.rows,
+            "size": self.size,
+            "mtime": self.mtime,
+            "sniff": self.sniff,
+        }
+        try:
+            with open(self.index_path, "w") as fil:
+                json.dump(meta, fil)
+        except OSError as exc:
+            LOG.warning("unable to save csv index for %s: %s", self.file_path, exc)
+
+    def byte_ranges(self, batch_size):
+        """ Groups consecutive segments into newline-aligned `(start, stop)`
+        byte ranges of at most `batch_size` bytes (or one segment)
+        """
+        return list(self.iter_byte_ranges(lambda: batch_size))
+
+    def iter_byte_ranges(self, next_size, start=None):
+        """ Lazy variant of `byte_ranges`, calling `next_size()` to get
+        the size of every range when it is planned, from the `start`
+        offset (a segment boundary) on if given
+        """
+        start = max(self.offsets[0], start or 0)
+        stops = [offset for offset in self.offsets[1:] if offset > start]
+        batch_size = next_size()
+        for stop, next_stop in zip(stops, stops[1:] + [None]):
+            if next_stop is None or next_stop - start > batch_size:
+                yield (start, stop)
+                start = stop
+                batch_size = next_size()
+
+
+#
+# MetadataCache (Per-file metadata of Parquet datasets)
+#
+
+
+class MetadataCache:
+    """
+    Per-file metadata of Parquet files (row groups, schema, integer ranges
+    and row size), so that readers skip their footers. Entries are keyed by
+    the size and mtime of their file and can be saved to a JSON file.
+
+    Parameters
+    -----------
+    paths : list of str, default None
+        files to scan up front
+    device : {'gpu', 'cpu'}, default 'gpu'
+        device the row sizes are measured for
+    num_workers : int, default 8
+        number of threads scanning files
+    save : bool, default False
+        if True, the cache is saved to `cache_path` whenever files are scanned
+    cache_path : str, default None
+        JSON file holding the cache, by default `.nvt_metadata.json` in the
+        deepest directory shared by `paths`. Loaded if it exists.
+    sample_rows : int, default 10000
+    """
+
+    file_name = ".nvt_metadata.json"
+    version = 2
+
+    def __init__(
+        self,
+        paths=None,
+        device="gpu",
+        num_workers=8,
+        save=False,
+        cache_path=None,
+        sample_rows=10000,
+    ):
+        paths = [_abspath(path) for path in paths or []]
+        self.device = device
+        self.num_workers = num_workers
+        self.save_on_update = save
+        self.sample_rows = sample_rows
+        if cache_path is None and paths:
+            dirs = [os.path.dirname(os.path.abspath(path)) for path in paths]
+            cache_path = os.path.join(os.path.commonpath(dirs), self.file_name)
+        self.cache_path = cache_path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+        if paths:
+            self.update(paths)
+
+    def load(self):
+        try:
+            with open(self.cache_path) as fil:
+                meta = json.load(fil)
+        except (OSError, ValueError) as exc:
+            LOG.warning("ignoring metadata cache %s: %s", self.cache_path, exc)
+            return
+        if meta.get("version") == self.version and meta.get("device") == self.device:
+            self.entries.update(meta["entries"])
+
+    def save(self):
+        meta = {"version": self.version, "device": self.device, "entries": self.entries}
+        try:
+            with open(self.cache_path, "w") as fil:
+                json.dump(meta, fil)
+        except OSError as exc:
+            LOG.warning("unable to save metadata cache %s: %s", self.cache_path, exc)
+
+    def is_valid(self, path):
+        entry = self.entries.get(_abspath(path), None)
+        if entry is None:
+            return False
+        stat = os.stat(str(path))
+        return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def update(self, paths):
+        """ Scans the files of `paths` that are missing from the cache, or stale """
+        stale = list(dict.fromkeys(_abspath(path) for path in paths if not self.is_valid(path)))
+        if not stale:
+            return
+        LOG.debug("scanning the metadata of %s files", len(stale))
+        if len(stale) > 1 and self.num_workers > 1:
+            with ThreadPoolExecutor(min(self.num_workers, len(stale))) as pool:
+                entries = list(pool.map(self._scan, stale))
+        else:
+            entries = [self._scan(path) for path in stale]
+        with self._lock:
+            self.entries.update(zip(stale, entries))
+            if self.save_on_update and self.cache_path:
+                self.save()
+
+    def get(self, path):
+        """ Returns the entry of a file, scanning it if needed """
+        if not self.is_valid(path):
+            self.update([path])
+        return self.entries[_abspath(path)]
+
+    @classmethod
+    def from_metadata_file(cls, metadata_path, device="gpu", sample_rows=10000, **kwargs):
+        """ Plans a dataset from the consolidated `_metadata` file written by
+        DatasetWriter: row groups, rows and bytes of every file are read from
+        it, and the row size is measured once on the first file, so no other
+        footer is opened. Files modified after `_metadata` are left out of
+        the cache (they are scanned when needed).
+        """
+        cache = cls(device=device, sample_rows=sample_rows, **kwargs)
+        metadata = pq.read_metadata(metadata_path)
+        base = os.path.dirname(_abspath(metadata_path))
+        metadata_mtime = os.stat(str(metadata_path)).st_mtime
+        schema = {field.name: str(field.type) for field in metadata.schema.to_arrow_schema()}
+
+        row_groups = {}
+        for rg in range(metadata.num_row_groups):
+            row_group = metadata.row_group(rg)
+            path = os.path.join(base, row_group.column(0).file_path)
+            row_groups.setdefault(path, []).append(row_group)
+        row_size = None
+        for path, groups in row_groups.items():
+            if not os.path.exists(path):
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > metadata_mtime:
+                LOG.debug("%s was modified after %s", path, metadata_path)
+                continue
+            entry = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "num_rows": sum(group.num_rows for group in groups),
+                "row_groups": [group.num_rows for group in groups],
+                "row_group_bytes": [group.total_byte_size for group in groups],
+                "schema": schema,
+                "ranges": _row_group_ranges(groups),
+            }
+            if row_size is None:
+                # the files share a schema, one sample sizes all of them
+                row_size = cache._scan(path)["row_size"]
+            entry["row_size"] = row_size
+            cache.entries[path] = entry
+        LOG.debug("planned %s files from %s", len(cache.entries), metadata_path)
+        return cache
+
+    @property
+    def paths(self):
+        return list(self.entries)
+
+    def num_rows(self, paths=None):
+        paths = self.entries if paths is None else paths
+        return sum(self.get(path)["num_rows"] for path in paths)
+
+    def num_bytes(self, paths=None):
+        """ Total (uncompressed) size of the row groups of `paths` """
+        paths = self.entries if paths is None else paths
+        return sum(sum(self.get(path)["row_group_bytes"]) for path in paths)
+
+    def column_ranges(self, paths=None):
+        """ min/max of the integer columns over all the files of `paths`,
+        for the columns with statistics in every file
+        """
+        paths = self.entries if paths is None else paths
+        ranges = None
+        for path in paths:
+            file_ranges = self.get(path)["ranges"]
+            if ranges is None:
+                ranges = {col: rng for col, rng in file_ranges.items() if rng}
+                continue
+            for col, rng in list(ranges.items()):
+                other = file_ranges.get(col, None)
+                if not other:
+                    del ranges[col]
+                else:
+                    ranges[col] = [min(rng[0], other[0]), max(rng[1], other[1])]
+        return {col: tuple(rng) for col, rng in (ranges or {}).items()}
+
+    def row_size_estimate(self, path, columns=None):
+        """ Estimated size of the decoded rows of a file (with `columns`) """
+        row_size = self.get(path)["row_size"]
+        return RowSizeEstimate.from_columns(row_size["columns"], row_size["num_samples"], columns)
+
+    def _scan(self, path):
+        stat = os.stat(path)
+        pq_file = pq.ParquetFile(path)
+        metadata = pq_file.metadata
+        row_groups = [metadata.row_group(rg) for rg in range(metadata.num_row_groups)]
+        schema = pq_file.schema_arrow
+        entry = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "num_rows": metadata.num_rows,
+            "row_groups": [rg.num_rows for rg in row_groups],
+            "row_group_bytes": [rg.total_byte_size for rg in row_groups],
+            "schema": {field.name: str(field.type) for field in schema},
+            "ranges": _row_group_ranges(row_groups),
+        }
+        sample = None
+        if metadata.num_rows > 0 and row_groups:
+            if self.device == "cpu":
+                batches = pq_file.iter_batches(batch_size=self.sample_rows, row_groups=[0])
+                sample = next(batches).to_pandas()
+            else:
+                sample_rows = min(row_groups[0].num_rows, self.sample_rows)
+                sample = cudf.read_parquet(path, num_rows=max(sample_rows, 1), engine="cudf")
+        if sample is None:
+            columns = {field.name: (float(_arrow_row_size([field])), 0.0) for field in schema}
+            entry["row_size"] = {"num_samples": 0, "columns": columns}
+        else:
+            entry["row_size"] = {"num_samples": len(sample), "columns": _column_size_stats(sample)}
+        return entry
+
+
+#
+# ArrowFileReader (Memory-mapped Arrow IPC / Feather files)
+#
+
+
+class ArrowFileReader(GPUFileReader):
+    """ Reads Arrow IPC files (Feather v2, as written by `DatasetWriter`
+    with `format="arrow"`). The file is memory-mapped and chunks are
+    assembled from zero-copy slices of its record batches, so there is
+    nothing to decode and repeated reads of the same file are served
+    from the page cache.
+    """
+
+    def intialize_reader(self, gpu_memory_frac, batch_size, **kwargs):
+        self.source = pa.memory_map(str(self.file_path), "r")
+        self.reader = pa.ipc.open_file(self.source)
+        self.num_record_batches = self.reader.num_record_batches
+        # record batch lengths are read from the (mapped) footer and headers
+        self.num_rows = sum(
+            self.reader.get_batch(i).num_rows for i in range(self.num_record_batches)
+        )
+        if self.row_size_estimate is None:
+            if self.num_rows > 0:
+                first = self.reader.get_batch(0)
+                sample = self._to_frame([first.slice(0, self.sample_rows)])
+                self.set_row_size_estimate(_estimate_row_size(sample))
+                sample = None
+            else:
+                self.set_row_size_estimate(RowSizeEstimate(0))
+
+        if batch_size:
+            self.batch_size = batch_size
+        else:
+            memory_batch = _allowable_batch_size(
+                gpu_memory_frac, self.row_size_estimate.upper, self.device
+            )
+            self.batch_size = max(min(memory_batch, self.num_rows), 1)
+
+    def __len__(self):
+        return int((self.num_rows + self.batch_size - 1) // self.batch_size)
+
     def __iter__(self):
-        for chunks in range(self.num_chunks):
-            LOG.debug(
-                "loading chunk from %s, byte_range=%s",
-                self.file_path,
-                (chunks * self.batch_size, self.batch_size),
+        for slices in self._iter_slices():
+            LOG.debug("loading %s record batch slices from %s", len(slices), self.file_path)
+            yield self.apply_filters(self._to_frame(slices))
+
+    def _iter_slices(self):
+        # groups zero-copy slices of the record batches into chunks of
+        # `next_batch_size()` rows, the same way `_coalesce_chunks` does
+        size = max(self.next_batch_size(), 1)
+        pending, pending_rows = [], 0
+        for i in range(self.num_record_batches):
+            batch = self.reader.get_batch(i)
+            offset = 0
+            while pending_rows + batch.num_rows - offset >= size:
+                end = offset + size - pending_rows
+                pending.append(batch.slice(offset, end - offset))
+                yield pending
+                pending, pending_rows, offset = [], 0, end
+                size = max(self.next_batch_size(), 1)
+            if offset < batch.num_rows:
+                pending.append(batch.slice(offset))
+                pending_rows += batch.num_rows - offset
+        if pending:
+            yield pending
+
+    def _to_table(self, slices):
+        table = pa.Table.from_batches(slices)
+        if self.read_columns:
+            columns = self.read_columns
+            table = pa.Table.from_arrays([table.column(col) for col in columns], names=columns)
+        return table
+
+    def _to_frame(self, slices):
+        return cudf.DataFrame.from_arrow(self._to_table(slices))
+
+
+#
+# CPUFileReader (Host-memory readers backed by pyarrow)
+#
+
+
+class CPUFileReader(GPUFileReader):
+    """ Host-memory counterpart of GPUFileReader
+
+    Chunks are decoded with pyarrow's multithreaded readers and yielded
+    as pandas.DataFrame objects. When batch sizes are not given explicitly
+    they are derived from the available system memory (`gpu_memory_frac`
+    is then interpreted as a fraction of host memory).
+    """
+
+    device = "cpu"
+
+
+class CPUPQFileReader(CPUFileReader):
+    def intialize_reader(self, gpu_memory_frac, batch_size, **kwargs):
+        self.reader = pq.ParquetFile(self.file_path)
+
+        metadata = self.reader.metadata
+        self.num_rows = metadata.num_rows
+        self.num_row_groups = metadata.num_row_groups
+        metadata_cache = kwargs.get("metadata_cache", None)
+        if self.row_size_estimate is None and metadata_cache is not None:
+            self.set_row_size_estimate(
+                metadata_cache.row_size_estimate(self.file_path, self.read_columns)
+            )
+        if self.row_size_estimate is None:
+            if self.num_rows > 0 and self.num_row_groups > 0:
+                sample = next(
+                    self.reader.iter_batches(
+                        batch_size=self.sample_rows, row_groups=[0], columns=self.read_columns
+                    )
+                )
+                self.set_row_size_estimate(_estimate_row_size(sample.to_pandas()))
+                sample = None
+            else:
+                schema = self.reader.schema_arrow
+                if self.read_columns:
+                    schema = pa.schema([schema.field(col) for col in self.read_columns])
+                self.set_row_size_estimate(RowSizeEstimate(_arrow_row_size(schema)))
+        self.row_groups = self.select_row_groups(metadata)
+
+        self.use_row_groups = kwargs.get("use_row_groups", None)
+        self.row_group_batch = 1
+
+        if batch_size and not self.use_row_groups:
+            self.batch_size = batch_size
+            self.use_row_groups = False
+        else:
+            memory_batch = _allowable_batch_size(
+                gpu_memory_frac, self.row_size_estimate.upper, self.device
             )
-            chunk = self.reader(
-                self.file_path,
-                byte_range=(chunks * self.batch_size, self.batch_size),
-                names=self.names,
-                header=0 if chunks == 0 and self.inferred_names else None,
-                sep=self.sep,
+            self.batch_size = max(min(memory_batch, self.num_rows), 1)
+
+            rg_size = int(self.num_rows / max(self.num_row_groups, 1))
+            if self.use_row_groups is None:
+                self.use_row_groups = self.num_row_groups > 0 and rg_size <= memory_batch
+            if self.use_row_groups:
+                self.row_group_batch = max(int(memory_batch / max(rg_size, 1)), 1)
+
+    def __len__(self):
+        if self.use_row_groups:
+            return int((len(self.row_groups) + self.row_group_batch - 1) // self.row_group_batch)
+        metadata = self.reader.metadata
+        num_rows = sum(metadata.row_group(rg).num_rows for rg in self.row_groups)
+        return int((num_rows + self.batch_size - 1) // self.batch_size)
+
+    def __iter__(self):
+        if self.use_row_groups:
+            start = 0
+            while start < len(self.row_groups):
+                row_groups = self.row_groups[start : start + self.next_row_group_batch()]
+                start += len(row_groups)
+                LOG.debug("loading row groups %s from %s", row_groups, self.file_path)
+                table = self.reader.read_row_groups(
+                    row_groups, columns=self.read_columns, use_threads=True
+                )
+                yield self.apply_filters(table.to_pandas())
+            return
+
+        # pyarrow streams the file row-group by row-group and re-slices
+        # the decoded data into batches of exactly `batch_size` rows
+        if not self.row_groups:
+            return
+        batches = (
+            self.apply_filters(batch.to_pandas())
+            for batch in self.reader.iter_batches(
+                batch_size=self.batch_size,
+                row_groups=self.row_groups,
+                columns=self.read_columns,
+                use_threads=True,
             )
+        )
+        if self.filters or self.batch_controller is not None:
+            batches = _coalesce_chunks(batches, self.next_batch_size, pd.concat)
+        yield from batches
+
+    next_row_group_batch = PQFileReader.next_row_group_batch
 
-            if self.columns:
-                for col in self.columns:
-                    chunk[col] = chunk[col].astype(self.dtype[col])
-                chunk = chunk[self.columns]
 
+class CPUCSVFileReader(CPUFileReader):
+    def intialize_reader(self, gpu_memory_frac, batch_size, **kwargs):
+        self.file_bytes = os.stat(str(self.file_path)).st_size
+        names = kwargs.get("names", None)
+        dtype = kwargs.get("dtype", None)
+        self.sep = kwargs.get("sep", ",")
+        compression = kwargs.get("compression", "infer")
+        if compression == "infer":
+            compression = _get_compression(self.file_path)
+        self.compression = compression
+
+        # As with the GPU reader the first line of the file is always consumed
+        # as a header, `names` (if given) override the names it defines
+        self.read_options = dict(use_threads=True)
+        if names:
+            self.read_options.update(column_names=list(names), skip_rows=1)
+        self.parse_options = pa_csv.ParseOptions(delimiter=self.sep)
+
+        # Sample the first few KB for column names, types and row size
+        head, nrows, complete = _csv_head(
+            self.file_path, self.sample_bytes, compression=self.compression
+        )
+        if self.compression and complete:
+            self.file_bytes = len(head)
+        elif self.compression:
+            # sizes are in decompressed bytes, pyarrow streams the file
+            blocks = _seekable_blocks(self.file_path, self.compression)
+            self.file_bytes = _decompressed_size(self.file_path, self.compression, blocks)
+        snippet = pa_csv.read_csv(
+            pa.BufferReader(head),
+            read_options=pa_csv.ReadOptions(**self.read_options),
+            parse_options=self.parse_options,
+        )
+        self.names = snippet.column_names
+        column_types = {name: snippet.schema.field(name).type for name in self.names}
+        if dtype:
+            column_types.update({name: _arrow_type(typ) for name, typ in dtype.items()})
+        self.convert_options = pa_csv.ConvertOptions(
+            column_types=column_types, include_columns=self.read_columns or None
+        )
+        if self.row_size_estimate is None:
+            sample = snippet.to_pandas()
+            if self.read_columns:
+                sample = sample[self.read_columns]
+            if len(sample):
+                self.set_row_size_estimate(_estimate_row_size(sample))
+            else:
+                schema = pa.schema([(name, column_types[name]) for name in sample.columns])
+                self.set_row_size_estimate(RowSizeEstimate(_arrow_row_size(schema)))
+            sample = None
+        header_bytes = head.index(b"\n") + 1 if b"\n" in head else len(head)
+        self.file_row_bytes = max((len(head) - header_bytes) / max(nrows, 1), 1)
+        # where the rows start, or a previous read stopped (see `iter_with_offsets`)
+        self.start_offset = kwargs.get("start_offset", None) or header_bytes
+
+        # Determine block size (in bytes of the file) if needed
+        if batch_size:
+            self.batch_size = batch_size * self.file_row_bytes
+        else:
+            memory_batch = _free_memory(self.device) * gpu_memory_frac
+            self.batch_size = memory_batch / self.row_size_estimate.upper * self.file_row_bytes
+        # pyarrow block sizes are 32-bit
+        self.batch_size = int(max(min(self.batch_size, 2 ** 31 - 1), self.file_row_bytes, 1))
+        self.num_chunks = int((self.file_bytes + self.batch_size - 1) // self.batch_size)
+
+    def __len__(self):
+        return self.num_chunks
+
+    def __iter__(self):
+        for _, chunk in self.iter_with_offsets():
             yield chunk
             chunk = None
 
+    def iter_with_offsets(self):
+        # the offsets are tracked by counting the lines of the rows read
+        if self.file_bytes == 0:
+            return
+        source = self.file_path
+        read_options = self.read_options
+        if self.compression:
+            source = _open_csv(self.file_path, self.compression)
+        elif self.start_offset >= self.file_bytes:
+            return
+        else:
+            source = pa.OSFile(str(self.file_path))
+            source.seek(self.start_offset)
+            # past the header, all the lines are rows
+            read_options = dict(use_threads=True, column_names=self.names)
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(block_size=self.batch_size, **read_options),
+            parse_options=self.parse_options,
+            convert_options=self.convert_options,
+        )
+        chunks = ((batch.num_rows, self._convert_batch(batch)) for batch in reader)
+        if self.batch_controller is not None:
+            # blocks are cut in bytes, the controller steers the rows per chunk
+            chunks = _coalesce_chunks(
+                (chunk for _, chunk in chunks), lambda: self.batch_controller.batch_size, pd.concat
+            )
+            # the lines of filtered chunks are not known
+            chunks = ((None if self.filters else len(chunk), chunk) for chunk in chunks)
+        if self.compression:
+            for _, chunk in chunks:
+                yield None, chunk
+                chunk = None
+            return
+        with open(str(self.file_path), "rb") as fil:
+            fil.seek(self.start_offset)
+            offset = self.start_offset
+            for num_lines, chunk in chunks:
+                if offset is not None:
+                    offset = None if num_lines is None else _skip_lines(fil, num_lines)
+                yield offset, chunk
+                chunk = None
+
+    def _convert_batch(self, batch):
+        LOG.debug("loaded chunk from %s, (num_rows=%s)", self.file_path, batch.num_rows)
+        chunk = self.apply_filters(batch.to_pandas())
+        if self.columns:
+            chunk = chunk[self.columns]
+        return chunk
+
+
+class CPUArrowFileReader(CPUFileReader, ArrowFileReader):
+    device = "cpu"
+
+    def _to_frame(self, slices):
+        # numeric columns without nulls are wrapped rather than copied
+        return self._to_table(slices).to_pandas(split_blocks=True)
+
+
+#
+# Schema (Declared ingestion schema and column decoders)
+#
+
+# value of every byte as a hexadecimal digit (0 for anything else)
+_HEX_DIGITS = np.zeros(256, dtype=np.uint64)
+_HEX_DIGITS[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_HEX_DIGITS[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_HEX_DIGITS[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+
+def _hex_to_int(values):
+    """ Decodes an array of hexadecimal strings into uint64 values, with numpy.
+    The strings are laid out as a (rows x width) matrix of bytes, so every
+    digit is decoded and weighted by its (right-aligned) position at once.
+    """
+    raw = np.asarray(values, dtype="S")
+    width = raw.dtype.itemsize
+    chars = raw.view(np.uint8).reshape(len(raw), width)
+    lengths = (chars != 0).sum(axis=1)
+    shifts = 4 * (lengths[:, None] - 1 - np.arange(width)[None, :])
+    digits = np.where(shifts >= 0, _HEX_DIGITS[chars], 0)
+    return (digits << np.maximum(shifts, 0).astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+
+
+class HexDecoder:
+    """ Decodes hexadecimal strings (e.g. the hashed categorical features of
+    the Criteo dataset) into integers, with `str.htoi` on the GPU and a
+    vectorized lookup on the CPU. Missing values are set to `na_value`.
+    """
+
+    read_dtype = "str"
+
+    def __init__(self, dtype="int32", na_value=0):
+        self.dtype = dtype
+        self.na_value = na_value
+
+    def __call__(self, series):
+        if isinstance(series, pd.Series):
+            nulls = series.isna()
+            values = _hex_to_int(series.fillna("").values).astype(self.dtype)
+            values[nulls.values] = self.na_value
+            return pd.Series(values, index=series.index, name=series.name)
+        return series.str.htoi().fillna(self.na_value).astype(self.dtype)
+
+    def __repr__(self):
+        return "HexDecoder(dtype=%r, na_value=%r)" % (self.dtype, self.na_value)
+
+
+class CategoryDecoder:
+    """ Dictionary-encodes strings. With `categories`, values are replaced by
+    their position in it (or `na_value` when missing or unknown), so codes
+    are consistent across chunks and files. Otherwise columns are converted
+    to the category dtype, with a dictionary per chunk.
+    """
+
+    read_dtype = "str"
+
+    def __init__(self, categories=None, dtype="int32", na_value=-1):
+        self.categories = list(categories) if categories is not None else None
+        self.dtype = dtype
+        self.na_value = na_value
+
+    def __call__(self, series):
+        if self.categories is None:
+            return series.astype("category")
+        if isinstance(series, pd.Series):
+            codes = pd.Categorical(series, categories=self.categories).codes.astype(self.dtype)
+            codes[codes == -1] = self.na_value
+            return pd.Series(codes, index=series.index, name=series.name)
+        # same merge-based lookup as the label encoder
+        order = cudf.Series(cp.arange(len(series)))
+        cats = cudf.DataFrame(
+            {"value": cudf.Series(self.categories), "code": cp.arange(len(self.categories))}
+        )
+        codes = cudf.DataFrame({"value": series.copy(), "order": order})
+        codes = codes.merge(cats, on="value", how="left").sort_values("order")["code"]
+        codes = codes.fillna(self.na_value).astype(self.dtype)
+        return codes._copy_construct(name=series.name, index=series.index)
+
+    def __repr__(self):
+        categories = None if self.categories is None else len(self.categories)
+        return "CategoryDecoder(categories=%s, dtype=%r)" % (categories, self.dtype)
+
+
+class FixedPointDecoder:
+    """ Stores decimals as integers counting units of 10**-`scale`
+    (e.g. prices as cents with `scale=2`)
+    """
+
+    read_dtype = None
+
+    def __init__(self, scale, dtype="int64", na_value=0):
+        self.scale = scale
+        self.dtype = dtype
+        self.na_value = na_value
+
+    def __call__(self, series):
+        values = series.astype("float64") * (10 ** self.scale)
+        return values.round().fillna(self.na_value).astype(self.dtype)
+
+    def __repr__(self):
+        return "FixedPointDecoder(scale=%r, dtype=%r)" % (self.scale, self.dtype)
+
+
+class DowncastDecoder:
+    """ Casts a column to a narrower `dtype` (chosen by `Schema.infer`
+    with `downcast=True`). Integer values out of the range of `dtype`
+    raise an OverflowError rather than wrapping around.
+    """
+
+    read_dtype = None
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+
+    def __call__(self, series):
+        dtype = np.dtype(self.dtype)
+        if dtype.kind in "iu" and len(series):
+            info = np.iinfo(dtype)
+            low, high = series.min(), series.max()
+            if low < info.min or high > info.max:
+                raise OverflowError(
+                    "values of %s in [%s, %s] do not fit %s, declare its type in the schema"
+                    % (series.name, low, high, dtype)
+                )
+        return series.astype(dtype)
+
+    def __repr__(self):
+        return "DowncastDecoder(dtype=%r)" % self.dtype
+
+
+def _is_string_dtype(dtype):
+    if isinstance(dtype, str):
+        return dtype in ("str", "string", "object")
+    if str(dtype) == "category":
+        return False
+    return dtype == object or not hasattr(dtype, "itemsize")
+
+
+def _downcast_dtype(dtype, low=None, high=None):
+    """ Narrowest type holding the values of a column of `dtype`: the
+    smallest signed integer covering [low, high] or float32 for floats.
+    None if the column is as narrow as it gets.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f" and dtype.itemsize > 4:
+        return np.dtype("float32")
+    if dtype.kind in "iu" and low is not None:
+        for candidate in ("int8", "int16", "int32", "int64"):
+            candidate = np.dtype(candidate)
+            info = np.iinfo(candidate)
+            if info.min <= low and high <= info.max:
+                return candidate if candidate.itemsize < dtype.itemsize else None
+    return None
+
+
+def _downcast_columns(sample, ranges=None, category_ratio=0.1):
+    """ Downcast decisions for the columns of a `sample` chunk: integer
+    columns are narrowed to their range in `ranges` (e.g. Parquet
+    statistics), floats to float32, and strings with few distinct values
+    are dictionary-encoded with the (sorted) values of the sample, so that
+    every chunk and dataset read with the schema gets the same codes.
+    Integer columns without a known range keep their type, as the range of
+    a sample doesn't bound the rest of the data.
+    """
+    ranges = ranges or {}
+    columns = {}
+    for col in sample.columns:
+        series = sample[col]
+        dtype = series.dtype
+        if _is_string_dtype(dtype):
+            num_unique = series.nunique()
+            if 0 < num_unique <= category_ratio * len(series):
+                categories = series.dropna().unique()
+                if hasattr(categories, "to_pandas"):
+                    categories = categories.to_pandas()
+                columns[col] = CategoryDecoder(categories=sorted(categories))
+            continue
+        if dtype.kind == "b" or dtype.kind not in "iuf":
+            continue
+        low, high = ranges.get(col, None) or (None, None)
+        narrow = _downcast_dtype(dtype, low, high)
+        if narrow is not None:
+            columns[col] = DowncastDecoder(narrow.name)
+    return columns
+
+
+class Schema:
+    """
+    Dtypes, or decoders, of the columns of a dataset. Decoded columns are
+    read as strings and decoded right after every chunk is read.
+
+    Parameters
+    -----------
+    columns : dict, default None
+        maps column names to a dtype or to a decoder (a HexDecoder,
+        CategoryDecoder, FixedPointDecoder or any callable taking and
+        returning a series). Columns left out keep their type.
+    names : list of str, default None
+        names of all the columns, in file order (see `Schema.infer`)
+    row_size : float, default None
+        estimated in-memory size of a row (see `Schema.infer`)
+    """
+
+    def __init__(self, columns=None, names=None, row_size=None):
+        self.columns = dict(columns or {})
+        self.names = names
+        self.row_size = row_size
+
+    @classmethod
+    def from_dtypes(cls, dtypes):
+        """ Schema of the `dtypes` of GPUFileIterator, where "hex" declares
+        an int32 column stored as hexadecimal strings
+        """
+        columns = {}
+        for col, dtype in dtypes.items():
+            if isinstance(dtype, str) and "hex" in dtype:
+                columns[col] = HexDecoder("int32")
+            else:
+                columns[col] = dtype
+        return cls(columns)
+
+    @classmethod
+    def infer(
+        cls,
+        path,
+        declared=None,
+        sample_rows=10000,
+        downcast=False,
+        ranges=None,
+        category_ratio=0.1,
+        **kwargs,
+    ):
+        """ Infers the schema of a dataset from a sample of `path`. With
+        `downcast`, undeclared columns get the narrowest type holding them
+        (see DowncastDecoder), integers only when their (min, max) is in
+        `ranges`.
+        """
+        kwargs = {k: v for k, v in kwargs.items() if k not in ("batch_size", "schema")}
+        declared = dict(declared.columns if isinstance(declared, Schema) else declared or {})
+        itr = GPUFileIterator(path, batch_size=sample_rows, schema=Schema(declared), **kwargs)
+        sample = next(iter(itr), None)
+        names = list(itr.engine.names) if hasattr(itr.engine, "names") else None
+        inferred = declared
+        row_size = None
+        if sample is not None:
+            # the row size is that of the data as read (before downcasting)
+            # since that is what the readers allocate
+            if len(sample):
+                row_size = _estimate_row_size(sample).mean
+            if downcast:
+                undeclared = [col for col in sample.columns if col not in declared]
+                inferred.update(_downcast_columns(sample[undeclared], ranges, category_ratio))
+            for col in sample.columns:
+                dtype = sample[col].dtype
+                inferred.setdefault(col, "str" if _is_string_dtype(dtype) else dtype)
+        LOG.debug("inferred schema of %s: %s", path, inferred)
+        return cls(inferred, names=names, row_size=row_size)
+
+    @property
+    def decoders(self):
+        return {col: spec for col, spec in self.columns.items() if callable(spec)}
+
+    @property
+    def read_dtypes(self):
+        """ Types the readers should parse the columns as (for text formats) """
+        dtypes = {}
+        for col, spec in self.columns.items():
+            if callable(spec):
+                read_dtype = getattr(spec, "read_dtype", None)
+                if read_dtype is not None:
+                    dtypes[col] = read_dtype
+            else:
+                dtypes[col] = spec
+        return dtypes
+
+    def decode(self, chunk):
+        """ Applies the declared dtypes and decoders to a chunk """
+        for col, spec in self.columns.items():
+            if col not in chunk.columns:
+                continue
+            if callable(spec):
+                chunk[col] = spec(chunk[col])
+            elif _is_string_dtype(spec) and _is_string_dtype(chunk[col].dtype):
+                continue
+            elif chunk[col].dtype != spec:
+                chunk[col] = chunk[col].astype(spec)
+        return chunk
+
+    def __repr__(self):
+        return "Schema(%r)" % self.columns
+
 
 #
 # GPUFileIterator (Single File Iterator)
@@ -249,42 +2214,73 @@ class GPUFileIterator:
         dtypes=None,
         names=None,
         row_size=None,
+        device="gpu",
+        adaptive=False,
+        batch_controller=None,
+        schema=None,
         **kwargs,
     ):
         self.file_path = file_path
+        self.device = device
+        if schema is None and dtypes:
+            schema = Schema.from_dtypes(dtypes)
+        if schema is not None:
+            # text readers parse the decoded columns as strings
+            dtype = dict(schema.read_dtypes, **(kwargs.pop("dtype", None) or {}))
+            kwargs["dtype"] = dtype or None
+            names = names or schema.names
+            row_size = row_size or schema.row_size
+        self.schema = schema
+        if isinstance(adaptive, AdaptiveBatchSize):
+            batch_controller = adaptive
+        elif adaptive and batch_controller is None:
+            batch_controller = AdaptiveBatchSize(_free_memory(device) * gpu_memory_frac)
+        self.batch_controller = batch_controller
         self.engine = _get_read_engine(
             engine,
             file_path,
+            device=device,
             columns=columns,
             batch_size=batch_size,
             gpu_memory_frac=gpu_memory_frac,
             use_row_groups=use_row_groups,
             dtypes=dtypes,
             names=names,
-            row_size=None,
+            row_size=row_size,
+            batch_controller=batch_controller,
             **kwargs,
         )
         self.dtypes = dtypes
         self.columns = columns
 
     def __iter__(self):
-        for chunk in self.engine:
-            if self.dtypes:
-                self._set_dtypes(chunk)
+        for _, chunk in self.iter_with_offsets():
             yield chunk
             chunk = None
 
+    def iter_with_offsets(self):
+        """ Yields the chunks along with the byte offset to resume reading
+        the file from after them, with `start_offset` (None if unknown)
+        """
+        for offset, chunk in self.engine.iter_with_offsets():
+            if self.schema is not None:
+                chunk = self.schema.decode(chunk)
+            self.observe(chunk)
+            yield offset, chunk
+            chunk = None
+
+    def observe(self, chunk, stage="read"):
+        """ Reports the memory of a chunk (as decoded, or at a later
+        `stage` of processing) to steer the size of the next reads
+        """
+        if self.batch_controller is not None:
+            self.batch_controller.observe(chunk, stage=stage)
+
     def __len__(self):
         return len(self.engine)
 
     def set_dtypes(self, chunk):
-        for col, dtype in self.dtypes.items():
-            if type(dtype) is str:
-                if "hex" in dtype:
-                    chunk[col] = chunk[col]._column.nvstrings.htoi()
-                    chunk[col] = chunk[col].astype(np.int32)
-            else:
-                chunk[col] = chunk[col].astype(dtype)
+        return Schema.from_dtypes(self.dtypes).decode(chunk)
 
 
 #
@@ -292,20 +2288,89 @@ class GPUFileIterator:
 #
 
 
+class ReadAhead:
+    """
+    How far a GPUDatasetIterator reads ahead of its consumer. Batch sizes
+    derived from memory are scaled down for the extra chunks in flight.
+
+    Parameters
+    -----------
+    prefetch : int, default 0
+        chunks decoded ahead on a background thread
+    num_workers : int, default 1
+        files read concurrently, each on its own thread
+    ordered : bool, default True
+        with `num_workers > 1`, yield the chunks in file order rather than
+        as soon as they are decoded
+    """
+
+    def __init__(self, prefetch=0, num_workers=1, ordered=True):
+        if prefetch < 0:
+            raise ValueError("prefetch must be >= 0.")
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1.")
+        self.prefetch = prefetch
+        self.num_workers = num_workers
+        self.ordered = ordered
+
+    @property
+    def in_flight(self):
+        # 1 consumed, `prefetch` queued plus the one being decoded (or
+        # handed over), and for concurrent reads one decoding plus one
+        # queued per worker
+        in_flight = 1
+        if self.prefetch:
+            in_flight += self.prefetch + 1
+        if self.num_workers > 1:
+            in_flight += 2 * self.num_workers
+        return in_flight
+
+
+class Shard:
+    """
+    Part of a dataset read by one of `world_size` processes. Shards are
+    balanced by row count (or by file size when it is unknown).
+
+    Parameters
+    -----------
+    rank : int
+    world_size : int
+    by : {'auto', 'file', 'row_group'}, default 'auto'
+        unit of work. 'auto' splits Parquet files into their row groups
+        when there are fewer than four files per shard.
+    shuffle : bool, default False
+        reassign the units every epoch (see `GPUDatasetIterator.set_epoch`),
+        deterministically given `seed`
+    seed : int, default 0
+    """
+
+    def __init__(self, rank, world_size, by="auto", shuffle=False, seed=0):
+        if not 0 <= rank < world_size:
+            raise ValueError("shard must be (rank, world_size) with 0 <= rank < world_size.")
+        if by not in ("auto", "file", "row_group"):
+            raise ValueError("shard by must be 'auto', 'file' or 'row_group'.")
+        self.rank = rank
+        self.world_size = world_size
+        self.by = by
+        self.shuffle = shuffle
+        self.seed = seed
+
+
 class GPUDatasetIterator:
 
     """
     Iterates through the files and returns a part of the
-    data as a GPU dataframe
+    data as a GPU dataframe (or as a pandas dataframe when
+    `device="cpu"`)
 
     Parameters
     -----------
     paths : list of str
-        Path(s) of the data file(s)
+        Path(s) of the data file(s), or the directory of a dataset
     names : list of str
         names of the columns in the dataset
     engine : str
-        supported file types are: 'parquet' or 'csv'
+        supported file types are: 'parquet', 'csv' or 'arrow'
     gpu_memory_frac : float
         fraction of the GPU memory to fill
     batch_size : int
@@ -314,21 +2379,474 @@ class GPUDatasetIterator:
     use_row_groups :
     dtypes :
     row_size: int
+    device : {'gpu', 'cpu'}, default 'gpu'
+        'cpu' reads pandas dataframes with pyarrow, and works without cudf
+    filters : list of tuple, default None
+        `(column, op, value)` predicates the rows must all satisfy, e.g.
+        `[("day", ">=", 20)]`. Parquet row groups ruled out by their
+        statistics are skipped.
+    read_ahead : ReadAhead, default None
+    transform : callable, default None
+        applied to every chunk once decoded
+    adaptive : bool or AdaptiveBatchSize, default False
+        steer the rows read toward a memory target, by default the
+        `gpu_memory_frac` share of free memory
+    schema : Schema, dict, 'infer' or 'downcast', default None
+        dtypes and decoders of the columns (see Schema). 'infer' infers
+        it from the first file, 'downcast' with `downcast=True`, using the
+        column ranges of all the Parquet files.
+    metadata_cache : bool or MetadataCache, default None
+        plan the (Parquet) files from a MetadataCache, by default from the
+        `_metadata` file of the dataset if there is one
+    shard : Shard or tuple of int, default None
+        only read the shard of this process, `(rank, world_size)`
     """
 
-    def __init__(self, paths, **kwargs):
+    def __init__(
+        self,
+        paths,
+        read_ahead=None,
+        transform=None,
+        adaptive=False,
+        metadata_cache=None,
+        shard=None,
+        **kwargs,
+    ):
+        metadata_path = None
+        if isinstance(paths, str) and os.path.isdir(paths):
+            metadata_path = os.path.join(paths, "_metadata")
+            if os.path.exists(metadata_path) and metadata_cache is None:
+                metadata_cache = MetadataCache.from_metadata_file(
+                    metadata_path, device=kwargs.get("device", "gpu")
+                )
+                paths = metadata_cache.paths
+            else:
+                paths = sorted(glob.glob(os.path.join(paths, "*.parquet")))
         if isinstance(paths, str):
             paths = [paths]
         if not isinstance(paths, list):
             raise TypeError("paths must be a string or a list.")
         if len(paths) < 1:
             raise ValueError("len(paths) must be > 0.")
+        if isinstance(shard, tuple):
+            shard = Shard(*shard)
         self.paths = paths
+        self.read_ahead = read_ahead or ReadAhead()
+        self.transform = transform
         self.kwargs = kwargs
+        if metadata_cache is None and metadata_path is None:
+            metadata_path = _shared_metadata_file(paths)
+            if metadata_path is not None:
+                metadata_cache = MetadataCache.from_metadata_file(
+                    metadata_path, device=kwargs.get("device", "gpu")
+                )
+        schema = kwargs.pop("schema", None)
+        parquet_paths = [path for path in paths if _is_parquet(path, kwargs.get("engine"))]
+        if shard is not None and shard.by == "auto":
+            all_parquet = len(parquet_paths) == len(paths)
+            by = "row_group" if all_parquet and len(paths) < 4 * shard.world_size else "file"
+            shard = Shard(shard.rank, shard.world_size, by, shard.shuffle, shard.seed)
+        if shard is not None and shard.by == "row_group":
+            if len(parquet_paths) < len(paths):
+                raise ValueError("sharding by row group requires Parquet files.")
+            if metadata_cache is None:
+                # the row groups of every file are planned from their footers
+                metadata_cache = True
+        self.shard = shard
+        self.epoch = 0
+        self._units = None
+        # (part, rows, offset) consumed so far, and where the next pass starts
+        self.position = (0, 0, None)
+        self._start = (0, 0, None)
+        downcast = isinstance(schema, str) and schema == "downcast"
+        if downcast and metadata_cache is None:
+            # the column ranges come from the footers of every file
+            metadata_cache = bool(parquet_paths)
+        if metadata_cache is True:
+            metadata_cache = MetadataCache(parquet_paths, device=kwargs.get("device", "gpu"))
+        self.metadata_cache = metadata_cache or None
+        # one schema for the whole dataset, inferred from its first file
+        if downcast:
+            ranges = None
+            if self.metadata_cache is not None and len(parquet_paths) == len(paths):
+                ranges = self.metadata_cache.column_ranges(paths)
+            schema = Schema.infer(paths[0], downcast=True, ranges=ranges, **kwargs)
+        elif isinstance(schema, str) and schema == "infer":
+            schema = Schema.infer(paths[0], **kwargs)
+        elif isinstance(schema, dict):
+            schema = Schema(schema)
+        self.schema = schema
+        # the controller is shared by the files, so what is learned
+        # about the data carries over from one file to the next
+        self.batch_controller = kwargs.pop("batch_controller", None)
+        if isinstance(adaptive, AdaptiveBatchSize):
+            self.batch_controller = adaptive
+        elif adaptive and self.batch_controller is None:
+            memory_frac = self.reader_kwargs.get("gpu_memory_frac", 0.5)
+            device = kwargs.get("device", "gpu")
+            self.batch_controller = AdaptiveBatchSize(_free_memory(device) * memory_frac)
+
+    @property
+    def reader_kwargs(self):
+        kwargs = self.kwargs.copy()
+        in_flight = self.read_ahead.in_flight
+        if in_flight > 1:
+            memory_frac = kwargs.get("gpu_memory_frac", 0.5)
+            kwargs["gpu_memory_frac"] = memory_frac / in_flight
+        if self.batch_controller is not None:
+            kwargs["batch_controller"] = self.batch_controller
+        if self.metadata_cache is not None:
+            kwargs["metadata_cache"] = self.metadata_cache
+        if self.schema is not None:
+            kwargs["schema"] = self.schema
+        return kwargs
+
+    @property
+    def columns(self):
+        return self.kwargs.get("columns", None)
+
+    def _file_num_rows(self, path, filters=None):
+        return _file_num_rows(
+            path,
+            engine=self.kwargs.get("engine", None),
+            metadata_cache=self.metadata_cache,
+            filters=filters,
+            compression=self.kwargs.get("compression", "infer"),
+        )
+
+    def set_epoch(self, epoch):
+        """ Sets the epoch the shards are assigned for, with `Shard.shuffle` """
+        self.epoch = epoch
+
+    @property
+    def parts(self):
+        """ `(path, row_groups)` of the files read by this iterator, in
+        dataset order, where `row_groups` is None for whole files and
+        otherwise lists the row groups of the file in its shard
+        """
+        if self.shard is None:
+            return [(path, None) for path in self.paths]
+        if self._units is None:
+            # units of work, weighted by their number of rows
+            if self.shard.by == "row_group":
+                self._units = [
+                    (path, rg, num_rows)
+                    for path in self.paths
+                    for rg, num_rows in enumerate(self.metadata_cache.get(path)["row_groups"])
+                ]
+            else:
+                num_rows = [self._file_num_rows(path) for path in self.paths]
+                if None in num_rows:
+                    num_rows = [os.path.getsize(path) for path in self.paths]
+                self._units = [(path, None, rows) for path, rows in zip(self.paths, num_rows)]
+        seed = self.shard.seed + self.epoch if self.shard.shuffle else None
+        shards = _assign_shards([unit[2] for unit in self._units], self.shard.world_size, seed)
+        parts = {}
+        for (path, rg, _), unit_shard in zip(self._units, shards):
+            if unit_shard == self.shard.rank:
+                parts.setdefault(path, []).append(rg)
+        if self.shard.by == "row_group":
+            return list(parts.items())
+        return [(path, None) for path in parts]
+
+    @property
+    def file_num_rows(self):
+        """ Number of rows of every file read (see `num_rows`), None for
+        the files it cannot be known of without reading them
+        """
+        file_num_rows = {}
+        for path, row_groups in self.parts:
+            if row_groups is not None and not self.kwargs.get("filters", None):
+                sizes = self.metadata_cache.get(path)["row_groups"]
+                file_num_rows[path] = sum(sizes[rg] for rg in row_groups)
+            else:
+                file_num_rows[path] = self._file_num_rows(path, self.kwargs.get("filters", None))
+        return file_num_rows
+
+    @property
+    def num_rows(self):
+        """ Number of rows in the dataset (in the shard of this iterator),
+        from the metadata of its files (Parquet footers or the
+        MetadataCache, Arrow record batches, and the cached newline index
+        of CSV files) rather than a pass over the data. None if it is
+        unknown for some file: with `filters`, or for compressed CSV files.
+        """
+        num_rows = list(self.file_num_rows.values())
+        return None if None in num_rows else sum(num_rows)
+
+    @property
+    def read_bytes(self):
+        """ Number of bytes a pass over the dataset (the shard of this
+        iterator) reads from storage: the compressed column chunks of the
+        columns read from Parquet files, in the row groups read (before
+        `filters`), and the size of the other files
+        """
+        columns = self.columns
+        nbytes = 0
+        for path, row_groups in self.parts:
+            if not _is_parquet(path, self.kwargs.get("engine")):
+                nbytes += os.path.getsize(path)
+                continue
+            metadata = pq.read_metadata(str(path))
+            if row_groups is None:
+                row_groups = range(metadata.num_row_groups)
+            for rg in row_groups:
+                row_group = metadata.row_group(rg)
+                for col in range(row_group.num_columns):
+                    chunk = row_group.column(col)
+                    if not columns or chunk.path_in_schema in columns:
+                        nbytes += chunk.total_compressed_size
+        return nbytes
+
+    def batch_rows(self, row_size):
+        """ Number of rows of the chunks read when the rows take `row_size`
+        bytes in memory: `batch_size` if given, and otherwise the rows that
+        fit in the memory budget of a chunk
+        """
+        kwargs = self.reader_kwargs
+        if kwargs.get("batch_size", None):
+            return kwargs["batch_size"]
+        if self.batch_controller is not None:
+            return max(int(self.batch_controller.target_memory / max(row_size, 1)), 1)
+        return _allowable_batch_size(
+            kwargs.get("gpu_memory_frac", 0.5), max(row_size, 1), kwargs.get("device", "gpu")
+        )
+
+    def sample(self, num_rows=10000):
+        """ Returns (at most) the first `num_rows` rows of the dataset, read
+        from its first non-empty file, or None if the dataset is empty
+        """
+        kwargs = self.reader_kwargs
+        kwargs.pop("batch_controller", None)
+        kwargs["batch_size"] = num_rows
+        for path, row_groups in self.parts:
+            for _, _, chunk in self._iter_file(path, kwargs, row_groups):
+                return chunk.iloc[:num_rows]
+        return None
+
+    def project(self, columns):
+        """ Returns a copy of this iterator that only reads `columns`.
+        If a column selection was already made it is left unchanged.
+        """
+        projected = copy.copy(self)
+        projected.kwargs = self.kwargs.copy()
+        if not self.columns:
+            projected.kwargs["columns"] = list(columns)
+        return projected
+
+    def state(self):
+        """ Position of the consumer in the dataset: the part (see `parts`),
+        the number of its rows yielded so far and, for uncompressed CSV
+        files, the byte offset they end at. Passing it to
+        `load_state` makes the next pass resume right after the last chunk
+        yielded, as long as the files did not change.
+        """
+        read_ahead = self.read_ahead
+        if read_ahead.num_workers > 1 and not read_ahead.ordered:
+            raise ValueError("the position of unordered reads can't be saved.")
+        part, rows, offset = self.position
+        return {
+            "parts": [path for path, _ in self.parts],
+            "epoch": self.epoch,
+            "part": part,
+            "rows": rows,
+            "offset": offset,
+        }
+
+    def load_state(self, state):
+        """ Makes the next pass over the dataset start at the position of `state` """
+        self.epoch = state["epoch"]
+        if state["parts"] != [path for path, _ in self.parts]:
+            raise ValueError("the state was saved for a different set of files.")
+        self._start = (state["part"], state["rows"], state.get("offset", None))
 
     def __iter__(self):
-        for path in self.paths:
-            yield from GPUFileIterator(path, **self.kwargs)
+        kwargs = self.reader_kwargs
+        parts = self.parts
+        start, skip_rows, offset = self._start
+        self._start = (0, 0, None)
+        self.position = (start, skip_rows, offset)
+        sources = [
+            self._iter_part(i, path, kwargs, row_groups, skip_rows, offset)
+            if i == start
+            else self._iter_part(i, path, kwargs, row_groups)
+            for i, (path, row_groups) in enumerate(parts)
+            if i >= start
+        ]
+        read_ahead = self.read_ahead
+        if read_ahead.num_workers > 1:
+            chunks = _read_concurrently(sources, read_ahead.num_workers, read_ahead.ordered)
+        else:
+            chunks = (item for source in sources for item in source)
+        if read_ahead.prefetch:
+            chunks = _prefetch(chunks, read_ahead.prefetch)
+        for part, rows, offset, chunk in chunks:
+            # chunks are accounted for once handed over to the consumer
+            self.position = (part, rows, offset)
+            yield chunk
+            chunk = None
+
+    def _iter_part(self, part, path, kwargs, row_groups=None, skip_rows=0, offset=None):
+        for rows, offset, chunk in self._iter_file(path, kwargs, row_groups, skip_rows, offset):
+            yield part, rows, offset, chunk
+
+    def _iter_file(self, path, kwargs, row_groups=None, skip_rows=0, offset=None):
+        """ Yields the chunks of a file, after its first `skip_rows` rows
+        (or from the byte `offset` they end at), along with the number of
+        rows of the file read so far and the offset they end at
+        """
+        rows = 0
+        if offset is not None:
+            # CSV files are read again from where the rows skipped end
+            kwargs = dict(kwargs, start_offset=offset)
+            rows = skip_rows
+        if skip_rows and not kwargs.get("filters") and _is_parquet(path, kwargs.get("engine")):
+            # the row groups consumed already are not read again
+            if self.metadata_cache is not None:
+                sizes = self.metadata_cache.get(path)["row_groups"]
+            else:
+                metadata = pq.read_metadata(str(path))
+                sizes = [metadata.row_group(rg).num_rows for rg in range(metadata.num_row_groups)]
+            row_groups = list(range(len(sizes)) if row_groups is None else row_groups)
+            while row_groups and rows + sizes[row_groups[0]] <= skip_rows:
+                rows += sizes[row_groups.pop(0)]
+        if row_groups is not None:
+            kwargs = dict(kwargs, row_groups=row_groups)
+        for offset, chunk in GPUFileIterator(path, **kwargs).iter_with_offsets():
+            if rows < skip_rows:
+                skipped = min(skip_rows - rows, len(chunk))
+                rows += skipped
+                chunk = chunk.iloc[skipped:]
+                if len(chunk) == 0:
+                    continue
+            rows += len(chunk)
+            if self.transform is not None:
+                chunk = self.transform(chunk)
+                self.observe(chunk, stage="transform")
+            yield rows, offset, chunk
+            chunk = None
+
+    def observe(self, chunk, stage="read"):
+        """ Reports the memory of a chunk at some `stage` of processing,
+        to steer the size of the next reads in adaptive mode
+        """
+        if self.batch_controller is not None:
+            self.batch_controller.observe(chunk, stage=stage)
+
+
+class _PrefetchError:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _queue_put(buffer, item, done):
+    # blocking put that gives up once `done` is set
+    while not done.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _prefetch(chunks, depth):
+    """ Drains the `chunks` generator on a background thread, keeping at
+    most `depth` decoded chunks queued ahead of the consumer
+    """
+    buffer = queue.Queue(depth)
+    done = threading.Event()
+    # signifies end-of-data to the consumer
+    eod = object()
+
+    def _produce():
+        try:
+            for chunk in chunks:
+                if not _queue_put(buffer, chunk, done):
+                    return
+                chunk = None
+            _queue_put(buffer, eod, done)
+        except Exception as exc:
+            _queue_put(buffer, _PrefetchError(exc), done)
+
+    thread = threading.Thread(target=_produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is eod:
+                break
+            if isinstance(item, _PrefetchError):
+                raise item.exc
+            yield item
+            item = None
+    finally:
+        # also reached when the consumer stops early, release the producer
+        done.set()
+        thread.join()
+
+
+def _read_concurrently(sources, num_workers, ordered=True):
+    """ Drains the `sources` generators (one per file) on `num_workers`
+    threads, yielding their chunks in source order if `ordered`.
+    """
+    done = threading.Event()
+    # signifies the end of one source
+    eos = object()
+    if ordered:
+        queues = [queue.Queue(1) for _ in sources]
+    else:
+        queues = [queue.Queue(num_workers)] * len(sources)
+    next_source = iter(range(len(sources)))
+    lock = threading.Lock()
+
+    def _work():
+        while not done.is_set():
+            with lock:
+                idx = next(next_source, None)
+            if idx is None:
+                return
+            try:
+                for chunk in sources[idx]:
+                    if not _queue_put(queues[idx], chunk, done):
+                        return
+                    chunk = None
+                _queue_put(queues[idx], eos, done)
+            except Exception as exc:
+                _queue_put(queues[idx], _PrefetchError(exc), done)
+                return
+
+    def _drain(buffer):
+        item = buffer.get()
+        if isinstance(item, _PrefetchError):
+            raise item.exc
+        return item
+
+    workers = [
+        threading.Thread(target=_work, daemon=True) for _ in range(min(num_workers, len(sources)))
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        if ordered:
+            for buffer in queues:
+                item = _drain(buffer)
+                while item is not eos:
+                    yield item
+                    item = _drain(buffer)
+        else:
+            remaining = len(sources)
+            while remaining:
+                item = _drain(queues[0])
+                if item is eos:
+                    remaining -= 1
+                    continue
+                yield item
+                item = None
+    finally:
+        done.set()
+        for worker in workers:
+            worker.join()
 
 
 class Shuffler:
@@ -344,17 +2862,20 @@ class Shuffler:
         path for the shuffled files
     num_out_files : int, default 30
     num_threads : int, default 4
+    generation : int, default 0
+        set of files to write to, see `rotate`
 
     """
 
-    def __init__(self, out_dir, num_out_files=30, num_threads=4):
+    def __init__(self, out_dir, num_out_files=30, num_threads=4, generation=0):
         self.queue = queue.Queue(num_threads)
         self.write_locks = [threading.Lock() for _ in range(num_out_files)]
-        self.writer_files = [os.path.join(out_dir, f"{i}.parquet") for i in range(num_out_files)]
-        self.writers = [ParquetWriter(f, compression=None) for f in self.writer_files]
         self.b_idxs = np.arange(num_out_files)
+        self.out_dir = out_dir
         self.num_threads = num_threads
         self.num_out_files = num_out_files
+        self.generation = generation
+        self._open_writers()
 
         # signifies that end-of-data and that the thread should shut down
         self._eod = object()
@@ -363,6 +2884,29 @@ class Shuffler:
             write_thread = threading.Thread(target=self._write_thread, daemon=True)
             write_thread.start()
 
+    def _open_writers(self):
+        # files of later generations are named like "0.gen1.parquet"
+        suffix = f".gen{self.generation}" if self.generation else ""
+        self.writer_files = [
+            os.path.join(self.out_dir, f"{i}{suffix}.parquet") for i in range(self.num_out_files)
+        ]
+        self.writers = [ParquetWriter(f, compression=None) for f in self.writer_files]
+        self.written = False
+
+    def rotate(self):
+        """ Completes the files written so far and moves on to a new set of
+        files (the next generation, `<n>.gen<generation>.parquet`), so that
+        everything written before the call is readable even if the process
+        dies later on. Returns the generation written to next.
+        """
+        if self.written:
+            self.queue.join()
+            for writer in self.writers:
+                writer.close()
+            self.generation += 1
+            self._open_writers()
+        return self.generation
+
     def _write_thread(self):
         while True:
             item = self.queue.get()
@@ -377,6 +2921,7 @@ class Shuffler:
 
     @annotate("add_data", color="orange", domain="nvt_python")
     def add_data(self, gdf):
+        self.written = True
         arr = cp.arange(len(gdf))
         cp.random.shuffle(arr)
 
@@ -408,6 +2953,11 @@ class Shuffler:
             writer.close()
 
 
+# error check, number of samples, dimensions of the labels and features,
+# number of slots and reserved fields, as int64
+_HUGECTR_HEADER_SIZE = 8 * 8
+
+
 class HugeCTR:
     """
     Generates outputs for HugeCTR
@@ -418,11 +2968,20 @@ class HugeCTR:
         path for the shuffled files
     num_out_files : int, default 30
     num_threads : int, default 4
+    state : dict, default None
+        `state()` of an interrupted run to continue writing the files of
 
     """
 
     def __init__(
-        self, out_dir, num_out_files=30, num_threads=4, cats=None, conts=None, labels=None
+        self,
+        out_dir,
+        num_out_files=30,
+        num_threads=4,
+        cats=None,
+        conts=None,
+        labels=None,
+        state=None,
     ):
         self.cats = cats
         self.conts = conts
@@ -438,10 +2997,17 @@ class HugeCTR:
         for f in self.writer_files:
             file_list_writer.write(f + "\n")
         file_list_writer.close()
-        self.writers = [open(f, "ab") for f in self.writer_files]
         self.num_threads = num_threads
         self.num_out_files = num_out_files
         self.num_samples = [0] * num_out_files
+        self.writers = [None] * num_out_files
+        if state is not None:
+            self.load_state(state)
+        else:
+            self.writers = [open(f, "wb") for f in self.writer_files]
+            for writer in self.writers:
+                # room for the header, written once the number of samples is known
+                writer.write(bytes(_HUGECTR_HEADER_SIZE))
         # signifies that end-of-data and that the thread should shut down
         self._eod = object()
 
@@ -510,6 +3076,28 @@ class HugeCTR:
 
             self.writers[i].write(header.tobytes())
 
+    def state(self):
+        """ Size and number of samples of the files written so far """
+        for writer in self.writers:
+            writer.flush()
+        return {
+            "sizes": [writer.tell() for writer in self.writers],
+            "num_samples": list(self.num_samples),
+        }
+
+    def load_state(self, state):
+        """ Truncates the files to the point `state` was taken at, to
+        continue writing from there
+        """
+        for i, size in enumerate(state["sizes"]):
+            if self.writers[i] is not None:
+                self.writers[i].close()
+            # the files of the interrupted run, the header included
+            self.writers[i] = open(self.writer_files[i], "r+b")
+            self.writers[i].seek(size)
+            self.writers[i].truncate()
+        self.num_samples = list(state["num_samples"])
+
     def set_col_names(self, labels, cats, conts):
         self.cats = cats
         self.conts = conts
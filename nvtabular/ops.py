@@ -14,20 +14,37 @@
 # limitations under the License.
 #
 
+import copy
 import os
 
-import cudf
 import numpy as np
-from cudf._lib.nvtx import annotate
+import pandas as pd
 
 from nvtabular.encoder import DLLabelEncoder
 from nvtabular.groupby import GroupByMomentsCal
+from nvtabular.io import annotate
+
+try:
+    import cudf
+except ImportError:
+    cudf = None
 
 CONT = "continuous"
 CAT = "categorical"
 ALL = "all"
 
 
+def _concat(frames, axis=0):
+    # chunks read with device="cpu" are pandas dataframes
+    if isinstance(frames[0], pd.DataFrame):
+        return pd.concat(frames, axis=axis)
+    return cudf.concat(frames, axis=axis)
+
+
+def _host_list(values):
+    return (pd.Series if cudf is None else cudf.Series)(values).tolist()
+
+
 class OperatorRegistry(type):
     OPS = {}
 
@@ -42,6 +59,10 @@ class Operator(metaclass=OperatorRegistry):
     Base class for all operator classes.
     """
 
+    # operators running on cudf dataframes only (not on those read with
+    # device="cpu")
+    gpu_only = False
+
     def __init__(self, columns=None):
         self.columns = columns
 
@@ -123,7 +144,7 @@ class TransformOperator(Operator):
 
     def apply_op(
         self,
-        gdf: cudf.DataFrame,
+        gdf: "cudf.DataFrame",
         columns_ctx: dict,
         input_cols,
         target_cols=["base"],
@@ -138,7 +159,7 @@ class TransformOperator(Operator):
         if self.replace and self.preprocessing and target_columns:
             origin_gdf[target_columns] = new_gdf
             return origin_gdf
-        return cudf.concat([origin_gdf, new_gdf], axis=1)
+        return _concat([origin_gdf, new_gdf], axis=1)
 
     def op_logic(self, gdf, target_columns, stats_context=None):
         raise NotImplementedError(
@@ -168,7 +189,7 @@ class StatOperator(Operator):
         super(StatOperator, self).__init__(columns)
 
     def read_itr(
-        self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base",
+        self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base",
     ):
         raise NotImplementedError(
             """The operation to conduct on the dataframe to observe the desired statistics."""
@@ -195,6 +216,76 @@ class StatOperator(Operator):
     def clear(self):
         raise NotImplementedError("""zero and reinitialize all relevant statistical properties""")
 
+    def partial_state(self):
+        """ Statistics gathered so far, as a dict of host data (python
+        numbers, lists and pandas objects) that can be pickled, sent to
+        other processes or nodes, and merged with `merge`. `finalize`
+        leaves it in place, so that the statistics can still be extended.
+        """
+        raise NotImplementedError(
+            """Should return the statistics gathered so far, in host memory."""
+        )
+
+    def merge(self, other):
+        """
+        Adds the statistics gathered by `other` to those of this operator
+
+        Parameters
+        -----------
+        other : StatOperator or dict
+            an operator of the same type, with the same parameters, or
+            its `partial_state`
+        """
+        if isinstance(other, StatOperator):
+            other = other.partial_state()
+        self.merge_state(other)
+
+    def merge_state(self, state):
+        raise NotImplementedError(
+            """Adds the statistics of `state`, a partial state of an operator of the
+                same type with the same parameters, to those of this one."""
+        )
+
+    def load_partial_state(self, state):
+        """ Restores the statistics of `partial_state` """
+        self.clear()
+        self.merge_state(state)
+
+    def finalize(self):
+        """ Computes the final statistics from those gathered so far and
+        returns them, by name (see `stats_collected`).
+        """
+        self.read_fin()
+        return dict(self.stats_collected())
+
+
+def merge_partial_states(stat_op, states):
+    """
+    Merges the statistics gathered on disjoint parts of the data into
+    `stat_op`, pairwise in a tree
+
+    Parameters
+    -----------
+    stat_op : StatOperator
+        operator to merge the statistics into
+    states : list of StatOperator or dict
+        operators of the same type and parameters, or their partial states
+    """
+    states = [s.partial_state() if isinstance(s, StatOperator) else s for s in states]
+    while len(states) > 1:
+        merged = []
+        for idx in range(0, len(states), 2):
+            # an operator with the same parameters, but no statistics
+            pair = copy.copy(stat_op)
+            pair.clear()
+            for state in states[idx : idx + 2]:
+                pair.merge_state(state)
+            merged.append(pair.partial_state())
+        states = merged
+    for state in states:
+        stat_op.merge_state(state)
+    return stat_op
+
 
 class MinMax(StatOperator):
     """
@@ -218,7 +309,7 @@ class MinMax(StatOperator):
 
     @annotate("MinMax_op", color="green", domain="nvt_python")
     def apply_op(
-        self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base",
+        self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base",
     ):
         """ Iteration level Min Max collection, a chunk at a time
         """
@@ -246,8 +337,8 @@ class MinMax(StatOperator):
         for col in self.batch_mins.keys():
             # required for exporting values later,
             # must move values from gpu if cupy->numpy not supported
-            self.batch_mins[col] = cudf.Series(self.batch_mins[col]).tolist()
-            self.batch_maxs[col] = cudf.Series(self.batch_maxs[col]).tolist()
+            self.batch_mins[col] = _host_list(self.batch_mins[col])
+            self.batch_maxs[col] = _host_list(self.batch_maxs[col])
             self.mins[col] = min(self.batch_mins[col])
             self.maxs[col] = max(self.batch_maxs[col])
         return
@@ -271,6 +362,18 @@ class MinMax(StatOperator):
         self.maxs = {}
         return
 
+    def partial_state(self):
+        return {
+            "batch_mins": {col: _host_list(v) for col, v in self.batch_mins.items()},
+            "batch_maxs": {col: _host_list(v) for col, v in self.batch_maxs.items()},
+        }
+
+    def merge_state(self, state):
+        for col in state["batch_mins"].keys():
+            self.batch_mins.setdefault(col, []).extend(state["batch_mins"][col])
+            self.batch_maxs.setdefault(col, []).extend(state["batch_maxs"][col])
+        return
+
 
 class Moments(StatOperator):
     """
@@ -295,7 +398,7 @@ class Moments(StatOperator):
 
     @annotate("Moments_op", color="green", domain="nvt_python")
     def apply_op(
-        self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base",
+        self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base",
     ):
         """ Iteration-level moment algorithm (mean/std).
         """
@@ -359,6 +462,38 @@ class Moments(StatOperator):
         self.stds = {}
         return
 
+    def partial_state(self):
+        return {
+            "counts": {col: float(n) for col, n in self.counts.items()},
+            "means": {col: float(m) for col, m in self.means.items()},
+            "varis": {col: float(v) for col, v in self.varis.items()},
+        }
+
+    def merge_state(self, state):
+        """ Combines the moments of `state`, gathered on other chunks, as
+        in `apply_op`
+        """
+        for col, n2 in state["counts"].items():
+            n1 = self.counts.get(col, 0.0)
+            if n2 == 0 and col in self.counts:
+                continue
+            if n1 == 0:
+                self.counts[col] = n2
+                self.means[col] = state["means"][col]
+                self.varis[col] = state["varis"][col]
+                self.stds[col] = float(np.sqrt(state["varis"][col]))
+                continue
+            m1, m2 = self.means[col], state["means"][col]
+            v1, v2 = self.varis[col], state["varis"][col]
+            self.counts[col] = n1 + n2
+            self.means[col] = (m1 * n1 + m2 * n2) / self.counts[col]
+            t1 = n1 * v1
+            t2 = n2 * v2
+            t3 = n1 * ((m1 - self.means[col]) ** 2)
+            t4 = n2 * ((m2 - self.means[col]) ** 2)
+            self.varis[col] = (t1 + t2 + t3 + t4) / (n1 + n2)
+        return
+
 
 class Median(StatOperator):
     """
@@ -380,7 +515,7 @@ class Median(StatOperator):
 
     @annotate("Median_op", color="green", domain="nvt_python")
     def apply_op(
-        self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base",
+        self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base",
     ):
         """ Iteration-level median algorithm.
         """
@@ -391,7 +526,7 @@ class Median(StatOperator):
             col = gdf[name].copy()
             col = col.dropna().reset_index(drop=True).sort_values()
             if len(col) > 1:
-                self.batch_medians[name].append(float(col[len(col) // 2]))
+                self.batch_medians[name].append(float(col.iloc[len(col) // 2]))
             else:
                 self.batch_medians[name].append(0.0)
         return
@@ -417,6 +552,14 @@ class Median(StatOperator):
         self.medians = {}
         return
 
+    def partial_state(self):
+        return {"batch_medians": {col: list(v) for col, v in self.batch_medians.items()}}
+
+    def merge_state(self, state):
+        for col, batch_medians in state["batch_medians"].items():
+            self.batch_medians.setdefault(col, []).extend(batch_medians)
+        return
+
 
 class Encoder(StatOperator):
     """
@@ -445,6 +588,8 @@ class Encoder(StatOperator):
     replace : bool
     """
 
+    gpu_only = True
+
     def __init__(
         self,
         use_frequency=False,
@@ -467,7 +612,7 @@ class Encoder(StatOperator):
 
     @annotate("Encoder_op", color="green", domain="nvt_python")
     def apply_op(
-        self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base",
+        self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base",
     ):
         """ Iteration-level categorical encoder update.
         """
@@ -476,29 +621,31 @@ class Encoder(StatOperator):
             return
         for name in cols:
             if name not in self.encoders:
-                if self.use_frequency:
-                    threshold_freq = (
-                        self.freq_threshold.get(name, 0)
-                        if type(self.freq_threshold) is dict
-                        else self.freq_threshold
-                    )
-                    self.encoders[name] = DLLabelEncoder(
-                        name,
-                        use_frequency=self.use_frequency,
-                        limit_frac=self.limit_frac,
-                        gpu_mem_util_limit=self.gpu_mem_util_limit,
-                        # This one is used during transform
-                        gpu_mem_trans_use=self.gpu_mem_trans_use,
-                        freq_threshold=threshold_freq,
-                    )
-                else:
-                    self.encoders[name] = DLLabelEncoder(name)
+                self.encoders[name] = self._new_encoder(name)
 
                 gdf[name].append([None])
 
             self.encoders[name].fit(gdf[name])
         return
 
+    def _new_encoder(self, name):
+        if self.use_frequency:
+            threshold_freq = (
+                self.freq_threshold.get(name, 0)
+                if type(self.freq_threshold) is dict
+                else self.freq_threshold
+            )
+            return DLLabelEncoder(
+                name,
+                use_frequency=self.use_frequency,
+                limit_frac=self.limit_frac,
+                gpu_mem_util_limit=self.gpu_mem_util_limit,
+                # This one is used during transform
+                gpu_mem_trans_use=self.gpu_mem_trans_use,
+                freq_threshold=threshold_freq,
+            )
+        return DLLabelEncoder(name)
+
     @annotate("Encoder_fin", color="green", domain="nvt_python")
     def read_fin(self, *args):
         """ Finalize categorical encoders (get categories).
@@ -523,6 +670,16 @@ class Encoder(StatOperator):
         self.categories = {}
         return
 
+    def partial_state(self):
+        return {"encoders": {name: enc.partial_state() for name, enc in self.encoders.items()}}
+
+    def merge_state(self, state):
+        for name, enc_state in state["encoders"].items():
+            if name not in self.encoders:
+                self.encoders[name] = self._new_encoder(name)
+            self.encoders[name].merge_state(enc_state)
+        return
+
 
 class Export(TransformOperator):
 
@@ -562,7 +719,7 @@ class Export(TransformOperator):
         self.shuffle = True
 
     @annotate("Export_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         gdf.to_parquet(self.path, compression=None)
         return
 
@@ -580,7 +737,7 @@ class ZeroFill(TransformOperator):
     default_out = CONT
 
     @annotate("ZeroFill_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         cont_names = target_columns
         if not cont_names:
             return gdf
@@ -607,7 +764,7 @@ class LogOp(TransformOperator):
     default_out = CONT
 
     @annotate("LogOp_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         cont_names = target_columns
         if not cont_names:
             return gdf
@@ -637,7 +794,7 @@ class Normalize(DFOperator):
         return [Moments()]
 
     @annotate("Normalize_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         cont_names = target_columns
         if not cont_names or not stats_context["stds"]:
             return
@@ -645,7 +802,7 @@ class Normalize(DFOperator):
         return gdf
 
     def apply_mean_std(self, gdf, stats_context, cont_names):
-        new_gdf = cudf.DataFrame()
+        new_gdf = type(gdf)()
         for name in cont_names:
             if stats_context["stds"][name] > 0:
                 new_col = f"{name}_{self._id}"
@@ -688,7 +845,7 @@ class FillMissing(DFOperator):
         return []
 
     @annotate("FillMissing_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         cont_names = target_columns
         if not cont_names:
             return gdf
@@ -720,11 +877,11 @@ class FillMedian(DFOperator):
         return [Median()]
 
     @annotate("FillMedian_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         if not target_columns:
             return gdf
 
-        new_gdf = cudf.DataFrame()
+        new_gdf = type(gdf)()
         for col in target_columns:
             new_gdf[col] = gdf[col].fillna(stats_context["medians"][col])
         new_gdf.columns = [f"{col}_{self._id}" for col in new_gdf.columns]
@@ -771,6 +928,8 @@ class GroupByMoments(StatOperator):
         values in ascending order.
     """
 
+    gpu_only = True
+
     def __init__(
         self,
         cat_names=None,
@@ -793,7 +952,7 @@ class GroupByMoments(StatOperator):
         self.moments = {}
         self.categories = {}
 
-    def apply_op(self, gdf: cudf.DataFrame, columns_ctx: dict, input_cols, target_cols="base"):
+    def apply_op(self, gdf: "cudf.DataFrame", columns_ctx: dict, input_cols, target_cols="base"):
         if self.cat_names is None:
             raise ValueError("cat_names cannot be None for group by operations.")
 
@@ -828,16 +987,7 @@ class GroupByMoments(StatOperator):
                 col_names.append(name)
 
             if name not in self.moments:
-                self.moments[name] = GroupByMomentsCal(
-                    col=name,
-                    col_count=col_count,
-                    cont_col=self.cont_names,
-                    stats=self.stats,
-                    limit_frac=self.limit_frac,
-                    gpu_mem_util_limit=self.gpu_mem_util_limit,
-                    gpu_mem_trans_use=self.gpu_mem_trans_use,
-                    order_column_name=self.order_column_name,
-                )
+                self.moments[name] = self._new_moments(name, col_count)
 
             self.moments[name].fit(gdf[col_names])
         return
@@ -861,6 +1011,28 @@ class GroupByMoments(StatOperator):
         self.categories = {}
         return
 
+    def partial_state(self):
+        return {"moments": {name: cal.partial_state() for name, cal in self.moments.items()}}
+
+    def merge_state(self, state):
+        for name, cal_state in state["moments"].items():
+            if name not in self.moments:
+                self.moments[name] = self._new_moments(name, cal_state["col_count"])
+            self.moments[name].merge_state(cal_state)
+        return
+
+    def _new_moments(self, name, col_count):
+        return GroupByMomentsCal(
+            col=name,
+            col_count=col_count,
+            cont_col=self.cont_names,
+            stats=self.stats,
+            limit_frac=self.limit_frac,
+            gpu_mem_util_limit=self.gpu_mem_util_limit,
+            gpu_mem_trans_use=self.gpu_mem_trans_use,
+            order_column_name=self.order_column_name,
+        )
+
 
 class GroupBy(DFOperator):
     """
@@ -908,6 +1080,7 @@ class GroupBy(DFOperator):
 
     default_in = CAT
     default_out = CAT
+    gpu_only = True
 
     def __init__(
         self,
@@ -945,11 +1118,11 @@ class GroupBy(DFOperator):
             )
         ]
 
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         if self.cat_names is None:
             raise ValueError("cat_names cannot be None.")
 
-        new_gdf = cudf.DataFrame()
+        new_gdf = type(gdf)()
         for name in stats_context["moments"]:
             tran_gdf = stats_context["moments"][name].merge(gdf)
             new_gdf[tran_gdf.columns] = tran_gdf
@@ -998,6 +1171,7 @@ class Categorify(DFOperator):
 
     default_in = CAT
     default_out = CAT
+    gpu_only = True
 
     def __init__(
         self,
@@ -1034,9 +1208,9 @@ class Categorify(DFOperator):
         ]
 
     @annotate("Categorify_op", color="darkgreen", domain="nvt_python")
-    def op_logic(self, gdf: cudf.DataFrame, target_columns: list, stats_context=None):
+    def op_logic(self, gdf: "cudf.DataFrame", target_columns: list, stats_context=None):
         cat_names = target_columns
-        new_gdf = cudf.DataFrame()
+        new_gdf = type(gdf)()
         if not cat_names:
             return gdf
         cat_names = [name for name in cat_names if name in gdf.columns]
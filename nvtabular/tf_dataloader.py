@@ -161,9 +161,10 @@ class KerasSequenceDataset(tf.keras.utils.Sequence):
       the `__getitem__` method, but keep track of batches internally,
       setting this to a value different than the actual size of the
       dataset will have no impact in the frequency with which samples
-      are seen by the network. If left as `None`, initialization will
-      include one iteration through the dataset to count the dataset
-      size explicitly.
+      are seen by the network. If left as `None`, the size is read from
+      the metadata of the files (see `GPUDatasetIterator.num_rows`), and
+      only counted with one iteration through the dataset when that is
+      not possible (e.g. for compressed CSV files).
   """
 
     def __init__(
@@ -223,6 +224,8 @@ class KerasSequenceDataset(tf.keras.utils.Sequence):
         )
 
         # get dataset size if it wasn't provided
+        if dataset_size is None:
+            dataset_size = self._nvt_dataset.num_rows
         if dataset_size is None:
             dataset_size = 0
             for chunk in self._nvt_dataset:
@@ -18,7 +18,7 @@ import cudf
 import torch
 from torch.utils.dlpack import from_dlpack
 
-from nvtabular.io import GPUFileIterator
+from nvtabular.io import GPUDatasetIterator, GPUFileIterator
 
 
 class FileItrDataset(torch.utils.data.IterableDataset):
@@ -206,6 +206,10 @@ def process_one_df(
     )
 
 
+# the arguments of TorchTensorBatchFileItr that aren't passed on to the reader
+_BATCH_KWARGS = ("sub_batch_size", "cats", "conts", "labels", "pin_memory")
+
+
 class TorchTensorBatchFileItr(torch.utils.data.IterableDataset):
     """
         For Torch Only:
@@ -281,9 +285,15 @@ class TorchTensorBatchDatasetItr(torch.utils.data.ChainDataset):
         self.cur_path = None
         self.kwargs = kwargs
         self.rows = 0
-        for file_path in self.paths:
-            (num_rows, num_row_groups, columns,) = cudf.io.read_parquet_metadata(file_path)
-            self.rows += (num_rows // kwargs.get("sub_batch_size", 1)) + 1
+        sub_batch_size = kwargs.get("sub_batch_size", 1)
+        # the files are counted with the options they are read with (compression,
+        # filters, CSV names ...), which can leave their number of rows unknown
+        reader_kwargs = {k: v for k, v in kwargs.items() if k not in _BATCH_KWARGS}
+        file_num_rows = GPUDatasetIterator(paths, **reader_kwargs).file_num_rows
+        for file_path, num_rows in file_num_rows.items():
+            if num_rows is None:
+                num_rows = sum(len(batch) for batch in TorchTensorBatchFileItr(file_path, **kwargs))
+            self.rows += -(-num_rows // sub_batch_size)
 
     def __iter__(self):
         for path in self.paths:
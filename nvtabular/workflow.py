@@ -13,25 +13,53 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import collections
+import copy
+import glob
+import json
 import logging
+import multiprocessing
 import os
+import pickle
+import shutil
+import tempfile
 import time
+import tracemalloc
 import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-import cudf
+import pandas as pd
 import yaml
-from cudf._lib.nvtx import annotate
 
 from nvtabular.ds_writer import DatasetWriter
 from nvtabular.encoder import DLLabelEncoder
-from nvtabular.io import HugeCTR, Shuffler
+from nvtabular.io import (
+    GPUDatasetIterator,
+    GPUFileIterator,
+    HugeCTR,
+    Shuffler,
+    _column_size_stats,
+    _frame_memory,
+    _frame_nbytes,
+    annotate,
+)
 from nvtabular.ops import DFOperator, Export, OperatorRegistry, StatOperator, TransformOperator
 
+try:
+    import cudf
+except ImportError:
+    cudf = None
+
 try:
     import cupy as cp
 except ImportError:
     import numpy as cp
 
+try:
+    import rmm
+except ImportError:
+    rmm = None
+
 
 LOG = logging.getLogger("nvtabular")
 
@@ -63,6 +91,11 @@ class Workflow:
     config : bool
     export : bool, default False
     export_path : str, default "./ds_export"
+    op_bytes : bool, default False
+        measure the bytes in and out of every operator (see `metrics`)
+    peak_memory : bool, default False
+        measure the peak memory allocated by every operator and phase
+        (see `metrics`)
     """
 
     def __init__(
@@ -77,6 +110,8 @@ class Workflow:
         config=None,
         export=False,
         export_path="./ds_export",
+        op_bytes=False,
+        peak_memory=False,
     ):
         self.reg_funcs = {
             StatOperator: self.reg_stat_ops,
@@ -109,7 +144,14 @@ class Workflow:
             "shuffle_fin": 0.0,
             "preproc_apply": 0.0,
             "preproc_reapply": 0.0,
+            "spill": 0.0,
         }
+        # see `metrics`
+        self.op_bytes = op_bytes
+        self.peak_memory = peak_memory
+        self._memory = None
+        self._op_metrics = {}
+        self._phase_metrics = {}
         if config:
             self.load_config(config)
         else:
@@ -306,14 +348,86 @@ class Workflow:
             # add actual statistic operator, after all stats added
             self.stat_ops[stat_op._id] = stat_op
 
-    def write_to_dataset(self, path, itr, apply_ops=False, nfiles=1, shuffle=True, **kwargs):
-        """ Write data to shuffled parquet dataset.
+    def get_input_columns(self):
+        """
+        Returns the minimal set of dataset columns the registered operators
+        read: the base continuous, categorical and label columns, plus any
+        columns explicitly given to an operator that are not generated by
+        another operator.
         """
-        writer = DatasetWriter(path, nfiles=nfiles)
+        generated = self._generated_columns()
+        columns = list(self.columns_ctx["all"]["base"])
+        all_ops = list(self.feat_ops.values()) + list(self.df_ops.values())
+        for op in all_ops + list(self.stat_ops.values()):
+            requested = list(op.columns or [])
+            for attr in ("cat_names", "cont_names"):
+                requested += list(getattr(op, attr, None) or [])
+            for col in requested:
+                if col not in columns and col not in generated:
+                    columns.append(col)
+        return columns
+
+    def _generated_columns(self):
+        # the new columns the transforms register in the columns context,
+        # as planned on a copy of it and as registered by the runs so far
+        # (replacing transforms register the columns they read)
+        transforms = dict(self.feat_ops, **self.df_ops)
+
+        def creates_columns(op_id):
+            op = transforms.get(op_id, None)
+            return op is not None and not (op.replace and op.preprocessing)
+
+        generated = set()
+        for phase in self._plan_columns()["phases"]:
+            for entry in phase["ops"]:
+                if creates_columns(entry["op"]):
+                    generated.update(entry["writes"])
+        for cols_grp, ctx in self.columns_ctx.items():
+            if cols_grp == "final":
+                continue
+            for op_id, cols in ctx.items():
+                if creates_columns(op_id):
+                    generated.update(cols)
+        return generated
+
+    def _project(self, itr):
+        # push the columns required by the workflow down into the reader,
+        # so unused columns are never decoded
+        if isinstance(itr, GPUDatasetIterator):
+            return itr.project(self.get_input_columns())
+        return itr
+
+    def _observe(self, itr, gdf, phase_index):
+        # report the memory of transformed chunks to (adaptive) readers,
+        # the most expensive phase then drives the size of the reads
+        if isinstance(itr, (GPUDatasetIterator, GPUFileIterator)):
+            itr.observe(gdf, stage="phase_%d" % phase_index)
+
+    def write_to_dataset(
+        self,
+        path,
+        itr,
+        apply_ops=False,
+        nfiles=1,
+        shuffle=True,
+        format="parquet",
+        project=False,
+        **kwargs,
+    ):
+        """ Write data to shuffled parquet dataset (or to a dataset of
+        memory-mappable Arrow IPC files with `format="arrow"`).
+        With `apply_ops` and `project`, only the columns the workflow uses
+        (see `get_input_columns`) are read, the others are left out of the
+        dataset written.
+        """
+        writer = DatasetWriter(path, nfiles=nfiles, format=format)
+        if apply_ops and project:
+            itr = self._project(itr)
 
         for gdf in itr:
             if apply_ops:
                 gdf = self.apply_ops(gdf)
+                self._observe(itr, gdf, len(self.phases) - 1)
             writer.write(gdf, shuffle=shuffle)
         writer.write_metadata()
         return
@@ -340,42 +454,224 @@ class Workflow:
             self.master_task_list = self.master_task_list + self.task_sets[task_set]
 
         self.reg_all_ops(self.master_task_list)
-        baseline, leftovers = self.sort_task_types(self.master_task_list)
-        self.phases.append(baseline)
-        self.phase_creator(leftovers)
+        self.phases = self.plan_phases(self.master_task_list)
         # check if export wanted
         if self.export:
             self.phases_export()
         self.create_final_col_refs()
 
-    def phase_creator(self, task_list):
+    def plan_phases(self, task_list):
         """
-        task_list: list, phase specific list of operators and dependencies
-        ---
-        This function splits the operators in the task list and adds in any
-        dependent operators i.e. statistical operators required by selected
-        operators.
+        Splits the tasks into the fewest phases (passes over the data), each
+        statistic running in the first pass in which its inputs exist.
+        Duplicated statistics are only gathered once.
+
+        Parameters
+        -----------
+        task_list : list
+            tasks (operator, main_columns_class, col_sub_key, required_operators)
+
+        Returns
+        -------
+        list of phases, each a list of tasks in the order to run them
         """
-        for task in task_list:
-            added = False
+        # the duplicated statistics are dropped, their consumers wait for
+        # the task that is kept instead
+        kept, alias, seen = [], {}, {}
+        for idx, task in enumerate(task_list):
+            key = self._stat_key(task)
+            if key in seen:
+                alias[idx] = seen[key]
+                continue
+            if key is not None:
+                seen[key] = len(kept)
+            alias[idx] = len(kept)
+            kept.append(task)
+
+        def producers(op_id, cols_grp, target_cols=None):
+            # tasks of op_id, on the same column group (and targets) if any
+            found = [idx for idx, task in enumerate(task_list) if task[0]._id == op_id]
+            found = [idx for idx in found if task_list[idx][1] == cols_grp] or found
+            found = [idx for idx in found if task_list[idx][2] == target_cols] or found
+            return {alias[idx] for idx in found}
+
+        deps = []
+        for idx, (op, cols_grp, target_cols, parents) in enumerate(kept):
+            inputs, stats = set(), set()
+            for dep in target_cols:
+                if dep != "base":
+                    inputs |= producers(dep, cols_grp)
+            for parent in parents:
+                stats |= producers(parent._id, cols_grp, target_cols)
+            deps.append((inputs - {idx}, stats - {idx}))
+
+        levels = {}
+
+        def level(idx, path=()):
+            if idx not in levels:
+                if idx in path:
+                    raise ValueError(f"{kept[idx][0]._id} depends on itself")
+                path = path + (idx,)
+                is_stat = isinstance(kept[idx][0], StatOperator)
+                inputs, stats = deps[idx]
+                # transforms can only use statistics from the earlier phases
+                lvls = [level(dep, path) + 1 for dep in stats]
+                for dep in inputs:
+                    wait = not is_stat and isinstance(kept[dep][0], StatOperator)
+                    lvls.append(level(dep, path) + wait)
+                levels[idx] = max(lvls, default=0)
+            return levels[idx]
+
+        phases = [[] for _ in range(max(map(level, range(len(kept))), default=-1) + 1)]
+        for idx in range(len(kept)):
+            phases[levels[idx]].append(idx)
+        for pidx, phase in enumerate(phases):
+            # statistics first, as soon as their inputs are computed
+            pending = sorted(phase, key=lambda idx: not isinstance(kept[idx][0], StatOperator))
+            phases[pidx] = []
+            while pending:
+                idx = next(idx for idx in pending if not deps[idx][0] & set(pending))
+                pending.remove(idx)
+                phases[pidx].append(kept[idx])
+        LOG.debug("planned %d phases for %d tasks", len(phases), len(task_list))
+        return phases
+
+    def _stat_key(self, task):
+        # identifies the statistic gathered by a task, None for transforms
+        op = self.stat_ops.get(task[0]._id, task[0])
+        if not isinstance(op, StatOperator):
+            return None
+        cols_grp, target_cols = task[1], task[2]
+        if op.columns:
+            return op._id, tuple(op.columns)
+        if set(target_cols) == {"base"}:
+            return op._id, tuple(self.columns_ctx[cols_grp]["base"])
+        return op._id, cols_grp, tuple(target_cols)
+
+    def explain(self, itr=None, analyze=False, sample_rows=10000, file=None):
+        """
+        Prints the phases of the workflow and the columns every operator
+        reads and writes. Given `itr`, also estimates the bytes read and the
+        chunk memory of every phase from a sample of `sample_rows` rows,
+        and with `analyze` times the operators on that sample.
 
-            cols_needed = task[2].copy()
-            if "base" in cols_needed:
-                cols_needed.remove("base")
-            for idx, phase in enumerate(self.phases):
-                if added:
-                    break
-                for p_task in phase:
-                    if not cols_needed:
-                        break
-                    if p_task[0]._id in cols_needed:
-                        cols_needed.remove(p_task[0]._id)
-                if not cols_needed and self.find_parents(task[3], idx):
-                    added = True
-                    phase.append(task)
-
-            if not added:
-                self.phases.append([task])
+        Parameters
+        -----------
+        itr : GPUDatasetIterator, default None
+            dataset the workflow is to be applied to, required with `analyze`
+        analyze : bool, default False
+        sample_rows : int, default 10000
+        file : file-like object, default sys.stdout
+
+        Returns
+        -------
+        dict with the plan printed
+        """
+        if not self.phases:
+            self.finalize()
+        if analyze and not isinstance(itr, GPUDatasetIterator):
+            raise TypeError("analyze requires a GPUDatasetIterator.")
+        plan = self._plan_columns()
+        input_columns = self.get_input_columns()
+        plan["columns_read"] = input_columns
+        sample = None
+        if isinstance(itr, GPUDatasetIterator):
+            itr = self._project(itr)
+            plan["columns_read"] = list(itr.columns or input_columns)
+            plan["bytes_read"] = itr.read_bytes
+            sample = itr.sample(sample_rows)
+        if sample is not None and len(sample):
+            self._estimate_memory(plan, itr, sample)
+        if analyze and sample is not None and len(sample):
+            self._analyze(plan, itr, sample)
+        print(_format_plan(plan), file=file)
+        return plan
+
+    def _plan_columns(self):
+        # the columns read and written by the tasks of every phase, resolved
+        # on a copy of the columns context
+        columns_ctx = copy.deepcopy(self.columns_ctx)
+        phases = []
+        for idx, phase in enumerate(self.phases):
+            ops = []
+            depends_on = set()
+            for task in phase:
+                op = self.find_op(task[0]._id) or task[0]
+                reads = list(op.get_columns(columns_ctx, task[1], task[2]))
+                writes = []
+                if op._id in self.feat_ops or op._id in self.df_ops:
+                    replace = op.replace and op.preprocessing
+                    writes = reads if replace else [f"{col}_{op._id}" for col in reads]
+                    op.update_columns_ctx(columns_ctx, task[1], writes, reads)
+                for parent in task[3]:
+                    for prev in range(idx - 1, -1, -1):
+                        if any(prev_task[0]._id == parent._id for prev_task in self.phases[prev]):
+                            depends_on.add(prev)
+                            break
+                ops.append(
+                    {
+                        "op": op._id,
+                        "type": "stat" if isinstance(op, StatOperator) else "transform",
+                        "columns_group": task[1],
+                        "reads": reads,
+                        "writes": writes,
+                    }
+                )
+            phases.append({"phase": idx, "depends_on": sorted(depends_on), "ops": ops})
+        return {"passes": len(phases), "phases": phases}
+
+    def _estimate_memory(self, plan, itr, sample):
+        # the chunks of a phase hold the columns read plus those written
+        # so far, a new column taking as much memory as the one it is from
+        col_sizes = {col: size for col, (size, _) in _column_size_stats(sample).items()}
+        row_size = sum(col_sizes.get(col, 0.0) for col in plan["columns_read"])
+        batch_rows = itr.batch_rows(row_size)
+        plan["batch_rows"] = batch_rows
+        for phase in plan["phases"]:
+            for entry in phase["ops"]:
+                for col, source in zip(entry["writes"], entry["reads"]):
+                    if col not in col_sizes:
+                        col_sizes[col] = col_sizes.get(source, 8.0)
+                        row_size += col_sizes[col]
+            phase["bytes_read"] = plan["bytes_read"]
+            phase["peak_memory"] = batch_rows * row_size
+
+    def _analyze(self, plan, itr, sample):
+        # fits the statistics on the sample, timing every task, and then
+        # restores those of the workflow
+        saved = pickle.dumps(
+            (
+                {op_id: op.partial_state() for op_id, op in self.stat_ops.items()},
+                self.stats,
+                self.columns_ctx,
+                self._op_metrics,
+                self._phase_metrics,
+            )
+        )
+        try:
+            self.clear_stats()
+            gdf = sample
+            for phase, phase_plan in zip(self.phases, plan["phases"]):
+                stat_ops_ran = []
+                peak_row_size = _frame_memory(gdf) / len(sample)
+                for task, entry in zip(phase, phase_plan["ops"]):
+                    start = time.time()
+                    gdf, ran = self.run_ops_for_phase(gdf, [task])
+                    entry["time"] = time.time() - start
+                    entry["rows_per_sec"] = len(sample) / max(entry["time"], 1e-9)
+                    stat_ops_ran += [op for op in ran if op not in stat_ops_ran]
+                    peak_row_size = max(peak_row_size, _frame_memory(gdf) / len(sample))
+                for stat_op in stat_ops_ran:
+                    stat_op.finalize()
+                self.get_stats()
+                phase_plan["peak_memory"] = plan["batch_rows"] * peak_row_size
+        finally:
+            stat_states, self.stats, self.columns_ctx, *metrics = pickle.loads(saved)
+            self._op_metrics, self._phase_metrics = metrics
+            for op_id, state in stat_states.items():
+                # finalizing is a no-op for the stats never gathered
+                self.stat_ops[op_id].load_partial_state(state)
+                self.stat_ops[op_id].finalize()
 
     def phases_export(self):
         """
@@ -393,42 +689,6 @@ class Workflow:
                 tar_path = os.path.join(self.ds_exports, str(idx))
                 phase.append([Export(path=f"{tar_path}"), None, [], []])
 
-    def find_parents(self, ops_list, phase_idx):
-        """
-        Attempt to find all ops in ops_list within subrange of phases
-        """
-        ops_copy = ops_list.copy()
-        for op in ops_list:
-            for phase in self.phases[:phase_idx]:
-                if not ops_copy:
-                    break
-                for task in phase:
-                    if not ops_copy:
-                        break
-                    if op._id in task[0]._id:
-                        ops_copy.remove(op)
-        if not ops_copy:
-            return True
-
-    def sort_task_types(self, master_list):
-        """
-        This function helps ordering and breaking up the master list of operators into the
-        correct phases.
-
-        Parameters
-        -----------
-        master_list : list
-            a complete list of all necessary operators to complete specified pipeline
-        """
-        nodeps = []
-        for tup in master_list:
-            if "base" in tup[2]:
-                # base feature with no dependencies
-                if not tup[3]:
-                    master_list.remove(tup)
-                    nodeps.append(tup)
-        return nodeps, master_list
-
     def compile_dict_from_list(self, task_list_dict):
         """
         This function retrieves all the operators from the different keys in
@@ -622,11 +882,18 @@ class Workflow:
                 return True
         return False
 
-    def run_ops_for_phase(self, gdf, tasks, record_stats=True):
+    def run_ops_for_phase(self, gdf, tasks, record_stats=True, phase_index=None):
         run_stat_ops = []
+        # measuring the frames costs about as much as some operators
+        nbytes = _frame_nbytes(gdf) if self.op_bytes else 0
+        memory = self._memory_tracker(gdf)
         for task in tasks:
             op, cols_grp, target_cols, parents = task
             LOG.debug("running op %s", op._id)
+            if memory is not None:
+                memory.push()
+            start = time.time()
+            num_rows = len(gdf)
             if record_stats and op._id in self.stat_ops:
                 op = self.stat_ops[op._id]
                 op.apply_op(gdf, self.columns_ctx, cols_grp, target_cols=target_cols)
@@ -643,8 +910,155 @@ class Workflow:
                     target_cols=target_cols,
                     stats_context=self.stats,
                 )
+            else:
+                if memory is not None:
+                    memory.pop()
+                continue
+            elapsed = time.time() - start
+            peak = memory.pop() if memory is not None else 0
+            key = (phase_index, op._id, cols_grp)
+            if key not in self._op_metrics:
+                self._op_metrics[key] = _new_metrics(
+                    phase=phase_index,
+                    op=op._id,
+                    type="stat" if op._id in self.stat_ops else "transform",
+                    columns_group=cols_grp,
+                )
+            bytes_in = nbytes
+            if self.op_bytes and op._id not in self.stat_ops:
+                nbytes = _frame_nbytes(gdf)
+            _add_metrics(self._op_metrics[key], elapsed, num_rows, len(gdf), bytes_in, nbytes, peak)
         return gdf, run_stat_ops
 
+    def _memory_tracker(self, gdf):
+        # the peaks of the chunks of a dataset are all measured on its device
+        if not self.peak_memory:
+            return None
+        device = "cpu" if isinstance(gdf, pd.DataFrame) else "gpu"
+        if self._memory is None or self._memory.device != device:
+            self._memory = _PeakMemory(device)
+        return self._memory
+
+    def _record_phase(self, phase_index, chunk):
+        # `chunk` holds the rows and bytes in and out of a chunk of the
+        # phase, and the time spent reading it and applying the phases
+        if phase_index not in self._phase_metrics:
+            self._phase_metrics[phase_index] = _new_metrics(
+                phase=phase_index, read_time=0.0, reapply_time=0.0
+            )
+        metrics = self._phase_metrics[phase_index]
+        elapsed = chunk["read_time"] + chunk["reapply_time"] + chunk["apply_time"]
+        _add_metrics(
+            metrics,
+            elapsed,
+            chunk["rows_in"],
+            chunk["rows_out"],
+            chunk["bytes_in"],
+            chunk["bytes_out"],
+            chunk["peak_memory"],
+        )
+        metrics["read_time"] += chunk["read_time"]
+        metrics["reapply_time"] += chunk["reapply_time"]
+
+    def _apply_chunk(self, gdf, phase_index, input_phase, record_stats):
+        # runs the phases from `input_phase` to `phase_index` on a chunk
+        chunk = {"rows_in": len(gdf), "bytes_in": _frame_nbytes(gdf)}
+        memory = self._memory_tracker(gdf)
+        if memory is not None:
+            memory.push()
+        # run all previous phases to get df to correct state
+        start = time.time()
+        for i in range(input_phase, phase_index):
+            gdf, _ = self.run_ops_for_phase(gdf, self.phases[i], record_stats=False, phase_index=i)
+        chunk["reapply_time"] = time.time() - start
+        start = time.time()
+        gdf, stat_ops_ran = self.run_ops_for_phase(
+            gdf, self.phases[phase_index], record_stats=record_stats, phase_index=phase_index
+        )
+        chunk["apply_time"] = time.time() - start
+        chunk["peak_memory"] = memory.pop() if memory is not None else 0
+        chunk["rows_out"], chunk["bytes_out"] = len(gdf), _frame_nbytes(gdf)
+        return gdf, stat_ops_ran, chunk
+
+    def _apply_chunks(self, itr, phase_index, input_phase, record_stats):
+        read_start = time.time()
+        for gdf in itr:
+            read_time = time.time() - read_start
+            gdf, stat_ops_ran, chunk = self._apply_chunk(
+                gdf, phase_index, input_phase, record_stats
+            )
+            chunk["read_time"] = read_time
+            yield gdf, stat_ops_ran, chunk
+            gdf = None
+            read_start = time.time()
+
+    def _apply_in_processes(
+        self, itr, phase_index, input_phase, record_stats, keep_chunks, num_processes, ordered
+    ):
+        # the processes start from a copy of the workflow (with the stats of
+        # the earlier phases), and send back the stats gathered on every
+        # chunk, which are merged into those of the workflow. Processes are
+        # spawned rather than forked, to not inherit the state of CUDA.
+        pool = ProcessPoolExecutor(
+            num_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self, phase_index, input_phase, record_stats, keep_chunks),
+        )
+        pending = collections.deque()
+        with pool:
+            try:
+                read_start = time.time()
+                for gdf in itr:
+                    read_time = time.time() - read_start
+                    pending.append((pool.submit(_apply_in_worker, gdf), read_time))
+                    gdf = None
+                    # a couple of chunks in flight per process
+                    while len(pending) >= 2 * num_processes:
+                        yield self._merge_worker_result(*_pop_result(pending, ordered))
+                    read_start = time.time()
+                while pending:
+                    yield self._merge_worker_result(*_pop_result(pending, ordered))
+            finally:
+                for future, _ in pending:
+                    future.cancel()
+
+    def _merge_worker_result(self, future, read_time):
+        gdf, stat_states, op_metrics, columns_ctx, chunk = future.result()
+        chunk["read_time"] = read_time
+        # the columns the transforms of the worker made
+        _merge_columns_ctx(self.columns_ctx, columns_ctx)
+        stat_ops_ran = []
+        for op_id, state in stat_states:
+            stat_op = self.stat_ops[op_id]
+            stat_op.merge(state)
+            stat_ops_ran.append(stat_op)
+        for key, metrics in op_metrics.items():
+            _merge_metrics(self._op_metrics, key, metrics)
+        return gdf, stat_ops_ran, chunk
+
+    @property
+    def metrics(self):
+        """
+        Time, chunks, rows and bytes processed by the operators ("ops")
+        and phases ("phases") run so far, as lists of records. The bytes of
+        the ops are only measured with `op_bytes`, and the peak memory
+        allocated ("peak_memory_delta") with `peak_memory`.
+        """
+        return {
+            name: [dict(records[key]) for key in sorted(records, key=_metrics_phase)]
+            for name, records in [("ops", self._op_metrics), ("phases", self._phase_metrics)]
+        }
+
+    def export_metrics(self, path):
+        """ Writes `metrics` to the JSON file `path` """
+        with open(path, "w") as outfile:
+            json.dump(self.metrics, outfile, indent=2)
+
+    def clear_metrics(self):
+        self._op_metrics = {}
+        self._phase_metrics = {}
+
     # run phase
     def exec_phase(
         self,
@@ -655,24 +1069,56 @@ class Workflow:
         shuffler=None,
         num_out_files=None,
         huge_ctr=None,
+        checkpoint_path=None,
+        checkpoint_interval=600,
+        input_phase=0,
+        spill=None,
+        num_processes=1,
+        ordered=True,
     ):
         """
         Gather necessary column statistics in single pass.
-        Execute one phase only, given by phase index
+        Execute one phase only, given by phase index.
+        The chunks of `itr` are the output of the phases before
+        `input_phase`, and the output of the phase is written to `spill`
+        (a _PhaseSpill) if given. With `num_processes > 1`, the chunks
+        are applied by a pool of processes (see `update_stats`).
         """
         LOG.debug("running phase %s", phase_index)
-        stat_ops_ran = []
-        for gdf in itr:
-            # run all previous phases to get df to correct state
-            start = time.time()
-            for i in range(phase_index):
-                gdf, _ = self.run_ops_for_phase(gdf, self.phases[i], record_stats=False)
-            self.timings["preproc_reapply"] += time.time() - start
-            start = time.time()
-            gdf, stat_ops_ran = self.run_ops_for_phase(
-                gdf, self.phases[phase_index], record_stats=record_stats
+        last_phase = phase_index == len(self.phases) - 1
+        if num_processes > 1:
+            if checkpoint_path:
+                raise ValueError("checkpoints can't be taken with num_processes > 1.")
+            if isinstance(itr, (GPUDatasetIterator, GPUFileIterator)) and _device(itr) != "cpu":
+                raise ValueError("num_processes > 1 requires a dataset read with device='cpu'.")
+            for phase in self.phases[input_phase : phase_index + 1]:
+                gpu_only = [task[0]._id for task in phase if task[0].gpu_only]
+                if gpu_only:
+                    raise ValueError(
+                        f"{', '.join(gpu_only)} can't run on the CPU with num_processes > 1."
+                    )
+            # the chunks only come back from the processes to be written
+            keep_chunks = spill is not None or bool(last_phase and (export_path or huge_ctr))
+            results = self._apply_in_processes(
+                itr, phase_index, input_phase, record_stats, keep_chunks, num_processes, ordered
             )
-            self.timings["preproc_apply"] += time.time() - start
+        else:
+            results = self._apply_chunks(itr, phase_index, input_phase, record_stats)
+        stat_ops_ran = []
+        last_checkpoint = time.time()
+        for gdf, ran, chunk in results:
+            stat_ops_ran += [stat_op for stat_op in ran if stat_op not in stat_ops_ran]
+            self.timings["preproc_reapply"] += chunk["reapply_time"]
+            self.timings["preproc_apply"] += chunk["apply_time"]
+            self._record_phase(phase_index, chunk)
+            if gdf is None:
+                continue
+            self._observe(itr, gdf, phase_index)
+
+            if spill is not None:
+                start = time.time()
+                spill.write(gdf, chunk["read_time"] + chunk["reapply_time"] + chunk["apply_time"])
+                self.timings["spill"] += time.time() - start
 
             if export_path and phase_index == len(self.phases) - 1:
                 self.write_df(
@@ -690,12 +1136,27 @@ class Workflow:
                 huge_ctr.add_data(gdf)
 
             gdf = None
+            if checkpoint_path and time.time() - last_checkpoint >= checkpoint_interval:
+                self.save_checkpoint(
+                    checkpoint_path, phase_index, itr.state(), shuffler=shuffler, huge_ctr=huge_ctr
+                )
+                last_checkpoint = time.time()
+        if record_stats and not stat_ops_ran:
+            # e.g. resumed from a checkpoint taken after the last chunk
+            for task in self.phases[phase_index]:
+                stat_op = self.stat_ops.get(task[0]._id, None)
+                if stat_op is not None and stat_op not in stat_ops_ran:
+                    stat_ops_ran.append(stat_op)
         # if export is activated combine as many GDFs as possible and
         # then write them out cudf.concat([exp_gdf, gdf], axis=0)
         for stat_op in stat_ops_ran:
-            stat_op.read_fin()
+            stat_op.finalize()
             # missing bubble up to preprocessor
         self.get_stats()
+        if checkpoint_path:
+            self.save_checkpoint(
+                checkpoint_path, phase_index + 1, shuffler=shuffler, huge_ctr=huge_ctr
+            )
 
     def apply(
         self,
@@ -708,6 +1169,14 @@ class Workflow:
         hugectr_gen_output=False,
         hugectr_output_path="./hugectr",
         hugectr_num_out_files=None,
+        checkpoint_path=None,
+        checkpoint_interval=600,
+        resume_from=None,
+        spill=False,
+        spill_path=None,
+        num_processes=1,
+        ordered=True,
+        project=False,
     ):
 
         """
@@ -728,18 +1197,40 @@ class Workflow:
         num_out_files : integer
             number of files to create after shuffling
             the data
+        checkpoint_path : str, default None
+            file to save progress to every `checkpoint_interval` seconds
+        checkpoint_interval : float, default 600
+        resume_from : str, default None
+            checkpoint to resume an interrupted run from
+        spill : bool or 'auto', default False
+            spill the output of the phases instead of recomputing it
+        spill_path : str, default None
+        num_processes : int, default 1
+            processes applying the chunks of a `device="cpu"` dataset
+        ordered : bool, default True
+            write the chunks of the processes in the order they were read
+        project : bool, default False
+            only read the columns the workflow uses
         """
 
         # if no tasks have been loaded then we need to load internal config\
         shuffler = None
         huge_ctr = None
+        checkpoint = None
         if not self.phases:
             self.finalize()
+        if resume_from:
+            checkpoint = self.load_checkpoint(resume_from)
         if shuffle:
-            shuffler = Shuffler(output_path, num_out_files=num_out_files)
+            generation = (checkpoint or {}).get("shuffler", None) or 0
+            shuffler = Shuffler(output_path, num_out_files=num_out_files, generation=generation)
         if hugectr_gen_output:
             self.cal_col_names = False
-            huge_ctr = HugeCTR(hugectr_output_path, num_out_files=hugectr_num_out_files,)
+            huge_ctr = HugeCTR(
+                hugectr_output_path,
+                num_out_files=hugectr_num_out_files,
+                state=checkpoint["huge_ctr"] if checkpoint else None,
+            )
         if apply_offline:
             self.update_stats(
                 dataset,
@@ -748,6 +1239,14 @@ class Workflow:
                 shuffler=shuffler,
                 num_out_files=num_out_files,
                 huge_ctr=huge_ctr,
+                checkpoint_path=checkpoint_path,
+                checkpoint_interval=checkpoint_interval,
+                checkpoint=checkpoint,
+                spill=spill,
+                spill_path=spill_path,
+                num_processes=num_processes,
+                ordered=ordered,
+                project=project,
             )
         else:
             self.apply_ops(
@@ -772,18 +1271,81 @@ class Workflow:
         shuffler=None,
         num_out_files=None,
         huge_ctr=None,
+        checkpoint_path=None,
+        checkpoint_interval=600,
+        checkpoint=None,
+        spill=False,
+        spill_path=None,
+        num_processes=1,
+        ordered=True,
+        incremental=False,
+        partial_states_path=None,
+        project=False,
     ):
+        """
+        Runs the phases of the workflow over `itr`, one pass per phase.
+
+        With `spill`, the output of a phase is written to Arrow files in
+        `spill_path` and read back by the next passes ('auto' only keeps it
+        when that is measured to be faster). With `num_processes > 1`, the
+        chunks of a CPU dataset are applied by a pool of processes, which
+        can't run `gpu_only` operators. With `incremental`, the statistics
+        are extended with those of `itr` and saved to `partial_states_path`.
+        Only the columns the workflow uses are read when nothing is
+        written, or with `project`.
+        """
         end = end_phase if end_phase else len(self.phases)
-        for idx, _ in enumerate(self.phases[:end]):
-            self.exec_phase(
-                itr,
-                idx,
-                export_path=output_path,
-                record_stats=record_stats,
-                shuffler=shuffler,
-                num_out_files=num_out_files,
-                huge_ctr=huge_ctr,
-            )
+        if incremental and partial_states_path and os.path.exists(partial_states_path):
+            self.load_partial_states(partial_states_path)
+        elif record_stats and checkpoint is None and not incremental:
+            self.clear_stats()
+        if project or not (output_path or shuffler or huge_ctr):
+            itr = self._project(itr)
+        if (checkpoint_path or checkpoint) and not isinstance(itr, GPUDatasetIterator):
+            raise TypeError("checkpoints require a GPUDatasetIterator.")
+        if checkpoint_path or checkpoint:
+            # the position of a checkpoint is in the dataset itself
+            spill = False
+        start = 0
+        if checkpoint is not None:
+            # resume from the phase (and the chunk) of the checkpoint
+            start = checkpoint["phase"]
+            if checkpoint["iterator"] is not None:
+                itr.load_state(checkpoint["iterator"])
+        input_phase = start
+        input_spill = phase_spill = None
+        try:
+            for idx in range(start, end):
+                phase_spill = None
+                if spill and idx < end - 1:
+                    phase_spill = _PhaseSpill(spill_path, end - 1 - idx, auto=spill == "auto")
+                self.exec_phase(
+                    itr,
+                    idx,
+                    export_path=output_path,
+                    record_stats=record_stats,
+                    shuffler=shuffler,
+                    num_out_files=num_out_files,
+                    huge_ctr=huge_ctr,
+                    checkpoint_path=checkpoint_path,
+                    checkpoint_interval=checkpoint_interval,
+                    input_phase=input_phase,
+                    spill=phase_spill,
+                    num_processes=num_processes,
+                    ordered=ordered,
+                )
+                if phase_spill is not None and phase_spill.close():
+                    # the next phases read the output of this one
+                    if input_spill is not None:
+                        input_spill.discard()
+                    input_spill = phase_spill
+                    itr = phase_spill.iterator(itr)
+                    input_phase = idx + 1
+        finally:
+            for unused in {input_spill, phase_spill} - {None}:
+                unused.discard()
+        if incremental and partial_states_path:
+            self.save_partial_states(partial_states_path)
 
     def apply_ops(
         self,
@@ -808,11 +1370,11 @@ class Workflow:
         start = start_phase if start_phase else 0
         end = end_phase if end_phase else len(self.phases)
         for phase_index in range(start, end):
-            start = time.time()
-            gdf, stat_ops_ran = self.run_ops_for_phase(
-                gdf, self.phases[phase_index], record_stats=record_stats
+            gdf, stat_ops_ran, chunk = self._apply_chunk(
+                gdf, phase_index, phase_index, record_stats
             )
-            self.timings["preproc_apply"] += time.time() - start
+            self.timings["preproc_apply"] += chunk["apply_time"]
+            self._record_phase(phase_index, dict(chunk, read_time=0.0))
             if phase_index == len(self.phases) - 1 and output_path:
                 self.write_df(
                     gdf, output_path, shuffler=shuffler, num_out_files=num_out_files,
@@ -890,6 +1452,66 @@ class Workflow:
             self.stats["encoders"][col] = DLLabelEncoder(col, cats=cudf.Series(cats[0]))
         self.reg_all_ops(self.master_task_list)
 
+    def save_partial_states(self, path):
+        """
+        Saves the statistics gathered so far by the operators (see
+        `StatOperator.partial_state`) to `path` (atomically), to be
+        extended later by `update_stats(..., incremental=True)`.
+        """
+        states = {op_id: op.partial_state() for op_id, op in self.stat_ops.items()}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as outfile:
+            pickle.dump(states, outfile)
+        os.replace(tmp_path, path)
+        LOG.debug("saved partial states to %s", path)
+
+    def load_partial_states(self, path):
+        """
+        Restores the statistics saved by `save_partial_states`, finalized.
+        """
+        with open(path, "rb") as infile:
+            states = pickle.load(infile)
+        for op_id, state in states.items():
+            self.stat_ops[op_id].load_partial_state(state)
+            self.stat_ops[op_id].finalize()
+        self.get_stats()
+
+    def save_checkpoint(self, path, phase_index, itr_state=None, shuffler=None, huge_ctr=None):
+        """
+        Saves the progress of `apply` to `path` (atomically): the phase,
+        the iterator position, the partial statistics and the outputs' state.
+        """
+        checkpoint = {
+            "phase": phase_index,
+            "iterator": itr_state,
+            "stat_ops": {op_id: op.partial_state() for op_id, op in self.stat_ops.items()},
+            "current_file_num": self.current_file_num,
+            "shuffler": shuffler.rotate() if shuffler else None,
+            "huge_ctr": huge_ctr.state() if huge_ctr else None,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as outfile:
+            pickle.dump(checkpoint, outfile)
+        os.replace(tmp_path, path)
+        LOG.debug("saved checkpoint of phase %s to %s", phase_index, path)
+
+    def load_checkpoint(self, path):
+        """
+        Restores the statistics saved by `save_checkpoint` and returns
+        the checkpoint
+        """
+        with open(path, "rb") as infile:
+            checkpoint = pickle.load(infile)
+        for op_id, state in checkpoint["stat_ops"].items():
+            self.stat_ops[op_id].load_partial_state(state)
+        for phase in self.phases[: checkpoint["phase"]]:
+            # the stats of the phases done were finalized
+            for task in phase:
+                if task[0]._id in self.stat_ops:
+                    self.stats.update(self.stat_ops[task[0]._id].finalize())
+        self.current_file_num = checkpoint["current_file_num"]
+        return checkpoint
+
     def clear_stats(self):
 
         for stat, vals in self.stats.items():
@@ -919,6 +1541,261 @@ class Workflow:
         return master_list
 
 
+class _PeakMemory:
+    """
+    Peak memory allocated (in bytes) above the start of nested blocks of
+    code (`push` ... `pop`): traced by tracemalloc on the CPU, and by the
+    RMM statistics on the GPU. Versions of RMM without statistics only
+    sample the used device memory at the start and end of the blocks, which
+    misses the temporaries freed in between.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        # the bytes of every open block still allocated before the last
+        # reset of the counters, and its peak so far
+        self.blocks = []
+        self.tracing = False
+        self.sample = None
+
+    def push(self):
+        if self.device == "cpu":
+            if not self.blocks and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.tracing = True
+            self._update()
+        elif _rmm_statistics():
+            if not rmm.statistics.is_statistics_enabled():
+                rmm.statistics.enable_statistics()
+            rmm.statistics.push_statistics()
+        else:
+            self._update()
+        self.blocks.append([0, 0])
+
+    def pop(self):
+        if self.device == "cpu" or not _rmm_statistics():
+            self._update()
+            peak = self.blocks.pop()[1]
+        else:
+            self.blocks.pop()
+            peak = rmm.statistics.pop_statistics().peak_bytes
+        if self.tracing and not self.blocks:
+            tracemalloc.stop()
+            self.tracing = False
+        return max(int(peak), 0)
+
+    def _update(self):
+        # counts what was allocated since the last update towards all the
+        # open blocks, then resets the counters
+        if self.device == "cpu":
+            current, peak = tracemalloc.get_traced_memory()
+            # frees of the memory traced before the reset aren't counted
+            tracemalloc.clear_traces()
+        else:
+            sample = _used_device_memory()
+            current = peak = sample - (sample if self.sample is None else self.sample)
+            self.sample = sample
+        for block in self.blocks:
+            block[1] = max(block[1], block[0] + peak)
+            block[0] += current
+
+
+def _rmm_statistics():
+    return rmm is not None and hasattr(rmm, "statistics")
+
+
+def _used_device_memory():
+    info = rmm.get_info()
+    return info.total - info.free
+
+
+class _PhaseSpill:
+    """
+    Output of a phase spilled to Arrow files, read by the `passes` next
+    phases. With `auto`, it's given up if recomputing it looks cheaper.
+    """
+
+    def __init__(self, path, passes, auto=True):
+        self.path = tempfile.mkdtemp(prefix="nvt_spill_", dir=path)
+        self.passes = passes
+        self.auto = auto
+        self.writer = DatasetWriter(self.path, nfiles=1, format="arrow")
+
+    def write(self, gdf, compute_time):
+        if self.writer is None:
+            return
+        start = time.time()
+        self.writer.write(gdf, shuffle=False)
+        write_time = time.time() - start
+        if self.auto:
+            self.auto = False
+            spill_time = write_time * (1 + self.passes)
+            recompute_time = compute_time * self.passes
+            LOG.debug("spill: %.3fs, recompute: %.3fs", spill_time, recompute_time)
+            if spill_time >= recompute_time:
+                self.discard()
+
+    def close(self):
+        """ Completes the spill, returns False if it was given up """
+        if self.writer is None:
+            return False
+        if all(writer is None for writer in self.writer.writers.values()):
+            # nothing to read back
+            self.discard()
+            return False
+        self.writer.close_writers()
+        return True
+
+    def iterator(self, itr):
+        """ Iterator over the spilled chunks, read like those of `itr` """
+        kwargs = {}
+        if isinstance(itr, GPUDatasetIterator):
+            for key in ("gpu_memory_frac", "batch_size", "device"):
+                if key in itr.kwargs:
+                    kwargs[key] = itr.kwargs[key]
+        paths = sorted(glob.glob(os.path.join(self.path, "*.arrow")))
+        return GPUDatasetIterator(paths, engine="arrow", **kwargs)
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close_writers()
+            self.writer = None
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _new_metrics(**labels):
+    metrics = dict(labels)
+    metrics.update(
+        time=0.0,
+        chunks=0,
+        rows_in=0,
+        rows_out=0,
+        bytes_in=0,
+        bytes_out=0,
+        bytes_delta=0,
+        peak_memory_delta=0,
+    )
+    return metrics
+
+
+def _add_metrics(metrics, elapsed, rows_in, rows_out, bytes_in, bytes_out, peak_memory=0):
+    metrics["time"] += elapsed
+    metrics["chunks"] += 1
+    metrics["rows_in"] += rows_in
+    metrics["rows_out"] += rows_out
+    metrics["bytes_in"] += bytes_in
+    metrics["bytes_out"] += bytes_out
+    metrics["bytes_delta"] = max(metrics["bytes_delta"], bytes_out - bytes_in)
+    metrics["peak_memory_delta"] = max(metrics["peak_memory_delta"], peak_memory)
+
+
+def _merge_metrics(records, key, other):
+    if key not in records:
+        records[key] = dict(other)
+        return
+    metrics = records[key]
+    for name in ["time", "chunks", "rows_in", "rows_out", "bytes_in", "bytes_out"]:
+        metrics[name] += other[name]
+    for name in ["bytes_delta", "peak_memory_delta"]:
+        metrics[name] = max(metrics[name], other[name])
+
+
+def _merge_columns_ctx(columns_ctx, other):
+    for cols_grp, ctx in other.items():
+        if cols_grp != "final":
+            columns_ctx.setdefault(cols_grp, {}).update(ctx)
+            continue
+        for key, op_ids in ctx["ctx"].items():
+            final = columns_ctx["final"]["ctx"].setdefault(key, [])
+            final.extend(op_id for op_id in op_ids if op_id not in final)
+
+
+def _device(itr):
+    if isinstance(itr, GPUDatasetIterator):
+        return itr.kwargs.get("device", "gpu")
+    return itr.device
+
+
+def _pop_result(pending, ordered):
+    # the oldest chunk in flight, or the first done if not `ordered`
+    if not ordered:
+        wait([future for future, _ in pending], return_when=FIRST_COMPLETED)
+        for item in pending:
+            if item[0].done():
+                pending.remove(item)
+                return item
+    return pending.popleft()
+
+
+# the arguments of the workflow processes, see Workflow._apply_in_processes
+_worker_args = None
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _apply_in_worker(gdf):
+    # applies the phase to a chunk, gathering the stats of that chunk alone
+    workflow, phase_index, input_phase, record_stats, keep_chunk = _worker_args
+    workflow.clear_metrics()
+    for stat_op in workflow.stat_ops.values():
+        stat_op.clear()
+    gdf, stat_ops_ran, chunk = workflow._apply_chunk(gdf, phase_index, input_phase, record_stats)
+    gdf = gdf if keep_chunk else None
+    stat_states = [(stat_op._id, stat_op.partial_state()) for stat_op in stat_ops_ran]
+    return gdf, stat_states, workflow._op_metrics, workflow.columns_ctx, chunk
+
+
+def _metrics_phase(key):
+    # records are listed by phase (those run outside of a phase first),
+    # then in the order they were first run
+    phase = key[0] if isinstance(key, tuple) else key
+    return -1 if phase is None else phase
+
+
+def _format_bytes(nbytes):
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if nbytes < 1024 or unit == "TB":
+            return "%.1f %s" % (nbytes, unit)
+        nbytes /= 1024
+
+
+def _format_plan(plan):
+    # the text of Workflow.explain
+    passes = plan["passes"]
+    lines = [f"Workflow plan: {passes} phase(s), {passes} pass(es) over the dataset"]
+    lines.append("columns read: " + ", ".join(plan["columns_read"]))
+    if "bytes_read" in plan:
+        lines.append(
+            "bytes read: %s per pass, %s in total"
+            % (_format_bytes(plan["bytes_read"]), _format_bytes(plan["bytes_read"] * passes))
+        )
+    if "batch_rows" in plan:
+        lines.append("rows per chunk: %d" % plan["batch_rows"])
+    for phase in plan["phases"]:
+        line = "phase %d (pass %d/%d)" % (phase["phase"], phase["phase"] + 1, passes)
+        if phase["depends_on"]:
+            line += ", after phase " + ", ".join(str(dep) for dep in phase["depends_on"])
+        if "peak_memory" in phase:
+            line += ", peak memory %s" % _format_bytes(phase["peak_memory"])
+        lines.append(line)
+        for entry in phase["ops"]:
+            line = "  %-9s %-15s %-11s reads %s" % (
+                entry["type"],
+                entry["op"],
+                entry["columns_group"],
+                ", ".join(entry["reads"]) or "-",
+            )
+            if entry["writes"]:
+                line += "; writes " + ", ".join(entry["writes"])
+            if "time" in entry:
+                line += "; %.4f s, %d rows/s" % (entry["time"], entry["rows_per_sec"])
+            lines.append(line)
+    return "\n".join(lines)
+
+
 def get_new_config():
     """
     boiler config object, to be filled in with targeted operator tasks
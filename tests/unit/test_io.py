@@ -14,12 +14,23 @@
 # limitations under the License.
 #
 
+import bz2
 import glob
+import gzip
+import os
+import struct
+import subprocess
+import sys
+import zlib
 
 import cudf
+import numpy as np
+import pandas as pd
 import pytest
+from cudf.tests.utils import assert_eq
 
 import nvtabular.io
+from nvtabular.ds_writer import DatasetWriter
 from tests.conftest import allcols_csv, mycols_csv, mycols_pq
 
 
@@ -42,3 +53,554 @@ def test_shuffle_gpu(tmpdir, datasets, engine):
         df3 = cudf.read_parquet(writer_files[0])[mycols_csv]
         df4 = cudf.read_parquet(writer_files[1])[mycols_csv]
     assert df1.shape[0] == df3.shape[0] + df4.shape[0]
+
+
+@pytest.mark.parametrize("batch", [0, 100, 1000])
+@pytest.mark.parametrize("engine", ["csv", "parquet", "csv-no-header"])
+def test_dataset_iterator_cpu(datasets, batch, engine):
+    paths = glob.glob(str(datasets[engine]) + "/*." + engine.split("-")[0])
+    columns = mycols_pq if engine == "parquet" else mycols_csv
+    kwargs = dict(batch_size=batch, gpu_memory_frac=0.01, columns=columns, names=allcols_csv)
+    if engine == "parquet":
+        kwargs.pop("names")
+
+    df_gpu = cudf.concat(list(nvtabular.io.GPUDatasetIterator(paths, **kwargs)), axis=0)
+    chunks = list(nvtabular.io.GPUDatasetIterator(paths, device="cpu", **kwargs))
+    assert all(isinstance(chunk, pd.DataFrame) for chunk in chunks)
+    df_cpu = pd.concat(chunks, axis=0)
+
+    assert list(df_cpu.columns) == columns
+    assert len(df_cpu) == len(df_gpu)
+    for col in ["x", "y"]:
+        assert np.allclose(df_cpu[col].fillna(0).values, df_gpu[col].fillna(0).to_array())
+
+
+def test_dataset_iterator_cpu_without_cuda(tmpdir):
+    path = str(tmpdir.join("data.parquet"))
+    pd.DataFrame({"a": np.arange(100)}).to_parquet(path)
+    # the GPU modules can't be imported, as on hosts without CUDA
+    script = (
+        "import sys\n"
+        "sys.modules.update(cudf=None, cupy=None, rmm=None)\n"
+        "import pandas as pd\n"
+        "import nvtabular.io\n"
+        f"itr = nvtabular.io.GPUDatasetIterator({path!r}, device='cpu', batch_size=30)\n"
+        "assert len(pd.concat(list(itr))) == 100\n"
+    )
+    package_dir = os.path.dirname(os.path.dirname(nvtabular.io.__file__))
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=package_dir)
+
+
+@pytest.mark.parametrize("batch", [100, 333, 1000, 5000])
+@pytest.mark.parametrize("use_row_groups", [True, False])
+def test_pq_reader_row_groups(tmpdir, batch, use_row_groups):
+    path = str(tmpdir.join("row_groups.parquet"))
+    df = cudf.DataFrame({"a": np.arange(3500), "b": np.random.rand(3500)})
+    df.to_parquet(path, chunk_size=1000)
+
+    reader = nvtabular.io.PQFileReader(
+        path, gpu_memory_frac=0.01, batch_size=batch, use_row_groups=use_row_groups
+    )
+    chunks = list(reader)
+    assert len(chunks) == len(reader)
+    if not use_row_groups:
+        assert all(len(chunk) == batch for chunk in chunks[:-1])
+    df_itr = cudf.concat(chunks, axis=0).reset_index(drop=True)
+    assert df_itr["a"].to_array().tolist() == list(range(3500))
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 4])
+def test_dataset_iterator_prefetch(datasets, prefetch):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+    kwargs = dict(batch_size=100, gpu_memory_frac=0.01, columns=mycols_pq)
+    df_expect = cudf.concat(list(nvtabular.io.GPUDatasetIterator(paths, **kwargs)), axis=0)
+
+    def add_flag(gdf):
+        gdf["flag"] = 1
+        return gdf
+
+    read_ahead = nvtabular.io.ReadAhead(prefetch=prefetch)
+    data_itr = nvtabular.io.GPUDatasetIterator(
+        paths, read_ahead=read_ahead, transform=add_flag, **kwargs
+    )
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    assert (df_itr["flag"] == 1).all()
+    assert_eq(
+        df_itr.drop(columns=["flag"]).reset_index(drop=True), df_expect.reset_index(drop=True)
+    )
+
+    # stopping early must not leave the producer thread blocked
+    for i, _ in enumerate(data_itr):
+        if i == 1:
+            break
+
+
+@pytest.mark.parametrize("num_workers", [1, 2, 4])
+@pytest.mark.parametrize("ordered", [True, False])
+def test_dataset_iterator_concurrent(tmpdir, num_workers, ordered):
+    paths = []
+    for i in range(5):
+        path = str(tmpdir.join(f"part-{i}.parquet"))
+        cudf.DataFrame({"a": np.arange(i * 1000, (i + 1) * 1000)}).to_parquet(path, chunk_size=250)
+        paths.append(path)
+
+    read_ahead = nvtabular.io.ReadAhead(num_workers=num_workers, ordered=ordered)
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=100, read_ahead=read_ahead)
+    values = cudf.concat(list(data_itr), axis=0)["a"].to_array().tolist()
+    if ordered:
+        assert values == list(range(5000))
+    else:
+        assert sorted(values) == list(range(5000))
+
+
+@pytest.mark.parametrize("engine", ["parquet", "csv"])
+@pytest.mark.parametrize("batch", [0, 40])
+def test_dataset_iterator_filters(tmpdir, engine, batch):
+    df = cudf.DataFrame(
+        {
+            "day": np.repeat(np.arange(10), 100),
+            "label": np.tile([0, 1], 500),
+            "x": np.random.rand(1000),
+        }
+    )
+    path = str(tmpdir.join("days." + engine))
+    if engine == "parquet":
+        df.to_parquet(path, chunk_size=100)
+    else:
+        df.to_csv(path, index=False)
+
+    filters = [("day", ">=", 7), ("label", "==", 1)]
+    data_itr = nvtabular.io.GPUFileIterator(
+        path, batch_size=batch, gpu_memory_frac=0.01, columns=["x"], filters=filters
+    )
+    if engine == "parquet":
+        assert data_itr.engine.row_groups == [7, 8, 9]
+
+    df_itr = cudf.concat(list(data_itr), axis=0).reset_index(drop=True)
+    df_expect = df[(df["day"] >= 7) & (df["label"] == 1)][["x"]].reset_index(drop=True)
+    assert list(df_itr.columns) == ["x"]
+    assert_eq(df_itr, df_expect)
+
+
+def test_invalid_filters():
+    with pytest.raises(ValueError):
+        nvtabular.io._normalize_filters([("day", "~", 1)])
+
+
+@pytest.mark.parametrize("decode_workers", [1, 3])
+def test_csv_reader_index(tmpdir, decode_workers):
+    df = cudf.DataFrame({"a": np.arange(2000), "b": np.random.rand(2000)})
+    path = str(tmpdir.join("indexed.csv"))
+    df.to_csv(path, index=False)
+
+    data_itr = nvtabular.io.GPUFileIterator(
+        path,
+        batch_size=100,
+        gpu_memory_frac=0.01,
+        use_index=True,
+        index_block_size=1024,
+        decode_workers=decode_workers,
+    )
+    assert data_itr.engine.num_rows == len(df)
+    assert len(data_itr.engine) > 1
+    df_itr = cudf.concat(list(data_itr), axis=0).reset_index(drop=True)
+    assert_eq(df_itr, df, check_dtype=False)
+
+    # the index is reused from the sidecar until the file changes
+    index = nvtabular.io.CSVIndex._read_sidecar(path, os.stat(path))
+    assert index.num_rows == len(df)
+    assert index.sniff["names"] == ["a", "b"]
+    df.head(10).to_csv(path, index=False)
+    assert nvtabular.io.CSVIndex.load(path).num_rows == 10
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+@pytest.mark.parametrize("use_index", [False, True])
+def test_csv_resume_from_offset(tmpdir, device, use_index):
+    df = cudf.DataFrame({"a": np.arange(2000), "b": np.random.rand(2000)})
+    path = str(tmpdir.join("data.csv"))
+    df.to_csv(path, index=False)
+    kwargs = dict(device=device, batch_size=300, use_index=use_index, index_block_size=1024)
+
+    data_itr = nvtabular.io.GPUDatasetIterator([path], **kwargs)
+    chunks = []
+    for chunk in data_itr:
+        chunks.append(chunk)
+        if len(chunks) == 3:
+            break
+    state = data_itr.state()
+    assert 0 < state["offset"] < os.path.getsize(path)
+
+    # the rows read already are not read again
+    data_itr = nvtabular.io.GPUDatasetIterator([path], **kwargs)
+    data_itr.load_state(dict(state, rows=0))
+    rest = cudf.concat(list(data_itr), axis=0)
+    assert rest["a"].min() == sum(len(chunk) for chunk in chunks)
+    df_itr = cudf.concat(chunks + [rest], axis=0).reset_index(drop=True)
+    assert_eq(df_itr, df, check_dtype=False)
+
+
+@pytest.mark.parametrize("engine", ["parquet", "csv"])
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_row_size_estimate(tmpdir, engine, device):
+    size = 2000
+    df = cudf.DataFrame({"x": np.arange(size), "s": ["s" * (50 + i % 100) for i in range(size)]})
+    path = str(tmpdir.join("strings." + engine))
+    if engine == "parquet":
+        df.to_parquet(path, chunk_size=500)
+    else:
+        df.to_csv(path, index=False)
+
+    data_itr = nvtabular.io.GPUFileIterator(path, batch_size=0, gpu_memory_frac=0.01, device=device)
+    reader = data_itr.engine
+    low, high = reader.row_size_interval
+    # the string payload (100 bytes on average) is measured
+    assert reader.estimated_row_size > 100
+    assert low <= reader.estimated_row_size <= high
+    assert reader.row_size_estimate.num_samples > 1
+
+    data_itr = nvtabular.io.GPUFileIterator(path, batch_size=0, columns=["x"], device=device)
+    assert data_itr.engine.estimated_row_size == 8
+
+
+@pytest.mark.parametrize("engine", ["parquet", "csv"])
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_dataset_iterator_adaptive(tmpdir, engine, device):
+    # the strings get 40x longer half-way through the file
+    size = 20000
+    strings = ["s" * (10 if i < size // 2 else 400) for i in range(size)]
+    df = cudf.DataFrame({"x": np.arange(size), "s": strings})
+    path = str(tmpdir.join("skewed." + engine))
+    if engine == "parquet":
+        df.to_parquet(path, chunk_size=500)
+    else:
+        df.to_csv(path, index=False)
+
+    target = 200000
+    data_itr = nvtabular.io.GPUDatasetIterator(
+        [path], batch_size=500, device=device, adaptive=nvtabular.io.AdaptiveBatchSize(target)
+    )
+    chunks = list(data_itr)
+    df_itr = cudf.concat(chunks, axis=0).reset_index(drop=True)
+    assert_eq(df_itr["x"], df["x"], check_dtype=False)
+
+    # the batch size shrank once the long strings were reached
+    sizes = [len(chunk) for chunk in chunks]
+    assert sizes[-2] < sizes[0]
+    memory = nvtabular.io._frame_memory(chunks[-2])
+    assert 0.5 * target < memory < 1.5 * target
+
+
+def test_adaptive_batch_size_hysteresis():
+    controller = nvtabular.io.AdaptiveBatchSize(1000, batch_size=10, smoothing=1.0)
+    # small fluctuations of the memory per row don't move the batch size
+    for i in range(10):
+        assert controller.update(10, 1000 * (1 + 0.2 * (i % 2))) == 10
+    # growth is limited per step, shrinking is immediate
+    assert controller.update(10, 100) == 20
+    assert controller.update(10, 100000) < 10
+    # the most expensive stage drives the batch size
+    controller = nvtabular.io.AdaptiveBatchSize(1000, batch_size=10, smoothing=1.0)
+    controller.update(10, 1000, stage="read")
+    assert controller.update(10, 4000, stage="transform") == 2
+    assert controller.update(10, 1000, stage="read") == 2
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+@pytest.mark.parametrize("batch", [0, 300])
+def test_arrow_dataset(tmpdir, device, batch):
+    size = 2000
+    df = cudf.DataFrame({"x": np.arange(size), "s": [str(i) for i in range(size)]})
+    writer = DatasetWriter(str(tmpdir), nfiles=2, format="arrow")
+    writer.write(df, shuffle=False)
+    writer.write_metadata()
+    paths = sorted(glob.glob(str(tmpdir) + "/ds_part.*.arrow"))
+    assert len(paths) == 2
+    assert not os.path.exists(str(tmpdir) + "/_metadata")
+
+    data_itr = nvtabular.io.GPUDatasetIterator(
+        paths, batch_size=batch, gpu_memory_frac=0.01, columns=["x"], device=device
+    )
+    chunks = list(data_itr)
+    if batch:
+        assert max(len(chunk) for chunk in chunks) == batch
+    df_itr = cudf.concat(chunks, axis=0).reset_index(drop=True)
+    assert list(df_itr.columns) == ["x"]
+    assert_eq(df_itr, df[["x"]], check_dtype=False)
+
+
+def _bgzf_block(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    header = b"\x1f\x8b\x08\x04" + b"\0" * 4 + b"\0\xff" + struct.pack("<H", 6) + b"BC"
+    header += struct.pack("<HH", 2, len(payload) + 25)
+    return header + payload + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+@pytest.mark.parametrize("compression", ["gz", "bz2", "bgz"])
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+@pytest.mark.parametrize("decode_workers", [1, 3])
+def test_compressed_csv(tmpdir, compression, device, decode_workers):
+    size = 5000
+    df = cudf.DataFrame({"x": np.arange(size), "s": ["s%d" % i for i in range(size)]})
+    text = df.to_pandas().to_csv(index=False, sep="\t").encode()
+    path = str(tmpdir.join("data.tsv." + compression))
+    if compression == "gz":
+        data = gzip.compress(text)
+    elif compression == "bz2":
+        data = bz2.compress(text)
+    else:
+        # bgzip: independent gzip members, followed by an empty one
+        blocks = [text[i : i + 4000] for i in range(0, len(text), 4000)] + [b""]
+        data = b"".join(_bgzf_block(block) for block in blocks)
+    with open(path, "wb") as fil:
+        fil.write(data)
+
+    data_itr = nvtabular.io.GPUFileIterator(
+        path,
+        batch_size=700,
+        gpu_memory_frac=0.01,
+        device=device,
+        decode_workers=decode_workers,
+        block_bytes=2048,
+    )
+    assert data_itr.engine.sep == "\t"
+    chunks = list(data_itr)
+    assert len(chunks) > 1
+    df_itr = cudf.concat(chunks, axis=0).reset_index(drop=True)
+    assert_eq(df_itr, df, check_dtype=False)
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_metadata_cache(tmpdir, device):
+    paths = []
+    for i in range(4):
+        df = cudf.DataFrame({"x": np.arange(100) + 100 * i, "s": ["s" * (i + 1)] * 100})
+        paths.append(str(tmpdir.join("part.%d.parquet" % i)))
+        df.to_parquet(paths[-1], chunk_size=30)
+
+    cache = nvtabular.io.MetadataCache(paths, device=device, save=True)
+    assert cache.cache_path == str(tmpdir.join(".nvt_metadata.json"))
+    assert cache.num_rows() == 400
+    assert cache.get(paths[0])["row_groups"] == [30, 30, 30, 10]
+    assert cache.row_size_estimate(paths[3]).mean > cache.row_size_estimate(paths[0]).mean
+    assert cache.row_size_estimate(paths[3], columns=["x"]).mean == 8
+
+    # the saved cache is reused until a file changes
+    cache = nvtabular.io.MetadataCache(device=device, cache_path=cache.cache_path)
+    assert all(cache.is_valid(path) for path in paths)
+    cudf.DataFrame({"x": np.arange(10), "s": ["s"] * 10}).to_parquet(paths[0])
+    assert not cache.is_valid(paths[0])
+    assert cache.get(paths[0])["num_rows"] == 10
+
+    data_itr = nvtabular.io.GPUDatasetIterator(
+        paths, batch_size=40, device=device, metadata_cache=cache
+    )
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    assert len(df_itr) == 310
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_plan_from_metadata_file(tmpdir, device):
+    df = cudf.DataFrame({"x": np.arange(1000), "y": np.random.rand(1000)})
+    writer = DatasetWriter(str(tmpdir), nfiles=4)
+    writer.write(df[:500], shuffle=False)
+    writer.write(df[500:], shuffle=False)
+    writer.write_metadata()
+
+    data_itr = nvtabular.io.GPUDatasetIterator(str(tmpdir), batch_size=100, device=device)
+    cache = data_itr.metadata_cache
+    assert len(data_itr.paths) == 4
+    assert cache.num_rows() == 1000
+    assert cache.num_bytes() > 0
+    assert all(len(cache.get(path)["row_groups"]) == 2 for path in data_itr.paths)
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    assert_eq(df_itr.sort_values("x").reset_index(drop=True), df)
+
+    # files listed explicitly are planned from the _metadata file as well
+    paths = sorted(glob.glob(str(tmpdir) + "/ds_part.*.parquet"))
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, device=device)
+    assert data_itr.metadata_cache.num_rows(paths) == 1000
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_schema_decoders(tmpdir, device):
+    values = np.random.randint(0, 2 ** 31 - 1, size=1000)
+    df = pd.DataFrame(
+        {
+            "c": [format(v, "x") for v in values],
+            "p": np.round(np.random.rand(1000) * 100, 2),
+            "s": np.random.choice(["a", "b", "c"], 1000),
+        }
+    )
+    path = str(tmpdir.join("data.csv"))
+    df.to_csv(path, index=False)
+
+    schema = nvtabular.io.Schema(
+        {
+            "c": nvtabular.io.HexDecoder("int64"),
+            "p": nvtabular.io.FixedPointDecoder(2),
+            "s": nvtabular.io.CategoryDecoder(["a", "b"]),
+        }
+    )
+    data_itr = nvtabular.io.GPUDatasetIterator([path], batch_size=300, device=device, schema=schema)
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    if device == "gpu":
+        df_itr = df_itr.to_pandas()
+    assert df_itr["c"].dtype == "int64"
+    assert df_itr["p"].dtype == "int64"
+    assert df_itr["s"].dtype == "int32"
+    assert (df_itr["c"].values == values).all()
+    assert (df_itr["p"].values == np.round(df["p"].values * 100)).all()
+    assert (df_itr["s"].values == df["s"].map({"a": 0, "b": 1, "c": -1}).values).all()
+
+    data_itr = nvtabular.io.GPUDatasetIterator([path], device=device, schema="infer")
+    assert data_itr.schema.names == ["c", "p", "s"]
+    assert data_itr.schema.row_size > 0
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_downcast(tmpdir, device):
+    paths = []
+    strings = []
+    for i in range(3):
+        # the second file has no "x", so a dictionary per chunk would code "y" as 0
+        values = ["x", "y"] * 50 if i != 1 else ["y"] * 100
+        df = cudf.DataFrame({"a": np.arange(100) + 1000 * i, "b": np.random.rand(100), "s": values})
+        paths.append(str(tmpdir.join("part.%d.parquet" % i)))
+        df.to_parquet(paths[-1])
+        strings.extend(values)
+
+    # integer ranges come from the statistics of every file
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, device=device, schema="downcast")
+    assert data_itr.metadata_cache.column_ranges() == {"a": (0, 2099)}
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    assert df_itr["a"].dtype == "int16"
+    assert df_itr["b"].dtype == "float32"
+    assert len(df_itr) == 300 and df_itr["a"].max() == 2099
+    # the strings get the same codes in every chunk
+    codes = pd.Series(strings).map({"x": 0, "y": 1}).values
+    if device == "gpu":
+        df_itr = df_itr.to_pandas()
+    assert df_itr["s"].dtype == "int32"
+    assert (df_itr["s"].values == codes).all()
+
+    # the decisions carry over to another dataset read with the schema
+    valid_itr = nvtabular.io.GPUDatasetIterator(paths[1:], device=device, schema=data_itr.schema)
+    valid = cudf.concat(list(valid_itr), axis=0)
+    if device == "gpu":
+        valid = valid.to_pandas()
+    assert valid["a"].dtype == "int16"
+    assert (valid["s"].values == codes[100:]).all()
+
+    with pytest.raises(OverflowError):
+        nvtabular.io.DowncastDecoder("int8")(df_itr["a"])
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_downcast_csv_keeps_integer_width(tmpdir, device):
+    # the range of a sample doesn't bound the rest of a CSV file
+    path = str(tmpdir.join("data.csv"))
+    cudf.DataFrame({"a": np.arange(5000) * 10, "b": np.random.rand(5000)}).to_csv(path, index=False)
+
+    data_itr = nvtabular.io.GPUDatasetIterator(
+        [path], device=device, batch_size=100, schema="downcast"
+    )
+    assert "a" not in data_itr.schema.decoders
+    df_itr = cudf.concat(list(data_itr), axis=0)
+    assert df_itr["a"].dtype == "int64" and df_itr["a"].max() == 49990
+    assert df_itr["b"].dtype == "float32"
+
+
+def test_num_rows(tmpdir):
+    df = cudf.DataFrame({"x": np.arange(1234), "y": np.random.rand(1234)})
+    df.to_parquet(str(tmpdir.join("data.parquet")), chunk_size=100)
+    df.to_csv(str(tmpdir.join("data.csv")), index=False)
+    with gzip.open(str(tmpdir.join("data.csv.gz")), "wb") as fil:
+        fil.write(df.to_pandas().to_csv(index=False).encode())
+    paths = [str(tmpdir.join("data.parquet")), str(tmpdir.join("data.csv"))]
+
+    data_itr = nvtabular.io.GPUDatasetIterator(paths)
+    assert data_itr.file_num_rows == {paths[0]: 1234, paths[1]: 1234}
+    assert data_itr.num_rows == 2468
+    # the csv index is saved for the next runs
+    assert os.path.exists(paths[1] + nvtabular.io.CSVIndex.suffix)
+
+    # unknown without decoding the rows
+    assert nvtabular.io.GPUDatasetIterator(str(tmpdir.join("data.csv.gz"))).num_rows is None
+    assert nvtabular.io.GPUDatasetIterator(paths, filters=[("x", "<", 10)]).num_rows is None
+
+
+@pytest.mark.parametrize("shard_by", ["file", "row_group"])
+def test_dataset_shards(tmpdir, shard_by):
+    paths = []
+    for i in range(6):
+        df = cudf.DataFrame({"x": np.arange(100 * (i + 1)) + 1000 * i})
+        paths.append(str(tmpdir.join("part.%d.parquet" % i)))
+        df.to_parquet(paths[-1], chunk_size=50)
+    total = sum(100 * (i + 1) for i in range(6))
+
+    values = []
+    for rank in range(2):
+        shard = nvtabular.io.Shard(rank, 2, by=shard_by)
+        data_itr = nvtabular.io.GPUDatasetIterator(paths, shard=shard)
+        df_itr = cudf.concat(list(data_itr), axis=0)
+        assert len(df_itr) == data_itr.num_rows
+        assert abs(data_itr.num_rows - total / 2) <= 600
+        values.extend(df_itr["x"].to_array().tolist())
+    expected = [x + 1000 * i for i in range(6) for x in range(100 * (i + 1))]
+    assert sorted(values) == expected
+
+    # shuffled assignments are the same for every rank, for an epoch
+    assignments = []
+    for epoch in range(4):
+        shards = []
+        for rank in range(2):
+            shard = nvtabular.io.Shard(rank, 2, by=shard_by, shuffle=True)
+            data_itr = nvtabular.io.GPUDatasetIterator(paths, shard=shard)
+            data_itr.set_epoch(epoch)
+            shards.append(data_itr.parts)
+        flat = [(path, rgs) for parts in shards for path, rgs in parts]
+        assert sum(len(rgs or [None]) for _, rgs in flat) == (6 if shard_by == "file" else 42)
+        assignments.append(shards[0])
+    assert any(parts != assignments[0] for parts in assignments[1:])
+
+
+def test_hugectr_resume(tmpdir):
+    df = cudf.DataFrame({"label": [1, 0, 1, 0], "x": [0.1, 0.2, 0.3, 0.4], "c": [1, 2, 3, 4]})
+    huge_ctr = nvtabular.io.HugeCTR(
+        str(tmpdir), num_out_files=1, num_threads=1, cats=["c"], conts=["x"], labels=["label"]
+    )
+    huge_ctr.add_data(df.iloc[:2])
+    state = huge_ctr.state()
+    # written after the checkpoint, by the run that died
+    huge_ctr.add_data(df.iloc[2:])
+    huge_ctr.close()
+
+    huge_ctr = nvtabular.io.HugeCTR(
+        str(tmpdir),
+        num_out_files=1,
+        num_threads=1,
+        cats=["c"],
+        conts=["x"],
+        labels=["label"],
+        state=state,
+    )
+    huge_ctr.add_data(df.iloc[2:])
+    huge_ctr.close()
+    data = open(str(tmpdir.join("0.data")), "rb").read()
+    header = np.frombuffer(data[:64], dtype=np.longlong)
+    assert list(header[:5]) == [0, 4, 1, 1, 1]
+    assert len(data) == state["sizes"][0] + (state["sizes"][0] - 64)
+
+
+def test_shuffler_rotate(tmpdir):
+    df = cudf.DataFrame({"x": np.arange(100)})
+    shuffler = nvtabular.io.Shuffler(str(tmpdir), num_out_files=2, num_threads=1)
+    shuffler.add_data(df)
+    assert shuffler.rotate() == 1
+    shuffler.add_data(df)
+    shuffler.close()
+    names = sorted(os.path.basename(path) for path in glob.glob(str(tmpdir.join("*.parquet"))))
+    assert names == ["0.gen1.parquet", "0.parquet", "1.gen1.parquet", "1.parquet"]
+    assert sum(len(cudf.read_parquet(str(tmpdir.join(name)))) for name in names) == 200
@@ -16,6 +16,7 @@
 
 import glob
 import math
+import pickle
 
 import cudf
 import numpy as np
@@ -322,3 +323,31 @@ def test_fill_missing(tmpdir, datasets, engine="parquet"):
 
     transformed = cudf.concat([op.apply_op(df, columns_ctx, "continuous") for df in data_itr])
     assert_eq(transformed[cont_names], df[cont_names].dropna(42))
+
+
+@pytest.mark.parametrize("op_type", [ops.MinMax, ops.Moments, ops.Median, ops.Encoder])
+def test_stat_op_merge(datasets, op_type):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+    chunks = list(nvtabular.io.GPUDatasetIterator(paths, columns=mycols_pq, batch_size=1000))
+    cols_grp = "categorical" if op_type is ops.Encoder else "continuous"
+    columns_ctx = {"continuous": {"base": ["x", "y"]}, "categorical": {"base": ["name-string"]}}
+
+    full = op_type()
+    for gdf in chunks:
+        full.apply_op(gdf, columns_ctx, cols_grp)
+    expected = full.finalize()
+
+    # every chunk fitted apart, as by other workers, and reduced in a tree
+    states = []
+    for gdf in chunks:
+        op = op_type()
+        op.apply_op(gdf, columns_ctx, cols_grp)
+        states.append(pickle.loads(pickle.dumps(op.partial_state())))
+    result = ops.merge_partial_states(op_type(), states).finalize()
+
+    for name, stat in expected.items():
+        if name in ["encoders", "batch_mins", "batch_maxs"]:
+            continue
+        assert stat.keys() == result[name].keys()
+        for col, val in stat.items():
+            assert math.isclose(result[name][col], val, rel_tol=1e-6)
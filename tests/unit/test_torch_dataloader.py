@@ -15,6 +15,7 @@
 #
 
 import glob
+import gzip
 import math
 import os
 import shutil
@@ -301,3 +302,25 @@ def test_gpu_dl(tmpdir, datasets, batch_size, gpu_memory_frac, engine):
     assert rows == num_rows
     if os.path.exists(output_train):
         shutil.rmtree(output_train)
+
+
+@pytest.mark.parametrize("filters", [None, [("x", "<", 50)]])
+def test_dataset_itr_len(tmpdir, filters):
+    df = cudf.DataFrame({"x": np.arange(95), "y": np.random.rand(95), "label": np.arange(95) % 2})
+    # compressed, without an extension telling so
+    path = str(tmpdir.join("data.csv"))
+    with gzip.open(path, "wb") as fil:
+        fil.write(df.to_pandas().to_csv(index=False).encode())
+
+    data_itr = nvt.torch_dataloader.TorchTensorBatchDatasetItr(
+        path,
+        engine="csv",
+        compression="gzip",
+        filters=filters,
+        sub_batch_size=10,
+        conts=["x", "y"],
+        labels=["label"],
+    )
+    batches = list(data_itr)
+    assert len(data_itr) == len(batches) == (5 if filters else 10)
+    assert sum(len(batch) for batch in batches) == (50 if filters else 95)
@@ -15,10 +15,13 @@
 #
 
 import glob
+import json
 import math
+import os
 
 import cudf
 import numpy as np
+import pandas as pd
 import pytest
 from cudf.tests.utils import assert_eq
 
@@ -400,3 +403,334 @@ def test_gpu_workflow_config(tmpdir, datasets, dump, gpu_memory_frac, engine, re
     num_rows, num_row_groups, col_names = cudf.io.read_parquet_metadata(str(tmpdir) + "/_metadata")
     assert num_rows == len(df_pp)
     return processor.ds_exports
+
+
+@pytest.mark.parametrize("engine", ["parquet", "csv"])
+def test_workflow_column_projection(datasets, engine):
+    paths = glob.glob(str(datasets[engine]) + "/*." + engine)
+    processor = nvt.Workflow(cat_names=["name-string"], cont_names=["x"], label_name=["label"])
+    processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+    processor.add_cat_preprocess(ops.Categorify())
+    processor.finalize()
+
+    assert processor.get_input_columns() == ["x", "name-string", "label"]
+
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, gpu_memory_frac=0.01, names=allcols_csv)
+    projected = processor._project(data_itr)
+    assert data_itr.columns is None
+    for chunk in projected:
+        assert list(chunk.columns) == ["x", "name-string", "label"]
+
+    processor.update_stats(data_itr)
+    assert "x" in processor.stats["means"]
+    assert "name-string" in processor.stats["encoders"]
+
+
+def test_workflow_input_columns_named_like_outputs():
+    # a column of the dataset named like the output of an operator is read
+    processor = nvt.Workflow(cat_names=["name-string"], cont_names=["x"], label_name=["label"])
+    processor.add_cont_feature([ops.LogOp()])
+    processor.add_cont_preprocess(ops.Normalize(columns=["price_LogOp"]))
+    processor.finalize()
+
+    assert processor.get_input_columns() == ["x", "name-string", "label", "price_LogOp"]
+
+
+def test_workflow_resume(tmpdir, datasets):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+
+    def make_workflow():
+        processor = nvt.Workflow(
+            cat_names=["name-string"], cont_names=["x", "y"], label_name=["label"]
+        )
+        processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+        processor.add_cont_preprocess(ops.Normalize())
+        processor.add_cat_preprocess(ops.Categorify())
+        processor.finalize()
+        return processor
+
+    expected = make_workflow()
+    expected.update_stats(nvtabular.io.GPUDatasetIterator(paths, batch_size=500))
+
+    # a run dying in the middle of the dataset, checkpointed after every chunk
+    seen = []
+
+    def crash(chunk):
+        seen.append(len(chunk))
+        if len(seen) > 3:
+            raise RuntimeError("preempted")
+        return chunk
+
+    checkpoint_path = str(tmpdir.join("checkpoint.pkl"))
+    processor = make_workflow()
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=500, transform=crash)
+    with pytest.raises(RuntimeError):
+        processor.apply(
+            data_itr,
+            output_path=str(tmpdir),
+            checkpoint_path=checkpoint_path,
+            checkpoint_interval=0,
+        )
+
+    processor = make_workflow()
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=500)
+    processor.apply(
+        data_itr,
+        output_path=str(tmpdir),
+        checkpoint_path=checkpoint_path,
+        resume_from=checkpoint_path,
+    )
+    for stat in ["means", "stds"]:
+        for col in ["x", "y"]:
+            assert math.isclose(processor.stats[stat][col], expected.stats[stat][col], rel_tol=1e-6)
+    cats = processor.stats["encoders"]["name-string"].get_cats().values_to_string()
+    assert cats == expected.stats["encoders"]["name-string"].get_cats().values_to_string()
+
+
+@pytest.mark.parametrize("spill", [True, "auto"])
+def test_workflow_spill(tmpdir, datasets, spill):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+
+    def make_workflow():
+        processor = nvt.Workflow(
+            cat_names=["name-string"], cont_names=["x", "y"], label_name=["label"]
+        )
+        processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+        processor.add_cont_preprocess(ops.Normalize())
+        processor.add_cat_preprocess(ops.Categorify())
+        processor.finalize()
+        return processor
+
+    expected = make_workflow()
+    expected.update_stats(nvtabular.io.GPUDatasetIterator(paths, batch_size=500))
+
+    processor = make_workflow()
+    spill_path = str(tmpdir.mkdir("spill"))
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=500)
+    processor.update_stats(data_itr, spill=spill, spill_path=spill_path)
+    if spill is True:
+        assert processor.timings["preproc_reapply"] < expected.timings["preproc_reapply"]
+    for stat in ["means", "stds"]:
+        for col in ["x", "y"]:
+            assert math.isclose(processor.stats[stat][col], expected.stats[stat][col], rel_tol=1e-6)
+    # the spills are removed once read
+    assert not os.listdir(spill_path)
+
+
+def test_workflow_plan_phases():
+    def plan(cat_names, label_name, **pp):
+        config = nvt.workflow.get_new_config()
+        config["PP"].update(pp)
+        processor = nvt.Workflow(
+            cat_names=cat_names, cont_names=["x", "y"], label_name=label_name, config=config
+        )
+        return [[(task[0]._id, task[1], task[2]) for task in phase] for phase in processor.phases]
+
+    # the moments of the logs can only be gathered after the medians
+    phases = plan(
+        ["name-string"],
+        ["label"],
+        continuous=[ops.Normalize(), [ops.FillMedian(), ops.LogOp(), ops.Normalize()]],
+        categorical=[ops.Categorify()],
+    )
+    assert len(phases) == 3
+    assert sorted(phases[0]) == [
+        ("Encoder", "categorical", ["base"]),
+        ("Median", "continuous", ["base"]),
+        ("Moments", "continuous", ["base"]),
+    ]
+    assert ("Moments", "continuous", ["LogOp"]) in phases[1]
+    assert ("Categorify", "categorical", ["base"]) in phases[1]
+    assert phases[1].index(("LogOp", "continuous", ["FillMedian"])) < phases[1].index(
+        ("Moments", "continuous", ["LogOp"])
+    )
+    assert phases[2] == [("Normalize", "continuous", ["LogOp"])]
+
+    # the same moments from different column groups are gathered once
+    phases = plan([], [], all=[ops.Normalize()], continuous=[ops.Normalize()])
+    assert len(phases) == 2
+    assert [task[0] for task in phases[0]] == ["Moments"]
+    assert [task[0] for task in phases[1]] == ["Normalize", "Normalize"]
+
+
+def test_workflow_explain(datasets):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+    processor = nvt.Workflow(cat_names=["name-string"], cont_names=["x", "y"], label_name=["label"])
+    processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+    processor.add_cont_preprocess(ops.Normalize())
+    processor.add_cat_preprocess(ops.Categorify())
+    processor.finalize()
+
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=500)
+    plan = processor.explain(data_itr)
+    assert plan["passes"] == len(processor.phases) == 2
+    assert plan["columns_read"] == ["x", "y", "name-string", "label"]
+    assert 0 < plan["bytes_read"] <= sum(os.path.getsize(path) for path in paths)
+    assert plan["phases"][1]["depends_on"] == [0]
+    ops_read = {entry["op"]: entry["reads"] for entry in plan["phases"][0]["ops"]}
+    assert ops_read["Moments"] == ["x", "y"]
+    assert ops_read["Encoder"] == ["name-string"]
+
+    # analyzing fits the statistics on a sample, and restores them after
+    plan = processor.explain(data_itr, analyze=True, sample_rows=100)
+    assert not processor.stats["means"]
+    for phase in plan["phases"]:
+        assert phase["peak_memory"] > 0
+        assert all(entry["rows_per_sec"] > 0 for entry in phase["ops"])
+
+
+def test_workflow_metrics(tmpdir, datasets):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+    processor = nvt.Workflow(
+        cat_names=["name-string"], cont_names=["x", "y"], label_name=["label"], op_bytes=True
+    )
+    processor.add_cont_feature([ops.FillMissing(), ops.LogOp(replace=False)])
+    processor.add_cont_preprocess(ops.Normalize())
+    processor.add_cat_preprocess(ops.Categorify())
+    processor.finalize()
+
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, batch_size=500)
+    processor.update_stats(data_itr)
+    num_rows = data_itr.num_rows
+
+    metrics = processor.metrics
+    by_op = {(record["phase"], record["op"]): record for record in metrics["ops"]}
+    assert by_op[(0, "Moments")]["type"] == "stat"
+    assert by_op[(0, "Moments")]["rows_in"] == num_rows
+    # the transforms of the first phase are reapplied in the second pass
+    assert by_op[(0, "LogOp")]["rows_in"] == 2 * num_rows
+    assert by_op[(0, "LogOp")]["bytes_delta"] > 0
+    assert by_op[(1, "Categorify")]["chunks"] == by_op[(0, "Encoder")]["chunks"]
+    assert [record["phase"] for record in metrics["phases"]] == [0, 1]
+    for record in metrics["phases"]:
+        assert record["rows_out"] == num_rows
+        assert record["time"] >= record["read_time"] + record["reapply_time"]
+
+    path = str(tmpdir.join("metrics.json"))
+    processor.export_metrics(path)
+    with open(path) as infile:
+        assert json.load(infile) == metrics
+
+
+class TemporaryOp(ops.TransformOperator):
+    """ Copies its columns with the help of a large temporary array """
+
+    default_in = ops.CONT
+    default_out = ops.CONT
+
+    def op_logic(self, gdf, target_columns, stats_context=None):
+        series = pd.Series if isinstance(gdf, pd.DataFrame) else cudf.Series
+        temporary = series(np.ones(1 << 22))
+        new_gdf = gdf[target_columns] * float(temporary.iloc[0])
+        del temporary
+        new_gdf.columns = [f"{col}_{self._id}" for col in new_gdf.columns]
+        return new_gdf
+
+
+@pytest.mark.parametrize("device", ["gpu", "cpu"])
+def test_workflow_peak_memory(device):
+    if device == "gpu" and not nvtabular.workflow._rmm_statistics():
+        pytest.skip("the peaks of the GPU are only measured with the RMM statistics")
+    df = cudf.DataFrame({"x": np.arange(1000, dtype="float32"), "y": np.random.rand(1000)})
+    if device == "cpu":
+        df = df.to_pandas()
+    processor = nvt.Workflow(cat_names=[], cont_names=["x", "y"], label_name=[], peak_memory=True)
+    processor.add_cont_feature([TemporaryOp(replace=False), ops.LogOp()])
+    processor.finalize()
+    processor.update_stats(iter([df]))
+
+    # the temporary (32 MB) is freed before the op returns, but counts in its peak
+    metrics = processor.metrics
+    by_op = {record["op"]: record for record in metrics["ops"]}
+    assert by_op["TemporaryOp"]["peak_memory_delta"] >= 1 << 25
+    assert by_op["LogOp"]["peak_memory_delta"] < 1 << 25
+    assert metrics["phases"][0]["peak_memory_delta"] >= 1 << 25
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_workflow_processes(tmpdir, datasets, spill):
+    paths = glob.glob(str(datasets["parquet"]) + "/*.parquet")
+
+    def make_workflow():
+        processor = nvt.Workflow(cat_names=[], cont_names=["x", "y"], label_name=["label"])
+        processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+        processor.add_cont_preprocess(ops.Normalize())
+        processor.finalize()
+        return processor
+
+    expected = make_workflow()
+    expected.update_stats(nvtabular.io.GPUDatasetIterator(paths, device="cpu", batch_size=500))
+
+    processor = make_workflow()
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, device="cpu", batch_size=500)
+    spill_path = str(tmpdir.mkdir("spill"))
+    processor.update_stats(data_itr, spill=spill, spill_path=spill_path, num_processes=2)
+    for stat in ["means", "stds"]:
+        for col in ["x", "y"]:
+            assert math.isclose(processor.stats[stat][col], expected.stats[stat][col], rel_tol=1e-6)
+    assert processor.get_final_cols_names("continuous") == expected.get_final_cols_names(
+        "continuous"
+    )
+    by_op = {(record["phase"], record["op"]): record for record in processor.metrics["ops"]}
+    assert by_op[(0, "Moments")]["rows_in"] == data_itr.num_rows
+
+    # the chunks are read from the cpu to be sent to the processes
+    with pytest.raises(ValueError):
+        processor.update_stats(nvtabular.io.GPUDatasetIterator(paths), num_processes=2)
+
+
+def test_workflow_spill_cpu_chunks(tmpdir):
+    # the chunks read with device="cpu" are pandas dataframes
+    df = pd.DataFrame({"x": np.arange(100, dtype="float32"), "s": [str(i) for i in range(100)]})
+    spill = nvtabular.workflow._PhaseSpill(str(tmpdir), passes=1, auto=False)
+    spill.write(df.iloc[:60], compute_time=0.0)
+    spill.write(df.iloc[60:], compute_time=0.0)
+    assert spill.close()
+
+    paths = glob.glob(os.path.join(spill.path, "*.arrow"))
+    data_itr = nvtabular.io.GPUDatasetIterator(paths, engine="arrow", device="cpu")
+    spilled = pd.concat(list(data_itr), axis=0).reset_index(drop=True)
+    assert spilled.equals(df)
+    spill.discard()
+
+    # the operators of cudf dataframes only can't be sent to the processes
+    processor = nvt.Workflow(cat_names=["s"], cont_names=["x"], label_name=[])
+    processor.add_cat_preprocess(ops.Categorify())
+    processor.finalize()
+    with pytest.raises(ValueError):
+        processor.update_stats(iter([df]), num_processes=2)
+
+
+def test_workflow_incremental(tmpdir, datasets):
+    paths = sorted(glob.glob(str(datasets["parquet"]) + "/*.parquet"))
+
+    def make_workflow():
+        processor = nvt.Workflow(
+            cat_names=["name-string"], cont_names=["x", "y"], label_name=["label"]
+        )
+        processor.add_cont_feature([ops.FillMissing(), ops.LogOp()])
+        processor.add_cont_preprocess(ops.Normalize())
+        processor.add_cat_preprocess(ops.Categorify())
+        processor.finalize()
+        return processor
+
+    expected = make_workflow()
+    expected.update_stats(nvtabular.io.GPUDatasetIterator(paths, batch_size=500))
+
+    # the stats of the first file are extended with those of the others
+    path = str(tmpdir.join("partial_states.pkl"))
+    processor = make_workflow()
+    data_itr = nvtabular.io.GPUDatasetIterator(paths[:1], batch_size=500)
+    processor.update_stats(data_itr, incremental=True, partial_states_path=path)
+    processor = make_workflow()
+    data_itr = nvtabular.io.GPUDatasetIterator(paths[1:], batch_size=500)
+    processor.update_stats(data_itr, incremental=True, partial_states_path=path)
+    for stat in ["means", "stds", "counts"]:
+        for col in ["x", "y"]:
+            assert math.isclose(processor.stats[stat][col], expected.stats[stat][col], rel_tol=1e-6)
+    assert processor.stats["categories"] == expected.stats["categories"]
+
+    # otherwise the stats are fitted again
+    expected.update_stats(nvtabular.io.GPUDatasetIterator(paths, batch_size=500))
+    for col in ["x", "y"]:
+        assert expected.stats["counts"][col] == processor.stats["counts"][col]